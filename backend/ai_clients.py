@@ -0,0 +1,86 @@
+import os
+import threading
+
+# OpenAI connection pool configuration
+openai_api_key = os.getenv("OPENAI_API_KEY")
+openai_base_url = os.getenv("OPENAI_BASE_URL")  # Point at a local mock server for benchmarks
+openai_max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+openai_max_keepalive_connections = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+openai_keepalive_expiry = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+openai_timeout = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+openai_connect_timeout = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=openai_max_connections,
+        max_keepalive_connections=openai_max_keepalive_connections,
+        keepalive_expiry=openai_keepalive_expiry,
+    )
+
+
+def _timeout():
+    import httpx
+
+    return httpx.Timeout(openai_timeout, connect=openai_connect_timeout)
+
+
+def get_openai_client():
+    """Process-wide OpenAI client - connections and TLS sessions are reused across calls"""
+    global _client
+    with _lock:
+        if _client is None:
+            import httpx
+            from openai import OpenAI
+
+            _client = OpenAI(
+                api_key=openai_api_key,
+                base_url=openai_base_url,
+                http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+            )
+        return _client
+
+
+def get_async_openai_client():
+    """Process-wide AsyncOpenAI client for code running on the event loop"""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            _async_client = AsyncOpenAI(
+                api_key=openai_api_key,
+                base_url=openai_base_url,
+                http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+            )
+        return _async_client
+
+
+def init_openai_clients():
+    """Build both clients during warm-up so the first request doesn't pay for it"""
+    try:
+        get_openai_client()
+        get_async_openai_client()
+        print("✅ OpenAI clients initialized")
+    except Exception as e:
+        print(f"❌ OpenAI client setup failed: {e}")
+        raise
+
+
+async def close_openai_clients():
+    """Close pooled connections on shutdown"""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
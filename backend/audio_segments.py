@@ -0,0 +1,204 @@
+import os
+import re
+import wave
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from metrics import record_fallback
+from uploads import upload_spool_dir
+
+# Long recordings are cut at pauses and transcribed in parallel
+audio_segment_seconds = float(os.getenv("AUDIO_SEGMENT_SECONDS", "120"))
+audio_split_min_seconds = float(os.getenv("AUDIO_SPLIT_MIN_SECONDS", "180"))  # shorter audio goes up in one request
+audio_overlap_seconds = float(os.getenv("AUDIO_OVERLAP_SECONDS", "1.5"))
+audio_silence_min_ms = int(os.getenv("AUDIO_SILENCE_MIN_MS", "500"))
+audio_silence_below_db = float(os.getenv("AUDIO_SILENCE_BELOW_DB", "16"))  # dB under the clip's average loudness
+transcription_concurrency = int(os.getenv("TRANSCRIPTION_CONCURRENCY", "4"))
+
+# Whisper resamples to 16 kHz mono anyway, and this keeps a 2 minute WAV segment under 4 MB
+SEGMENT_FRAME_RATE = 16000
+MAX_STITCH_WORDS = 30
+STITCH_SLACK_WORDS = 2
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def probe_duration(audio_path, audio_format):
+    """Length in seconds from the WAV header or ffprobe, without decoding the audio"""
+    if audio_format == "wav":
+        try:
+            with wave.open(audio_path, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    if not shutil.which("ffprobe"):
+        return None
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path],
+        capture_output=True, text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def read_window(audio_path, audio_format, start_seconds, duration_seconds):
+    """Decode only [start, start + duration) of the recording, as 16 kHz mono"""
+    from pydub import AudioSegment
+
+    if audio_format == "wav":
+        try:
+            with wave.open(audio_path, "rb") as wav:
+                wav.setpos(min(int(start_seconds * wav.getframerate()), wav.getnframes()))
+                frames = wav.readframes(int(duration_seconds * wav.getframerate()))
+                window = AudioSegment(frames, sample_width=wav.getsampwidth(), frame_rate=wav.getframerate(), channels=wav.getnchannels())
+            return window.set_channels(1).set_frame_rate(SEGMENT_FRAME_RATE)
+        except wave.Error:
+            pass  # compressed WAV - let ffmpeg decode it
+    # -ss before -i seeks in the input, so ffmpeg only decodes this window
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-ss", f"{start_seconds:.3f}", "-t", f"{duration_seconds:.3f}", "-i", audio_path,
+         "-ac", "1", "-ar", str(SEGMENT_FRAME_RATE), "-f", "s16le", "-"],
+        capture_output=True, check=True,
+    )
+    return AudioSegment(result.stdout, sample_width=2, frame_rate=SEGMENT_FRAME_RATE, channels=1)
+
+
+def find_cut(audio_path, audio_format, target_ms, search_ms):
+    """Middle of the longest pause within search_ms of target_ms, or None if there isn't one"""
+    from pydub.silence import detect_silence
+
+    start = max(0, target_ms - search_ms)
+    window = read_window(audio_path, audio_format, start / 1000, (target_ms + search_ms - start) / 1000)
+    # Loudness is judged against the window, so the whole recording never has to be decoded
+    pauses = detect_silence(
+        window,
+        min_silence_len=audio_silence_min_ms,
+        silence_thresh=window.dBFS - audio_silence_below_db,
+        seek_step=10,
+    )
+    if not pauses:
+        return None
+    # Prefer the longest pause, then the one closest to the target
+    pause_start, pause_end = max(pauses, key=lambda p: (p[1] - p[0], -abs(start + (p[0] + p[1]) // 2 - target_ms)))
+    return start + (pause_start + pause_end) // 2
+
+
+def plan_segments(audio_path, audio_format, duration_ms):
+    """[(start_ms, end_ms, overlapped)] cut at pauses near every audio_segment_seconds
+
+    Where no pause is close enough the cut is forced, and the next segment starts
+    audio_overlap_seconds early (overlapped=True) so a word split across the cut is
+    heard whole by one side.
+    """
+    segment_ms = int(audio_segment_seconds * 1000)
+    overlap_ms = int(audio_overlap_seconds * 1000)
+    segments, start, overlapped = [], 0, False
+    while duration_ms - start > segment_ms * 1.25:
+        target = start + segment_ms
+        cut = find_cut(audio_path, audio_format, target, segment_ms // 4)
+        if cut is None:
+            segments.append((start, target, overlapped))
+            start, overlapped = target - overlap_ms, overlap_ms > 0
+        else:
+            segments.append((start, cut, overlapped))
+            start, overlapped = cut, False
+    segments.append((start, duration_ms, overlapped))
+    return segments
+
+
+@contextmanager
+def split_audio(audio_path, filename=None):
+    """Yield [(wav_path, overlapped)] for the segments of a long recording, or None to send the upload as-is
+
+    Only the header is read for short clips. Segments are decoded and written to temp
+    files one at a time, and the files are removed when the block exits.
+    """
+    audio_format = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else None
+    duration = probe_duration(audio_path, audio_format)
+    if duration is None:
+        print("⚠️ Could not read the audio duration - sending as a single request")
+        record_fallback("audio_single_request")
+        yield None
+        return
+    if duration < audio_split_min_seconds:
+        yield None
+        return
+
+    try:
+        import pydub  # noqa: F401
+    except ImportError:
+        print("⚠️ pydub not installed - audio will be sent as a single request")
+        record_fallback("audio_single_request")
+        yield None
+        return
+
+    with tempfile.TemporaryDirectory(prefix="segments-", dir=upload_spool_dir) as segment_dir:
+        try:
+            segments = []
+            for n, (start, end, overlapped) in enumerate(plan_segments(audio_path, audio_format, int(duration * 1000))):
+                path = os.path.join(segment_dir, f"{n:04}.wav")
+                read_window(audio_path, audio_format, start / 1000, (end - start) / 1000).export(path, format="wav")
+                segments.append((path, overlapped))
+        except Exception as e:
+            print(f"⚠️ Could not decode audio for splitting ({e}) - sending as a single request")
+            record_fallback("audio_single_request")
+            segments = None
+        if segments:
+            print(f"✂️ Split {duration:.0f}s of audio into {len(segments)} segments")
+        yield segments
+
+
+def transcribe_segments(segments, transcribe_segment, concurrency=None):
+    """Transcribe segments concurrently and return their texts in recording order"""
+    concurrency = concurrency or transcription_concurrency
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(segments)), thread_name_prefix="whisper") as executor:
+        return list(executor.map(transcribe_segment, segments))
+
+
+def find_repeat(tail, head):
+    """Longest run of 2+ words near the end of tail that also starts near the start of head
+
+    Up to STITCH_SLACK_WORDS may sit outside the run on either side - the word cut in half
+    at a forced split usually comes out differently in the two transcripts.
+    Returns (index of the run's last word in tail, same in head), or None.
+    """
+    best = None
+    for i in range(len(tail)):
+        for j in range(min(len(head), STITCH_SLACK_WORDS + 1)):
+            n = 0
+            while i + n < len(tail) and j + n < len(head) and tail[i + n] == head[j + n]:
+                n += 1
+            if n >= 2 and len(tail) - (i + n) <= STITCH_SLACK_WORDS and (best is None or n > best[0]):
+                best = (n, i + n - 1, j + n - 1)
+    return best[1:] if best else None
+
+
+def stitch_transcripts(texts, overlapped):
+    """Join segment transcripts, dropping words the overlap made both sides hear
+
+    overlapped[i] says segment i starts inside the previous one (a forced cut). Only
+    those boundaries are de-duplicated, so a phrase really repeated across a pause stays.
+    """
+    stitched = ""
+    for text, overlaps_previous in zip(texts, overlapped):
+        text = (text or "").strip()
+        if not text:
+            continue
+        if not stitched or not overlaps_previous:
+            stitched = f"{stitched} {text}" if stitched else text
+            continue
+
+        tail_words = list(WORD_PATTERN.finditer(stitched.lower()))[-MAX_STITCH_WORDS:]
+        head_words = list(WORD_PATTERN.finditer(text.lower()))[:MAX_STITCH_WORDS]
+        repeat = find_repeat([m.group() for m in tail_words], [m.group() for m in head_words])
+        if repeat:
+            # Keep the previous segment up to the repeated run and this one from just after it
+            tail_end, head_end = repeat
+            stitched = stitched[:tail_words[tail_end].end()]
+            text = text[head_words[head_end].end():].lstrip(" ,;:.!?")
+        if text:
+            stitched += " " + text
+    return stitched
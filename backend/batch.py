@@ -0,0 +1,204 @@
+"""Batch intake over a directory of referral PDFs and recorded interviews
+
+    python -m batch ./referrals --output referrals.results.jsonl --workers 4
+
+The results file doubles as the checkpoint: re-running the same command skips
+every document that already succeeded and retries the rest.
+"""
+import os
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Batch configuration
+batch_workers = int(os.getenv("BATCH_WORKERS", "4"))
+batch_flush_every = int(os.getenv("BATCH_FLUSH_EVERY", "20"))  # results buffered per bulk write
+batch_root = os.getenv("BATCH_DIR") or os.path.join(tempfile.gettempdir(), "intake-batches")
+batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "1"))  # uploaded batches running at once, each with BATCH_WORKERS threads
+batch_queue_depth = int(os.getenv("BATCH_QUEUE_DEPTH", "5"))
+batch_max_files = int(os.getenv("BATCH_MAX_FILES", "1000"))
+batch_max_bytes = int(float(os.getenv("BATCH_MAX_MB", "2000")) * 1024 * 1024)  # uncompressed zip contents
+
+PDF_EXTENSIONS = (".pdf",)
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".mp4")
+SUPPORTED_EXTENSIONS = PDF_EXTENSIONS + AUDIO_EXTENSIONS
+
+
+class BatchError(Exception):
+    pass
+
+
+def list_documents(directory):
+    """Relative paths of every supported file under directory, in a stable order"""
+    documents = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS) and not name.startswith("."):
+                documents.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(documents)
+
+
+def load_checkpoint(results_path):
+    """Latest record per document from a results file (a crash can leave a partial last line)"""
+    records = {}
+    if not os.path.exists(results_path):
+        return records
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["document"]] = record
+    return records
+
+
+def extract_zip(zip_path, destination):
+    """Unpack the supported documents from a zip, refusing paths that escape destination"""
+    destination = os.path.realpath(destination)
+    total_bytes = 0
+    count = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            name = member.filename
+            if member.is_dir() or not name.lower().endswith(SUPPORTED_EXTENSIONS) or "__MACOSX" in name:
+                continue
+            target = os.path.realpath(os.path.join(destination, name))
+            if not target.startswith(destination + os.sep):
+                raise BatchError(f"Unsafe path in archive: {name}")
+
+            count += 1
+            total_bytes += member.file_size
+            if count > batch_max_files:
+                raise BatchError(f"Archive has more than {batch_max_files} documents")
+            if total_bytes > batch_max_bytes:
+                raise BatchError(f"Archive contents exceed {batch_max_bytes // (1024 * 1024)} MB")
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with archive.open(member) as source, open(target, "wb") as out:
+                shutil.copyfileobj(source, out, 1024 * 1024)
+    if not count:
+        raise BatchError("Archive has no PDF or audio files")
+    return count
+
+
+class ResultWriter:
+    """Buffers result records and appends them to the results file in bulk"""
+
+    def __init__(self, path, flush_every=None):
+        self.path = path
+        self.flush_every = flush_every or batch_flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        lines = "".join(json.dumps(record) + "\n" for record in self._buffer)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer = []
+
+
+def _process(process_document, directory, document):
+    start = time.perf_counter()
+    try:
+        result = process_document(os.path.join(directory, document), os.path.basename(document))
+    except Exception as e:
+        result = {"error": str(e)}
+    record = {"document": document, "seconds": round(time.perf_counter() - start, 2)}
+    if result and "error" not in result:
+        record.update(status="succeeded", result=result)
+    else:
+        record.update(status="failed", error=(result or {}).get("error", "No result"))
+    return record
+
+
+def run_batch(directory, results_path, process_document, workers=None, progress=None):
+    """Run process_document(path, filename) over every pending document and return a summary
+
+    `progress`, if given, is a dict kept up to date for status endpoints.
+    """
+    workers = workers or batch_workers
+    documents = list_documents(directory)
+    finished = {doc for doc, record in load_checkpoint(results_path).items() if record["status"] == "succeeded"}
+    pending = [doc for doc in documents if doc not in finished]
+    progress = progress if progress is not None else {}
+    progress.update(
+        total=len(documents), skipped=len(finished), succeeded=0, failed=0,
+        state="running", docs_per_minute=0.0,
+    )
+    print(f"📦 Batch: {len(documents)} documents, {len(finished)} already done, {len(pending)} to process ({workers} workers)")
+
+    writer = ResultWriter(results_path)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(_process, process_document, directory, doc) for doc in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                writer.add(record)
+                progress[record["status"]] += 1
+                processed = progress["succeeded"] + progress["failed"]
+                progress["docs_per_minute"] = round(processed / (time.perf_counter() - start) * 60, 1)
+                if record["status"] == "failed":
+                    print(f"❌ Document failed: {record['error']}")
+                if processed % 10 == 0 or processed == len(pending):
+                    print(f"📦 {processed}/{len(pending)} processed - {progress['docs_per_minute']} docs/min")
+    finally:
+        writer.flush()
+
+    elapsed = time.perf_counter() - start
+    progress.update(state="finished", seconds=round(elapsed, 1))
+    print(f"✅ Batch finished: {progress['succeeded']} succeeded, {progress['failed']} failed, {progress['docs_per_minute']} docs/min")
+    return dict(progress, results_path=results_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run intake extraction over a directory of PDFs and recordings")
+    parser.add_argument("directory")
+    parser.add_argument("--output", help="results/checkpoint file (default: <directory>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=batch_workers)
+    parser.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    results_path = args.output or args.directory.rstrip("/\\") + ".results.jsonl"
+
+    from migrate import run_migrations
+    from main import run_intake_pipeline_for_path, patient_writer, answer_set_writer
+
+    run_migrations()
+    try:
+        summary = run_batch(
+            args.directory, results_path,
+            lambda path, filename: run_intake_pipeline_for_path(path, filename, use_cache=not args.no_cache),
+            workers=args.workers,
+        )
+    finally:
+        # Write the rows still waiting in the write-behind queues before the process exits
+        patient_writer.close()
+        answer_set_writer.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""p50/p95 latency, throughput and peak RSS for every /parse-* endpoint, with no network
+
+    python -m benchmarks.bench_endpoints --concurrency 1 4 8 --requests 16
+    python -m benchmarks.bench_endpoints --save baseline.json
+    python -m benchmarks.bench_endpoints --baseline baseline.json --tolerance 0.2   # exits 1 on a regression
+
+Chat completions and Whisper go to the mock_openai server and Textract to the
+mock_textract server, each with its own latency. The app runs in-process on this
+event loop (one worker), the mocks in background threads. Every PDF upload gets
+a unique trailing comment so the PDF text cache never answers, and LLM caching
+is bypassed with no_cache=true. Scanned and mixed PDFs need poppler's pdftoppm
+and are skipped without it. The corpus audio is WAV, so long recordings are
+split into segments even without ffmpeg. App output goes to --app-log so the
+table stays readable.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.corpus import referral_pdf, interview_audio
+from benchmarks.mock_openai import start_mock_server
+from benchmarks.mock_textract import start_mock_textract
+
+PDF_ENDPOINTS = ("/parse-pdf", "/parse-pdf-for-questions", "/parse-pdf-for-intake", "/parse-pdf-for-intake/stream")
+AUDIO_ENDPOINTS = ("/parse-voice", "/parse-audio-for-questions", "/parse-audio-for-intake", "/parse-audio-for-intake/stream")
+
+
+class RSSSampler:
+    """Poll this process's resident set size from a thread; peak_mb() covers the time since reset()"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self._peak = 0
+        self._stop = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def rss_bytes(self):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            # No procfs (macOS) - fall back to the lifetime high-water mark
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, self.rss_bytes())
+
+    def reset(self):
+        self._peak = self.rss_bytes()
+
+    def peak_mb(self):
+        return max(self._peak, self.rss_bytes()) / (1024 * 1024)
+
+    def stop(self):
+        self._stop.set()
+
+
+def build_inputs(args):
+    """{input name: (filename, bytes, content type)} for the corpus this run uses"""
+    inputs = {}
+    for kind in args.pdf_kinds:
+        inputs[f"{kind} pdf"] = (f"{kind}.pdf", referral_pdf(kind, args.pages), "application/pdf")
+    for seconds in args.audio_seconds:
+        inputs[f"{seconds:g}s audio"] = ("interview.wav", interview_audio(seconds), "audio/wav")
+    return inputs
+
+
+def scenarios(args, inputs):
+    for endpoint in args.endpoints:
+        media = "pdf" if endpoint in PDF_ENDPOINTS else "audio"
+        for name in inputs:
+            if name.endswith(media):
+                yield endpoint, name
+
+
+async def upload(client, endpoint, filename, body, content_type):
+    """One request - returns (seconds, ok)"""
+    start = time.perf_counter()
+    response = await client.post(
+        endpoint, params={"no_cache": "true"}, files={"file": (filename, body, content_type)}
+    )
+    elapsed = time.perf_counter() - start
+    if response.status_code >= 400:
+        return elapsed, False
+    if endpoint.endswith("/stream"):
+        return elapsed, "event: result" in response.text
+    # Several endpoints report failures as a 200 with an "error" key
+    return elapsed, "error" not in response.json()
+
+
+# Numbers every upload of the run, so no two PDFs hash the same
+upload_numbers = itertools.count()
+
+
+def unique_body(filename, body):
+    """A unique tail keeps the PDF text cache (keyed on the file hash) out of the measurement"""
+    if not filename.endswith(".pdf"):
+        return body
+    return body + f"\n% bench upload {next(upload_numbers)}\n".encode()
+
+
+async def run_level(client, endpoint, upload_input, concurrency, total):
+    filename, body, content_type = upload_input
+    remaining = total
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            elapsed, ok = await upload(client, endpoint, filename, unique_body(filename, body), content_type)
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+async def run(args, report):
+    import main
+    import migrate
+
+    # ASGITransport doesn't run the app's lifespan, so do its warm-up work here
+    migrate.run_migrations()
+    main.warm_pdf_pool()
+    inputs = build_inputs(args)
+    sampler = RSSSampler()
+    rows = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        print(f"{'endpoint':<32} {'input':<12} {'conc':>4}  {'p50 s':>7}  {'p95 s':>7}  {'req/s':>6}  {'peak MB':>7}  {'errors':>6}", file=report)
+        for endpoint, name in scenarios(args, inputs):
+            # Warm-up so client and pool creation don't land in the first measurement
+            filename, body, content_type = inputs[name]
+            await upload(client, endpoint, filename, unique_body(filename, body), content_type)
+            for concurrency in args.concurrency:
+                sampler.reset()
+                total = max(args.requests, concurrency)
+                wall, latencies, errors = await run_level(client, endpoint, inputs[name], concurrency, total)
+                row = {
+                    "endpoint": endpoint, "input": name, "concurrency": concurrency, "requests": total,
+                    "p50_s": round(percentile(latencies, 50), 3),
+                    "p95_s": round(percentile(latencies, 95), 3),
+                    "throughput_rps": round(total / wall, 2),
+                    "peak_rss_mb": round(sampler.peak_mb(), 1),
+                    "errors": errors,
+                }
+                rows.append(row)
+                print(
+                    f"{endpoint:<32} {name:<12} {concurrency:>4}  {row['p50_s']:>7.2f}  {row['p95_s']:>7.2f}  "
+                    f"{row['throughput_rps']:>6.2f}  {row['peak_rss_mb']:>7.0f}  {errors:>6}",
+                    file=report, flush=True,
+                )
+    sampler.stop()
+    main.shutdown_pdf_pool()
+    # Flush queued rows while the bench database still exists
+    main.patient_writer.close()
+    main.answer_set_writer.close()
+    return rows
+
+
+def find_regressions(rows, baseline_rows, tolerance):
+    """(regressed rows, runs compared) - p95 up or throughput down by more than tolerance, or new errors"""
+    baseline = {(row["endpoint"], row["input"], row["concurrency"]): row for row in baseline_rows}
+    regressions, compared = [], 0
+    for row in rows:
+        before = baseline.get((row["endpoint"], row["input"], row["concurrency"]))
+        if not before:
+            continue
+        compared += 1
+        if row["p95_s"] > before["p95_s"] * (1 + tolerance):
+            regressions.append((row, "p95_s", before["p95_s"]))
+        if row["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append((row, "throughput_rps", before["throughput_rps"]))
+        if row["errors"] > before["errors"]:
+            regressions.append((row, "errors", before["errors"]))
+    return regressions, compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=16, help="requests per concurrency level")
+    parser.add_argument("--endpoints", nargs="+", default=list(PDF_ENDPOINTS + AUDIO_ENDPOINTS))
+    parser.add_argument("--pdf-kinds", nargs="*", default=["text", "scanned", "mixed"])
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--audio-seconds", type=float, nargs="*", default=[30, 240])
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="mock seconds per chat completion")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20, help="mock prompt time per 1k uncached tokens")
+    parser.add_argument("--whisper-latency", type=float, default=0.5, help="mock seconds per transcription")
+    parser.add_argument("--whisper-seconds-per-mb", type=float, default=0.5, help="extra mock seconds per MB of audio")
+    parser.add_argument("--textract-latency", type=float, default=0.2, help="mock seconds per Textract page")
+    parser.add_argument("--textract-rate-limit", type=int, default=None, help="mock Textract throttles above this many in flight")
+    parser.add_argument("--app-log", default=os.devnull, help="where the app's own output goes")
+    parser.add_argument("--save", help="write the results as JSON for a later --baseline")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput change vs the baseline")
+    args = parser.parse_args()
+
+    if not shutil.which("pdftoppm") and set(args.pdf_kinds) - {"text"}:
+        print("⚠️ pdftoppm not found - skipping scanned and mixed PDFs")
+        args.pdf_kinds = [kind for kind in args.pdf_kinds if kind == "text"]
+
+    _, openai_url = start_mock_server(
+        latency_seconds=args.llm_latency,
+        transcription_latency_seconds=args.whisper_latency,
+        transcription_seconds_per_mb=args.whisper_seconds_per_mb,
+        prompt_seconds_per_1k_tokens=args.ms_per_1k_tokens / 1000,
+    )
+    _, textract_url = start_mock_textract(args.textract_latency, max_concurrent=args.textract_rate_limit)
+    workdir = tempfile.mkdtemp(prefix="bench-endpoints-")
+    os.environ.update({
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": "test",
+        "TEXTRACT_ENDPOINT_URL": textract_url,
+        "AWS_ACCESS_KEY_ID": "test",
+        "AWS_SECRET_ACCESS_KEY": "test",
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "JOB_STORE": "memory",
+    })
+    os.environ.setdefault("TRACE_LOG_SPANS", "false")
+
+    report = sys.stdout
+    # Left open until exit - the app's log listener thread may still be writing to it
+    app_log = open(args.app_log, "w")
+    try:
+        with contextlib.redirect_stdout(app_log):
+            rows = asyncio.run(run(args, report))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    lifetime_peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(f"\n{len(rows)} runs, process peak RSS {lifetime_peak_mb:.0f} MB")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_rows = json.load(f)["results"]
+        regressions, compared = find_regressions(rows, baseline_rows, args.tolerance)
+        for row, field, before in regressions:
+            print(f"❌ {row['endpoint']} {row['input']} x{row['concurrency']}: {field} {before} -> {row[field]}")
+        if regressions:
+            sys.exit(1)
+        if not compared:
+            print(f"⚠️ No runs in common with {args.baseline} - nothing compared")
+        else:
+            print(f"✅ No regressions beyond {args.tolerance:.0%} in {compared} runs against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start cost of `import main`, measured in fresh interpreters
+
+    python -m benchmarks.bench_import --runs 5 --compare HEAD~1
+
+--compare exports another revision of backend/ to a temp dir and times it the
+same way. The slowest top-level imports come from `python -X importtime`.
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMER = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def child_env(database_path):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "test")
+    env["DATABASE_URL"] = f"sqlite:///{database_path}"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def time_imports(directory, runs, env):
+    # One untimed run so both trees start with warm .pyc and OS file caches
+    subprocess.run([sys.executable, "-c", "import main"], cwd=directory, env=env, capture_output=True)
+    seconds = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", TIMER], cwd=directory, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        seconds.append(float(result.stdout.strip().splitlines()[-1]))
+    return seconds
+
+
+def slowest_imports(directory, env, top=8):
+    """(cumulative ms, module) for main's direct imports, slowest first"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=directory, env=env, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Direct imports of main are indented by exactly two spaces
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def export_revision(revision, destination):
+    archive = subprocess.run(["git", "archive", revision, "backend"], cwd=os.path.dirname(BACKEND_DIR), capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(destination, filter="data")
+    return os.path.join(destination, "backend")
+
+
+def report(label, directory, runs, env):
+    seconds = time_imports(directory, runs, env)
+    print(f"\n{label}: median {statistics.median(seconds) * 1000:.0f} ms, best {min(seconds) * 1000:.0f} ms over {runs} runs")
+    for ms, module in slowest_imports(directory, env):
+        print(f"  {ms:>7.1f} ms  {module}")
+    return statistics.median(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compare", help="git revision to time against the working tree")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = child_env(os.path.join(scratch, "import.db"))
+        current = report("working tree", BACKEND_DIR, args.runs, env)
+        if args.compare:
+            baseline = report(args.compare, export_revision(args.compare, scratch), args.runs, env)
+            print(f"\nimport main: {baseline * 1000:.0f} ms -> {current * 1000:.0f} ms ({baseline / current:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
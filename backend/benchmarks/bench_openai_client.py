@@ -0,0 +1,66 @@
+"""Per-call OpenAI clients vs the shared pooled client, against the local mock server
+
+    python -m benchmarks.bench_openai_client --calls 200 --latency 0.02
+"""
+import argparse
+import os
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def time_calls(make_client, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = make_client()
+        client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": 'Return "introduction.new_participant"'}],
+            temperature=0.1,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="mock server seconds per call")
+    args = parser.parse_args()
+
+    from benchmarks.mock_openai import start_mock_server
+
+    server, base_url = start_mock_server(latency_seconds=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+
+    from openai import OpenAI
+    import ai_clients
+
+    ai_clients.openai_base_url = base_url
+    ai_clients.openai_api_key = os.environ["OPENAI_API_KEY"]
+
+    def per_call_client():
+        # What every helper used to do
+        return OpenAI(api_key=ai_clients.openai_api_key, base_url=base_url, http_client=httpx.Client())
+
+    results = {
+        "per-call client": time_calls(per_call_client, args.calls),
+        "shared client": time_calls(ai_clients.get_openai_client, args.calls),
+    }
+    server.shutdown()
+
+    print(f"{'strategy':>16}  {'p50 ms':>7}  {'p95 ms':>7}  {'mean ms':>7}")
+    for name, samples in results.items():
+        print(f"{name:>16}  {percentile(samples, 50):>7.2f}  {percentile(samples, 95):>7.2f}  {statistics.mean(samples):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
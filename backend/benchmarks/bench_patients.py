@@ -0,0 +1,98 @@
+"""Full-table /patients listing vs keyset pages, as the patients table grows
+
+    python -m benchmarks.bench_patients --rows 1000 10000 50000
+
+Each size is seeded into a fresh SQLite file. The old listing hydrated and
+serialized every row; a keyset page should cost the same at any depth.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def seed_patients(main, rows):
+    start = datetime(2024, 1, 1)
+    records = [
+        {
+            "patient_name": f"Patient {i}",
+            "date_of_birth": "1985-03-02",
+            "primary_diagnosis": "Multiple sclerosis",
+            # Every tenth row shares a timestamp with its neighbour so the id tiebreak is exercised
+            "created_at": start + timedelta(seconds=i - i % 10 // 9),
+        }
+        for i in range(rows)
+    ]
+    with main.engine.begin() as connection:
+        connection.execute(main.Patient.__table__.insert(), records)
+
+
+def full_listing(main):
+    """The listing before pagination: every ORM object, newest first"""
+    db = main.SessionLocal()
+    try:
+        patients = db.query(main.Patient).order_by(main.Patient.created_at.desc()).all()
+        return [
+            {"id": p.id, "patient_name": p.patient_name, "date_of_birth": p.date_of_birth,
+             "primary_diagnosis": p.primary_diagnosis, "created_at": p.created_at.isoformat()}
+            for p in patients
+        ]
+    finally:
+        db.close()
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7}  {'full ms':>8}  {'first page ms':>13}  {'deep page ms':>12}  {'pages walked':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            os.environ["DATABASE_URL"] = f"sqlite:///{directory}/patients_{rows}.db"
+            from sqlalchemy import create_engine
+            import main as app
+            import migrate
+
+            # A fresh engine per size - main binds its engine at import time
+            app.engine.dispose()
+            app.engine = create_engine(os.environ["DATABASE_URL"])
+            app.SessionLocal.configure(bind=app.engine)
+            migrate.run_migrations(app.engine)
+            seed_patients(app, rows)
+
+            full_ms, _ = timed(lambda: full_listing(app), args.repeats)
+            first_ms, first = timed(lambda: app.get_patients(limit=args.limit), args.repeats)
+
+            # Walk every page once to confirm the cursor visits each row exactly once
+            seen, cursor, pages, deep_cursor = set(), None, 0, None
+            while True:
+                page = app.get_patients(limit=args.limit, cursor=cursor)
+                seen.update(p["id"] for p in page["patients"])
+                pages += 1
+                cursor = page["next_cursor"]
+                if pages == max(1, rows // args.limit - 1):
+                    deep_cursor = cursor
+                if not cursor:
+                    break
+            assert len(seen) == rows, f"walked {len(seen)} of {rows} rows"
+            assert first["count"] == min(args.limit, rows)
+
+            deep_ms, _ = timed(lambda: app.get_patients(limit=args.limit, cursor=deep_cursor), args.repeats)
+            print(f"{rows:>7}  {full_ms:>8.1f}  {first_ms:>13.2f}  {deep_ms:>12.2f}  {pages:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Text-first prompts vs static-prefix prompts under provider-side prompt caching
+
+    python -m benchmarks.bench_prompt_cache --documents 10 --ms-per-1k-tokens 40
+
+Runs full intake extraction over the same documents twice against the mock
+server, which reports cached_tokens for repeated 1024+ token prefixes. "before"
+rebuilds the old layout (one user message, document text right after the
+opening paragraph); "after" is the versioned system-prefix layout. Token counts
+come from the recorded response usage.
+"""
+import argparse
+import os
+import statistics
+import time
+
+
+def legacy_messages(template, text):
+    """The pre-versioning layout: instructions split around the document in a single user message"""
+    intro, _, rest = template.system.strip("\n").partition("\n\n")
+    content = f"{intro}\n\n        TEXT TO ANALYZE:\n        {text}\n\n{rest}"
+    return [{"role": "user", "content": content}]
+
+
+def run_layout(app, documents, prompts_module, layout):
+    from llm_usage import llm_usage
+
+    original = prompts_module.PromptTemplate.messages
+    if layout == "before":
+        prompts_module.PromptTemplate.messages = legacy_messages
+    llm_usage.reset()
+    latencies = []
+    try:
+        for document in documents:
+            start = time.perf_counter()
+            app.extract_answers_for_intake_questions(document, use_cache=False)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        prompts_module.PromptTemplate.messages = original
+
+    totals = {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    for row in llm_usage.stats():
+        for field in totals:
+            totals[field] += row[field]
+    return latencies, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--filler-paragraphs", type=int, default=20)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=40, help="mock prompt processing time per 1k uncached tokens")
+    parser.add_argument("--input-price", type=float, default=0.15, help="USD per 1M uncached input tokens")
+    parser.add_argument("--cached-price", type=float, default=0.075, help="USD per 1M cached input tokens")
+    parser.add_argument("--output-price", type=float, default=0.60, help="USD per 1M output tokens")
+    args = parser.parse_args()
+
+    from benchmarks.mock_openai import start_mock_server
+    from benchmarks.bench_retrieval import synthetic_document
+
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_prompt_cache.db")
+    os.environ["INTAKE_SAVE_ANSWERS"] = "false"
+
+    documents = [synthetic_document(args.filler_paragraphs, seed=seed) for seed in range(args.documents)]
+    results = {}
+    for layout in ("before", "after"):
+        # A fresh server per layout so neither run inherits the other's prefix cache
+        server, base_url = start_mock_server(latency_seconds=0.05, prompt_seconds_per_1k_tokens=args.ms_per_1k_tokens / 1000)
+        os.environ["OPENAI_BASE_URL"] = base_url
+        import ai_clients
+        import main as app
+        import prompts
+
+        ai_clients.openai_base_url = base_url
+        ai_clients._client = None
+        results[layout] = run_layout(app, documents, prompts, layout)
+        server.shutdown()
+
+    print(f"\n{args.documents} documents, {len(prompts.INTAKE_SECTION_PROMPTS)} section requests each")
+    print(f"{'layout':>7}  {'p50 s/doc':>9}  {'input tok':>10}  {'cached':>7}  {'output tok':>10}  {'USD/1k docs':>11}")
+    for layout, (latencies, totals) in results.items():
+        uncached = totals["input_tokens"] - totals["cached_tokens"]
+        cost = (
+            uncached * args.input_price + totals["cached_tokens"] * args.cached_price + totals["output_tokens"] * args.output_price
+        ) / 1_000_000
+        cached_share = totals["cached_tokens"] / totals["input_tokens"] if totals["input_tokens"] else 0
+        print(
+            f"{layout:>7}  {statistics.median(latencies):>9.2f}  {totals['input_tokens']:>10}  {cached_share:>6.0%}  "
+            f"{totals['output_tokens']:>10}  {cost / len(documents) * 1000:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
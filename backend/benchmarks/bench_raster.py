@@ -0,0 +1,77 @@
+"""Peak memory of eager vs windowed PDF rasterization (needs poppler's pdftoppm)
+
+    python -m benchmarks.bench_raster --pages 60
+
+Each strategy runs in a fresh process so ru_maxrss reflects only that run.
+"""
+import argparse
+import io
+import os
+import tempfile
+import multiprocessing
+
+from PIL import Image, ImageDraw
+
+
+def make_scanned_pdf(path, pages):
+    """Write an image-only PDF, like a scanner produces"""
+    images = []
+    for n in range(pages):
+        image = Image.new("L", (1700, 2200), color=255)
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text((120, 120 + line * 48), f"Scanned referral page {n + 1} line {line + 1}", fill=0)
+        images.append(image)
+    images[0].save(path, "PDF", resolution=200, save_all=True, append_images=images[1:])
+
+
+def eager(pdf_path, pages):
+    # What the pipeline used to do: render everything, then encode
+    from pdf2image import convert_from_path
+
+    encoded = []
+    for image in convert_from_path(pdf_path, dpi=200):
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG")
+        encoded.append(len(buffer.getvalue()))
+    return len(encoded)
+
+
+def windowed(pdf_path, pages, to_disk=False):
+    from ocr_utils import iter_encoded_pages
+
+    return sum(1 for _ in iter_encoded_pages(pdf_path, range(1, pages + 1), dpi=200, to_disk=to_disk))
+
+
+def windowed_to_disk(pdf_path, pages):
+    return windowed(pdf_path, pages, to_disk=True)
+
+
+def measure(strategy, pdf_path, pages, results):
+    from ocr_utils import peak_rss_mb
+
+    count = strategy(pdf_path, pages)
+    results.put((strategy.__name__, count, peak_rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "scan.pdf")
+        make_scanned_pdf(pdf_path, args.pages)
+        print(f"{'strategy':>18}  {'pages':>5}  {'peak RSS (MB)':>13}")
+        for strategy in (eager, windowed, windowed_to_disk):
+            results = ctx.Queue()
+            process = ctx.Process(target=measure, args=(strategy, pdf_path, args.pages, results))
+            process.start()
+            name, count, peak = results.get()
+            process.join()
+            print(f"{name:>18}  {count:>5}  {peak:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
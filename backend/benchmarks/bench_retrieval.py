@@ -0,0 +1,86 @@
+"""Full-text prompts vs per-section retrieved passages on a long synthetic referral
+
+    python -m benchmarks.bench_retrieval --filler-paragraphs 200 --ms-per-1k-tokens 40
+
+Each section gets one planted fact hidden among filler paragraphs; the hit rate
+is the share of sections whose retrieved text still contains its fact.
+"""
+import argparse
+import os
+import random
+import time
+
+# Fact each section should be able to find, phrased the way a referral or transcript would
+PLANTED_FACTS = {
+    "introduction": "The referral was completed by her carer and she is funded through the NDIS.",
+    "about_me": "She was born in 1985, lives in postcode 3056 and loves gardening.",
+    "about_family": "Her mother is her legal guardian and helps with decisions about her care.",
+    "icf_impairment": "She was diagnosed with multiple sclerosis and uses a wheelchair because of fatigue and balance problems.",
+    "icf_activity": "She has trouble concentrating and remembering appointments and needs reminders.",
+    "icf_participation": "She used to work at a cafe but now rarely goes shopping or to community events.",
+    "icf_wellbeing": "She often feels anxious and frustrated and gets upset when plans change.",
+}
+
+FILLER = [
+    "The weather was mild on the day of the visit and the appointment ran on time.",
+    "Paperwork was signed and copies were filed with the office administrator.",
+    "Parking near the building is limited so visitors should allow extra time.",
+    "The meeting room was booked for an hour and the coordinator took notes.",
+    "Invoices for previous quarters were reviewed and no discrepancies were found.",
+    "The organisation updated its privacy policy earlier in the year.",
+]
+
+
+def synthetic_document(filler_paragraphs, seed=7):
+    rng = random.Random(seed)
+    paragraphs = [" ".join(rng.choice(FILLER) for _ in range(4)) for _ in range(filler_paragraphs)]
+    for fact in PLANTED_FACTS.values():
+        paragraphs.insert(rng.randrange(len(paragraphs) + 1), fact)
+    return "\n\n".join(paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filler-paragraphs", type=int, default=200)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=40, help="mock completion time per 1k prompt tokens")
+    args = parser.parse_args()
+
+    import benchmarks.mock_openai as mock
+
+    answer_for_prompt = mock.answer_for_prompt
+
+    def slow_answer(prompt):
+        # Completion time grows with prompt length, like a real model's prefill
+        time.sleep(len(prompt) / 4 / 1000 * args.ms_per_1k_tokens / 1000)
+        return answer_for_prompt(prompt)
+
+    mock.answer_for_prompt = slow_answer
+    server, base_url = mock.start_mock_server(latency_seconds=0)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_retrieval.db")
+
+    import main as app
+    import retrieval
+
+    text = synthetic_document(args.filler_paragraphs)
+    section_texts, stats = retrieval.build_section_texts(text, app.INTAKE_SECTION_QUERIES)
+    found = [section for section, fact in PLANTED_FACTS.items() if fact in section_texts[section]]
+
+    timings = {}
+    for enabled in (False, True):
+        retrieval.retrieval_enabled = enabled
+        start = time.perf_counter()
+        app.extract_answers_for_intake_questions(text, use_cache=False)
+        timings[enabled] = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"\ndocument: {stats['full_tokens'] // len(section_texts)} tokens in {stats['passages']} passages")
+    print(f"planted facts retrieved: {len(found)}/{len(PLANTED_FACTS)} ({', '.join(sorted(set(PLANTED_FACTS) - set(found))) or 'none missed'})")
+    print(f"sections with vocabulary hits: {stats['hit_rate']:.0%}")
+    print(f"prompt text tokens: {stats['full_tokens']} full -> {stats['sent_tokens']} retrieved ({stats['token_savings']:.0%} saved)")
+    print(f"extraction wall time: {timings[False]:.2f}s full -> {timings[True]:.2f}s retrieved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Wall-clock scaling of concurrent Textract page dispatch against a fake client
+
+    python -m benchmarks.bench_textract --pages 30 --latency 0.2
+    python -m benchmarks.bench_textract --rate-limit 5   # watch the adaptive throttle
+
+Point TEXTRACT_ENDPOINT_URL at a local moto server to exercise the real boto3
+client path in main.extract_text_with_textract instead.
+"""
+import argparse
+import time
+
+from ocr_utils import textract_pages
+from benchmarks.fakes import FakeTextractClient
+
+
+def run(pages, latency, concurrency, rate_limit):
+    client = FakeTextractClient(latency_seconds=latency, max_concurrent=rate_limit)
+    page_images = ((n, b"\xff" * 50_000) for n in range(1, pages + 1))
+    start = time.perf_counter()
+    page_texts = textract_pages(client, page_images, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    assert list(page_texts) == list(range(1, pages + 1)), "pages came back out of order or missing"
+    return elapsed, client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per detect_document_text call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rate-limit", type=int, default=None, help="fake Textract throttles above this many in flight")
+    args = parser.parse_args()
+
+    print(f"{'concurrency':>11}  {'seconds':>8}  {'speedup':>7}  {'throttled':>9}  {'peak':>4}")
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed, client = run(args.pages, args.latency, concurrency, args.rate_limit)
+        baseline = baseline or elapsed
+        print(f"{concurrency:>11}  {elapsed:>8.2f}  {baseline / elapsed:>6.1f}x  {client.throttled:>9}  {client.peak_concurrent:>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""One Whisper request vs pause-split segments transcribed in parallel, against the mock server
+
+    python -m benchmarks.bench_transcription --minutes 20 --seconds-per-mb 1.5
+
+The mock's transcription time grows with upload size, like the real API, so a
+single long request is dominated by one serial call.
+"""
+import argparse
+import io
+import math
+import os
+import random
+import struct
+import tempfile
+import time
+import wave
+
+
+def synthetic_interview_wav(minutes, frame_rate=16000, seed=3):
+    """Mono 16-bit WAV of 3-9 s "speech" bursts separated by short pauses"""
+    rng = random.Random(seed)
+    frames = bytearray()
+    total = int(minutes * 60 * frame_rate)
+    while len(frames) // 2 < total:
+        burst = int(rng.uniform(3, 9) * frame_rate)
+        pitch = rng.uniform(120, 260)
+        for n in range(burst):
+            # A tone with noise is loud enough to never read as silence
+            sample = 0.4 * math.sin(2 * math.pi * pitch * n / frame_rate) + rng.uniform(-0.1, 0.1)
+            frames += struct.pack("<h", int(sample * 32767))
+        frames += b"\x00\x00" * int(rng.uniform(0.6, 1.2) * frame_rate)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(frame_rate)
+        wav.writeframes(bytes(frames[: total * 2]))
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=20)
+    parser.add_argument("--seconds-per-mb", type=float, default=1.5, help="mock transcription seconds per MB uploaded")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    from benchmarks.mock_openai import start_mock_server
+
+    server, base_url = start_mock_server(transcription_latency_seconds=0.3, transcription_seconds_per_mb=args.seconds_per_mb)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_transcription.db")
+
+    import audio_segments
+    import main as app
+
+    audio = synthetic_interview_wav(args.minutes)
+    print(f"\n{args.minutes:.0f} min recording, {len(audio) / 1_000_000:.1f} MB")
+
+    results = {}
+    with tempfile.NamedTemporaryFile(suffix=".wav") as spooled:
+        spooled.write(audio)
+        spooled.flush()
+        for name, split_min_seconds in (("single request", float("inf")), ("segmented", 0)):
+            audio_segments.audio_split_min_seconds = split_min_seconds
+            audio_segments.transcription_concurrency = args.concurrency
+            start = time.perf_counter()
+            transcript = app.transcribe_audio(spooled.name, "interview.wav")
+            results[name] = time.perf_counter() - start
+            assert transcript, f"{name} transcription failed"
+    server.shutdown()
+
+    single = results["single request"]
+    print(f"{'strategy':>15}  {'wall s':>7}  {'speedup':>7}")
+    for name, wall in results.items():
+        print(f"{name:>15}  {wall:>7.2f}  {single / wall:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic referral corpus: text, scanned and mixed PDFs plus recorded interviews
+
+    python -m benchmarks.corpus ./corpus --pdfs 5 --pages 3 --audio-seconds 30 300
+
+PDFs are assembled by hand so only Pillow is needed. Text pages carry a real
+text layer; scanned pages are a single grayscale image with no text, so the
+pipeline has to rasterize and OCR them. The same files can be fed to
+`python -m batch`.
+"""
+import argparse
+import os
+import random
+import zlib
+
+from PIL import Image, ImageDraw
+
+from benchmarks.bench_retrieval import synthetic_document
+from benchmarks.bench_transcription import synthetic_interview_wav
+
+PDF_KINDS = ("text", "scanned", "mixed")
+LINES_PER_PAGE = 30
+SCAN_SIZE = (850, 1100)  # a letter page at 100 dpi
+
+
+def page_lines(seed, pages):
+    """LINES_PER_PAGE short lines of referral prose per page"""
+    words = synthetic_document(pages * 6, seed=seed).split()
+    rng = random.Random(seed)
+    lines, line = [], []
+    for word in words:
+        line.append(word)
+        if len(line) >= rng.randint(9, 13):
+            lines.append(" ".join(line))
+            line = []
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines += lines
+    return [lines[n * LINES_PER_PAGE:(n + 1) * LINES_PER_PAGE] for n in range(pages)]
+
+
+def pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def scanned_image(lines):
+    """Flate-compressed grayscale pixels of a page of typed lines"""
+    image = Image.new("L", SCAN_SIZE, color=255)
+    draw = ImageDraw.Draw(image)
+    for n, line in enumerate(lines):
+        draw.text((60, 60 + n * 32), line, fill=0)
+    return zlib.compress(image.tobytes())
+
+
+def build_pdf(page_kinds, seed=0):
+    """A PDF with one page per entry in page_kinds ("text" or "scanned")"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for kind, lines in zip(page_kinds, page_lines(seed, len(page_kinds))):
+        if kind == "text":
+            body = "\n".join(f"({pdf_escape(line)}) Tj 0 -22 Td" for line in lines)
+            stream = f"BT /F1 11 Tf 50 750 Td\n{body}\nET".encode("latin-1", "replace")
+            resources = "<< /Font << /F1 3 0 R >> >>"
+        else:
+            pixels = scanned_image(lines)
+            objects.append(
+                f"<< /Type /XObject /Subtype /Image /Width {SCAN_SIZE[0]} /Height {SCAN_SIZE[1]} "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>".encode()
+                + b"\nstream\n" + pixels + b"\nendstream"
+            )
+            resources = f"<< /XObject << /Im1 {len(objects)} 0 R >> >>"
+            stream = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources {resources} /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + (body if isinstance(body, bytes) else body.encode("latin-1")) + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def referral_pdf(kind, pages=3, seed=0):
+    """A text, scanned or mixed (alternating, starting with text) referral"""
+    if kind == "text":
+        page_kinds = ["text"] * pages
+    elif kind == "scanned":
+        page_kinds = ["scanned"] * pages
+    else:
+        page_kinds = ["text" if n % 2 == 0 else "scanned" for n in range(pages)]
+    return build_pdf(page_kinds, seed)
+
+
+def interview_audio(seconds, seed=3):
+    """Mono 16 kHz WAV of speech-like bursts and pauses"""
+    return synthetic_interview_wav(seconds / 60, seed=seed)
+
+
+def write_corpus(directory, pdfs_per_kind, pages, audio_seconds):
+    """Write the corpus and return the paths written"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for kind in PDF_KINDS:
+        for n in range(pdfs_per_kind):
+            paths.append(os.path.join(directory, f"{kind}_{n:02}.pdf"))
+            with open(paths[-1], "wb") as f:
+                f.write(referral_pdf(kind, pages, seed=n))
+    for n, seconds in enumerate(audio_seconds):
+        paths.append(os.path.join(directory, f"interview_{seconds:g}s.wav"))
+        with open(paths[-1], "wb") as f:
+            f.write(interview_audio(seconds, seed=n))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--pdfs", type=int, default=5, help="PDFs of each kind")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--audio-seconds", type=float, nargs="*", default=[30, 300])
+    args = parser.parse_args()
+
+    paths = write_corpus(args.directory, args.pdfs, args.pages, args.audio_seconds)
+    total = sum(os.path.getsize(path) for path in paths)
+    print(f"🧪 Wrote {len(paths)} files ({total / 1_000_000:.1f} MB) to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
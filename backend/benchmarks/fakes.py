@@ -0,0 +1,49 @@
+import time
+import threading
+
+
+class ThrottlingException(Exception):
+    """Same shape as botocore's ClientError for a throttled Textract call"""
+
+    def __init__(self):
+        super().__init__("Rate exceeded")
+        self.response = {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}
+
+
+class FakeTextractClient:
+    """Stand-in for boto3's Textract client with fixed latency and an optional rate limit
+
+    When `max_concurrent` is set, calls beyond that many in flight raise
+    ThrottlingException, like Textract's per-account TPS limit.
+    """
+
+    def __init__(self, latency_seconds=0.2, max_concurrent=None, lines_per_page=20):
+        self.latency_seconds = latency_seconds
+        self.max_concurrent = max_concurrent
+        self.lines_per_page = lines_per_page
+        self.calls = 0
+        self.throttled = 0
+        self.peak_concurrent = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def detect_document_text(self, Document):
+        with self._lock:
+            self.calls += 1
+            if self.max_concurrent is not None and self._in_flight >= self.max_concurrent:
+                self.throttled += 1
+                raise ThrottlingException()
+            self._in_flight += 1
+            self.peak_concurrent = max(self.peak_concurrent, self._in_flight)
+        try:
+            time.sleep(self.latency_seconds)
+            size = len(Document["Bytes"])
+            blocks = [{"BlockType": "PAGE"}]
+            blocks += [
+                {"BlockType": "LINE", "Text": f"Scanned line {i + 1} of a {size} byte page"}
+                for i in range(self.lines_per_page)
+            ]
+            return {"Blocks": blocks}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
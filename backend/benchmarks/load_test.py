@@ -0,0 +1,84 @@
+"""N concurrent uploads on one worker should finish in about the time of one
+
+    python -m benchmarks.load_test --concurrency 1 8 --latency 1.0
+    python -m benchmarks.load_test --url http://127.0.0.1:8000   # against a running uvicorn
+
+Without --url the app runs in-process on this event loop (one worker) with
+OpenAI pointed at the local mock server, so any blocking call on the loop
+shows up as requests serializing.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.corpus import referral_pdf
+from benchmarks.mock_openai import start_mock_server
+
+
+async def upload(client, endpoint, pdf_bytes):
+    start = time.perf_counter()
+    response = await client.post(
+        endpoint,
+        params={"no_cache": "true"},
+        files={"file": ("referral.pdf", pdf_bytes, "application/pdf")},
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run_level(client, endpoint, concurrency, pdf_bytes):
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(upload(client, endpoint, pdf_bytes) for _ in range(concurrency)))
+    return time.perf_counter() - start, max(latencies)
+
+
+async def run(args):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=300)
+    else:
+        import main
+        import migrate
+
+        # ASGITransport doesn't run the app's lifespan, so create the tables here
+        migrate.run_migrations()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test", timeout=300)
+
+    # Also hit / while uploads are in flight - it must not wait behind them
+    pdf_bytes = referral_pdf("text")
+    async with client:
+        # Warm-up so client/pool creation doesn't land in the first measurement
+        await upload(client, args.endpoint, pdf_bytes)
+        print(f"{'concurrency':>11}  {'wall s':>7}  {'vs one':>6}  {'GET / ms':>8}")
+        single = None
+        for concurrency in args.concurrency:
+            uploads = asyncio.create_task(run_level(client, args.endpoint, concurrency, pdf_bytes))
+            await asyncio.sleep(args.latency / 4)
+            probe_start = time.perf_counter()
+            (await client.get("/")).raise_for_status()
+            probe_ms = (time.perf_counter() - probe_start) * 1000
+            wall, _ = await uploads
+            single = single or wall
+            print(f"{concurrency:>11}  {wall:>7.2f}  {wall / single:>5.1f}x  {probe_ms:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=1.0, help="mock OpenAI seconds per completion")
+    parser.add_argument("--endpoint", default="/parse-pdf-for-intake")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    args = parser.parse_args()
+
+    if not args.url:
+        _, base_url = start_mock_server(latency_seconds=args.latency)
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ.setdefault("OPENAI_API_KEY", "test")
+        os.environ.setdefault("DATABASE_URL", "sqlite:///./load_test.db")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
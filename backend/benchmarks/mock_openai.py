@@ -0,0 +1,171 @@
+"""Local stand-in for the OpenAI chat completions and audio transcription APIs
+
+    python -m benchmarks.mock_openai --port 8100 --latency 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=test uvicorn main:app
+
+Chat completions answer every dotted field name found in the prompt
+(e.g. "introduction.new_participant") so the backend's JSON parsing works.
+A patched answer_for_prompt may return a raw string to simulate malformed output.
+
+Prompt caching is simulated the way OpenAI documents it: once a prompt is
+1024+ tokens, the longest prefix (in 128-token steps) of an earlier, already
+finished request is reported as cached_tokens, and only the uncached tokens add
+prompt latency. Requests in flight at the same time don't see each other's prefixes.
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIELD_PATTERN = re.compile(r'"([a-z_]+(?:\.[a-z_]+)+)"')
+CHARS_PER_TOKEN = 4
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+BASIC_FIELDS = {
+    "patient_name": "Jane Citizen",
+    "date_of_birth": "1980-01-01",
+    "primary_diagnosis": "Multiple Sclerosis",
+}
+
+
+def answer_for_prompt(prompt):
+    fields = list(dict.fromkeys(FIELD_PATTERN.findall(prompt)))
+    if not fields:
+        return BASIC_FIELDS
+    return {field: "Unknown" for field in fields}
+
+
+class PrefixCache:
+    """Hashes of every 128-token prefix seen so far"""
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _prefixes(self, prompt):
+        step = CACHE_STEP_TOKENS * CHARS_PER_TOKEN
+        boundaries = range(CACHE_MIN_TOKENS * CHARS_PER_TOKEN, len(prompt) + 1, step)
+        return [(end // CHARS_PER_TOKEN, hashlib.sha256(prompt[:end].encode("utf-8")).digest()) for end in boundaries]
+
+    def lookup(self, prompt):
+        """Tokens of prompt covered by a prefix of an earlier finished request"""
+        cached = 0
+        with self._lock:
+            for tokens, digest in self._prefixes(prompt):
+                if digest not in self._seen:
+                    break
+                cached = tokens
+        return cached
+
+    def store(self, prompt):
+        prefixes = self._prefixes(prompt)
+        with self._lock:
+            self._seen.update(digest for _, digest in prefixes)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between calls
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency_seconds = 0.05
+    transcription_latency_seconds = 0.2
+    transcription_seconds_per_mb = 0.0
+    prompt_seconds_per_1k_tokens = 0.0
+    prefix_cache = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self.path.endswith("/chat/completions"):
+            request = json.loads(body)
+            prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+            prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+            cached_tokens = self.prefix_cache.lookup(prompt) if self.prefix_cache else 0
+            time.sleep(self.latency_seconds + (prompt_tokens - cached_tokens) / 1000 * self.prompt_seconds_per_1k_tokens)
+            if self.prefix_cache:
+                self.prefix_cache.store(prompt)
+            answer = answer_for_prompt(prompt)
+            content = answer if isinstance(answer, str) else json.dumps(answer)
+            completion_tokens = len(content) // CHARS_PER_TOKEN
+            self._send(200, json.dumps({
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-3.5-turbo"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                },
+            }))
+        elif self.path.endswith("/audio/transcriptions"):
+            # Real transcription time grows with the length of the recording
+            time.sleep(self.transcription_latency_seconds + length / 1_000_000 * self.transcription_seconds_per_mb)
+            transcript = f"Mock transcript of a {length} byte recording."
+            if b'name="response_format"\r\n\r\ntext' in body:
+                self._send(200, transcript, content_type="text/plain")
+            else:
+                self._send(200, json.dumps({"text": transcript}))
+        else:
+            self._send(404, json.dumps({"error": {"message": f"No mock for {self.path}"}}))
+
+
+def start_mock_server(latency_seconds=0.05, transcription_latency_seconds=0.2, port=0, transcription_seconds_per_mb=0.0,
+                      prompt_seconds_per_1k_tokens=0.0):
+    """Start the mock in a background thread and return (server, base_url)"""
+    handler = type("ConfiguredHandler", (MockOpenAIHandler,), {
+        "latency_seconds": latency_seconds,
+        "transcription_latency_seconds": transcription_latency_seconds,
+        "transcription_seconds_per_mb": transcription_seconds_per_mb,
+        "prompt_seconds_per_1k_tokens": prompt_seconds_per_1k_tokens,
+        "prefix_cache": PrefixCache(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per chat completion")
+    parser.add_argument("--transcription-latency", type=float, default=0.2, help="seconds per transcription")
+    parser.add_argument("--transcription-seconds-per-mb", type=float, default=0.0, help="extra seconds per MB of audio")
+    parser.add_argument("--prompt-seconds-per-1k-tokens", type=float, default=0.0, help="extra seconds per 1k uncached prompt tokens")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.latency, args.transcription_latency, args.port, args.transcription_seconds_per_mb,
+        args.prompt_seconds_per_1k_tokens,
+    )
+    print(f"🧪 Mock OpenAI listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Local stand-in for Textract's detect_document_text, for boto3 to talk to over HTTP
+
+    python -m benchmarks.mock_textract --port 8101 --latency 0.2
+    TEXTRACT_ENDPOINT_URL=http://127.0.0.1:8101 AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test uvicorn main:app
+
+Speaks the JSON protocol boto3 uses, so the real client, its connection pool
+and our adaptive throttle are all exercised. With --rate-limit, calls beyond that
+many in flight get a ThrottlingException like Textract's per-account TPS limit.
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockTextractHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency_seconds = 0.2
+    max_concurrent = None
+    lines_per_page = 20
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        target = self.headers.get("X-Amz-Target", "")
+        if target != "Textract.DetectDocumentText":
+            self._send(400, {"__type": "UnsupportedOperationException", "message": f"No mock for {target}"})
+            return
+
+        state = self.state
+        with state["lock"]:
+            state["calls"] += 1
+            if self.max_concurrent is not None and state["in_flight"] >= self.max_concurrent:
+                state["throttled"] += 1
+                self._send(400, {"__type": "ThrottlingException", "message": "Rate exceeded"})
+                return
+            state["in_flight"] += 1
+        try:
+            time.sleep(self.latency_seconds)
+            size = len(base64.b64decode(request.get("Document", {}).get("Bytes", "")))
+            blocks = [{"BlockType": "PAGE", "Id": "page"}]
+            blocks += [
+                {"BlockType": "LINE", "Id": f"line-{i}", "Text": f"Scanned line {i + 1} of a {size} byte page"}
+                for i in range(self.lines_per_page)
+            ]
+            self._send(200, {"DocumentMetadata": {"Pages": 1}, "Blocks": blocks})
+        finally:
+            with state["lock"]:
+                state["in_flight"] -= 1
+
+
+def start_mock_textract(latency_seconds=0.2, port=0, max_concurrent=None, lines_per_page=20):
+    """Start the mock in a background thread and return (server, endpoint_url)"""
+    handler = type("ConfiguredHandler", (MockTextractHandler,), {
+        "latency_seconds": latency_seconds,
+        "max_concurrent": max_concurrent,
+        "lines_per_page": lines_per_page,
+        "state": {"calls": 0, "throttled": 0, "in_flight": 0, "lock": threading.Lock()},
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per detect_document_text call")
+    parser.add_argument("--rate-limit", type=int, default=None, help="throttle above this many calls in flight")
+    args = parser.parse_args()
+
+    server, endpoint_url = start_mock_textract(args.latency, args.port, args.rate_limit)
+    print(f"🧪 Mock Textract listening on {endpoint_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
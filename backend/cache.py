@@ -0,0 +1,167 @@
+import os
+import time
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+
+# PDF text cache configuration
+pdf_cache_max_bytes = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+pdf_cache_dir = os.getenv("PDF_CACHE_DIR")  # On-disk tier is off unless a directory is set
+
+# LLM response cache configuration
+llm_cache_max_bytes = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+llm_cache_ttl_seconds = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+
+def sha256_of_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_of_path(path):
+    """Hash a file on disk through mmap, without reading it into a bytes object"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+    return digest.hexdigest()
+
+
+# In-memory tier
+class LRUCache:
+    """Least-recently-used cache of strings bounded by total size in bytes"""
+
+    def __init__(self, max_bytes, ttl_seconds=None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, stored_at = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.current_bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size, time.time())
+            self.current_bytes += size
+            # Evict least recently used entries until we fit again
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# On-disk tier
+class DiskCache:
+    """One file per key in a directory, so entries survive restarts"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        # Write to a temp file first so readers never see a half-written entry
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk cache, with hit/miss counters"""
+
+    def __init__(self, max_bytes, directory=None, ttl_seconds=None):
+        self.memory = LRUCache(max_bytes, ttl_seconds)
+        self.disk = DiskCache(directory) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._count("hits")
+                self._count("disk_hits")
+                self.memory.set(key, value)
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except OSError as e:
+                print(f"❌ Could not write cache entry to disk: {e}")
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes,
+            "max_memory_bytes": self.memory.max_bytes,
+            "disk_enabled": self.disk is not None,
+        }
+
+
+# Extracted PDF text keyed by SHA-256 of the PDF bytes
+pdf_text_cache = TieredCache(pdf_cache_max_bytes, pdf_cache_dir)
+
+# Parsed LLM answers - memory only, entries expire after LLM_CACHE_TTL_SECONDS
+llm_response_cache = TieredCache(llm_cache_max_bytes, ttl_seconds=llm_cache_ttl_seconds)
+
+
+def llm_cache_key(prompt_template, model, text):
+    """Key on prompt version, model and normalized text
+
+    The prompt version is a hash of the template, so editing a prompt
+    invalidates its old entries without any manual bump.
+    """
+    prompt_version = sha256_of_text(prompt_template)[:12]
+    normalized_text = " ".join(text.split())
+    return f"{prompt_version}:{model}:{sha256_of_text(normalized_text)}"
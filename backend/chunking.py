@@ -0,0 +1,120 @@
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Token budget per LLM request (prompt template + document text)
+llm_token_budget = int(os.getenv("LLM_TOKEN_BUDGET", "12000"))
+chunk_overlap_tokens = int(os.getenv("LLM_CHUNK_OVERLAP_TOKENS", "200"))
+
+PAGE_MARKER_PATTERN = re.compile(r"(?=^--- Page \d+ ---$)", re.MULTILINE)
+# Finer and finer boundaries to fall back on when a page is over budget
+UNIT_SEPARATORS = (r"\n\s*\n", r"\n", r"(?<=[.!?])\s+")
+UNKNOWN = "Unknown"
+
+
+@lru_cache(maxsize=None)
+def _encoder(model):
+    """tiktoken encoder for the model, or None when tiktoken isn't installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    encoder = _encoder(model)
+    if encoder is None:
+        return len(text) // 4 + 1  # ~4 characters per token for English
+    return len(encoder.encode(text))
+
+
+def split_units(text, max_tokens, model):
+    """Split on pages, then paragraphs, lines and sentences until every unit fits max_tokens"""
+    units = []
+    for page in PAGE_MARKER_PATTERN.split(text):
+        if not page.strip():
+            continue
+        if count_tokens(page, model) <= max_tokens:
+            units.append(page)
+            continue
+        for separator in UNIT_SEPARATORS:
+            # Keep each separator attached to the piece before it so chunks rejoin to the original text
+            parts = re.split(f"({separator})", page)
+            pieces = ["".join(parts[i:i + 2]) for i in range(0, len(parts), 2) if parts[i].strip()]
+            if all(count_tokens(piece, model) <= max_tokens for piece in pieces):
+                units.extend(pieces)
+                break
+        else:
+            # A single enormous sentence - fall back to fixed-size character slices
+            step = max_tokens * 4
+            units.extend(page[i:i + step] for i in range(0, len(page), step))
+    return units
+
+
+def chunk_text(text, max_tokens, overlap_tokens=None, model="gpt-3.5-turbo"):
+    """Pack page/paragraph units into chunks of at most max_tokens, repeating the tail of each chunk at the start of the next"""
+    overlap_tokens = chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    chunks, current, current_tokens = [], [], 0
+    for unit in split_units(text, max_tokens, model):
+        unit_tokens = count_tokens(unit, model)
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("".join(current))
+            # Carry whole trailing units forward as overlap, so nothing is cut mid-sentence
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = count_tokens(previous, model)
+                if carried_tokens + previous_tokens > overlap_tokens or carried_tokens + previous_tokens + unit_tokens > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def reduce_answers(partials, specs):
+    """Merge per-chunk answers into one set - deterministic for the same chunk order
+
+    - "Unknown" never overrides a real value
+    - list fields take the union of items in first-seen order
+    - free text keeps every distinct value in chunk order, joined with "; "
+    - single-choice and numeric fields take the most common value, ties going to the earliest chunk
+    """
+    reduced = {}
+    for key, spec in specs.items():
+        values = [partial[key] for partial in partials if key in partial and partial[key] != UNKNOWN]
+        if not values:
+            reduced[key] = UNKNOWN
+            continue
+
+        kind = spec["kind"]
+        if kind == "multi":
+            items = []
+            for value in values:
+                for item in value if isinstance(value, list) else [value]:
+                    if item not in items:
+                        items.append(item)
+            reduced[key] = items
+        elif kind == "text":
+            distinct = []
+            for value in values:
+                value = "; ".join(value) if isinstance(value, list) else str(value)
+                if value not in distinct:
+                    distinct.append(value)
+            reduced[key] = "; ".join(distinct)
+        else:
+            counts = Counter(values)
+            best = max(counts.values())
+            reduced[key] = next(value for value in values if counts[value] == best)
+    return reduced
@@ -0,0 +1,86 @@
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Index
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.dialects.postgresql import JSONB
+
+load_dotenv()
+
+# Database setup
+database_url = os.getenv("DATABASE_URL")
+db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # drop connections the server closed
+
+
+def engine_options(url):
+    """Connection pool settings - SQLite keeps SQLAlchemy's defaults"""
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": db_pool_size, "max_overflow": db_max_overflow, "pool_pre_ping": db_pool_pre_ping}
+
+
+engine = create_engine(database_url, **engine_options(database_url))
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
+
+
+# Patient data model
+class Patient(Base):
+    __tablename__ = "patients"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_name = Column(String)
+    date_of_birth = Column(String)
+    primary_diagnosis = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Serves the newest-first keyset pagination on /patients
+    __table_args__ = (Index("ix_patients_created_at_id", "created_at", "id"),)
+
+
+# Full intake answer sets - JSONB on Postgres, JSON text queried through JSON1 on SQLite
+AnswersJSON = JSON().with_variant(JSONB(), "postgresql")
+
+# Multi-select keys that cohort queries filter on, each with its own GIN index on Postgres
+INDEXED_ANSWER_KEYS = {
+    "diagnosis": "icf_impairment.diagnoses",
+    "funding_source": "introduction.funding_source",
+}
+# ICF scores are copied out of the answers into indexed columns for range filters
+ANSWER_SCORE_COLUMNS = {
+    "impairment_score": "icf_impairment.impairment_score.score",
+    "participation_score": "icf_participation.score.score",
+    "wellbeing_score": "icf_wellbeing.score.score",
+}
+
+
+class IntakeAnswerSet(Base):
+    __tablename__ = "intake_answer_sets"
+
+    id = Column(Integer, primary_key=True)
+    source_filename = Column(String)
+    source_kind = Column(String)  # "pdf" or "audio"
+    answers = Column(AnswersJSON, nullable=False)
+    impairment_score = Column(Float)
+    participation_score = Column(Float)
+    wellbeing_score = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_intake_answer_sets_created_at_id", "created_at", "id"),
+        Index("ix_intake_answer_sets_impairment_score", "impairment_score"),
+        Index("ix_intake_answer_sets_participation_score", "participation_score"),
+        Index("ix_intake_answer_sets_wellbeing_score", "wellbeing_score"),
+        # Containment (@>) on any answer key
+        Index(
+            "ix_intake_answer_sets_answers", "answers",
+            postgresql_using="gin", postgresql_ops={"answers": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        *(
+            Index(f"ix_intake_answer_sets_{name}", text(f"(answers -> '{key}')"), postgresql_using="gin").ddl_if(dialect="postgresql")
+            for name, key in INDEXED_ANSWER_KEYS.items()
+        ),
+    )
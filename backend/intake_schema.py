@@ -0,0 +1,298 @@
+import os
+import re
+import json
+from metrics import json_parse_failures
+
+# Ask for strict json_schema output instead of plain JSON mode (needs a model that supports it)
+llm_structured_outputs = os.getenv("LLM_STRUCTURED_OUTPUTS", "false").lower() == "true"
+
+UNKNOWN = "Unknown"
+
+FIELD_LINE_PATTERN = re.compile(r'^\s*- "([^"]+)" \((.*)\)\s*$')
+KEY_VALUE_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*')
+
+# Fields for the basic patient extraction and the 7 demo questions
+PATIENT_FIELD_SPECS = {
+    "patient_name": {"kind": "text"},
+    "date_of_birth": {"kind": "date", "format": "YYYY-MM-DD"},
+    "primary_diagnosis": {"kind": "text"},
+}
+
+DEMO_QUESTION_FIELD_SPECS = {
+    "introduction.new_participant": {"kind": "enum", "options": ["Yes", "No"]},
+    "icf_impairment.diagnoses": {"kind": "text"},
+    "wellbeing.frequency": {"kind": "enum", "options": ["Never", "Rarely", "Occasionally", "Often", "Almost always"]},
+    "icf_impairment.mobility_support_level": {"kind": "number", "min": 0, "max": 10},
+    "about_you.living_situation": {"kind": "text"},
+    "family.carer_wellbeing": {"kind": "enum", "options": ["None", "Mild", "Moderate", "Severe", "Extreme", "Not Applicable"]},
+    "icf_impairment.score": {"kind": "score"},
+}
+
+REPAIR_PROMPT = """
+        Some fields were missing or invalid in a previous answer. Re-read the text in the next message and answer ONLY these fields.
+
+        FIELDS:
+{fields}
+
+        RETURN AS JSON with these exact field names. For any information that is missing or unclear, use "Unknown".
+        """
+
+
+# Options whose own text contains a comma outside parentheses, so a plain comma split would break them up
+OPTIONS_WITH_COMMAS = (
+    "Australian - from an English speaking, Anglo-Celtic background",
+)
+
+
+def split_on_commas(text):
+    """Split "A, B (x, y), C" on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def join_known_options(parts, options):
+    """Rejoin neighbouring parts that together spell one of options, longest match first"""
+    joined, start = [], 0
+    while start < len(parts):
+        end = next(
+            (end for end in range(len(parts), start + 1, -1) if _match_option(", ".join(parts[start:end]), options)),
+            start + 1
+        )
+        joined.append(", ".join(parts[start:end]))
+        start = end
+    return joined
+
+
+def split_options(options_text):
+    """Split a prompt's option list, keeping the OPTIONS_WITH_COMMAS entries whole"""
+    return join_known_options(split_on_commas(options_text), OPTIONS_WITH_COMMAS)
+
+
+def parse_field_annotation(annotation):
+    """Turn a prompt annotation like "(Yes/No)" or "(list from: ...)" into a field spec"""
+    if annotation.startswith("match to:"):
+        return {"kind": "enum", "options": split_options(annotation[len("match to:"):])}
+    if annotation.startswith("list from:"):
+        return {"kind": "multi", "options": split_options(annotation[len("list from:"):])}
+    if annotation.startswith("0-5:"):
+        return {"kind": "scale", "options": [o.strip() for o in annotation[len("0-5:"):].split("/")]}
+    if "0-5 with 0.5 increments" in annotation:
+        return {"kind": "score"}
+    if annotation.startswith("extract date as"):
+        return {"kind": "date", "format": annotation[len("extract date as"):].strip()}
+    if annotation.endswith("as number"):
+        return {"kind": "number"}
+    if annotation.startswith("extract") or annotation.startswith("if "):
+        return {"kind": "text"}
+    if re.fullmatch(r"[A-Za-z ]+(/[A-Za-z ]+)+", annotation):
+        return {"kind": "enum", "options": annotation.split("/")}
+    return {"kind": "text"}
+
+
+def build_field_specs(field_block):
+    """Build {key: spec} from a prompt's `- "key" (annotation)` lines"""
+    specs = {}
+    for line in field_block.splitlines():
+        match = FIELD_LINE_PATTERN.match(line)
+        if match:
+            specs[match.group(1)] = parse_field_annotation(match.group(2))
+    return specs
+
+
+def describe_spec(spec):
+    kind = spec["kind"]
+    if kind in ("enum", "scale"):
+        extra = " or the number 0-5" if kind == "scale" else ""
+        return "one of: " + "/".join(spec["options"]) + extra
+    if kind == "multi":
+        return "list from: " + ", ".join(spec["options"])
+    if kind == "score":
+        return "number 0-5 with 0.5 increments"
+    if kind == "number":
+        return "number"
+    if kind == "date":
+        return f"date as {spec['format']}"
+    return "text"
+
+
+def build_repair_prompt(specs):
+    """System message for a repair request - the text goes in the following user message"""
+    fields = "\n".join(f'        - "{key}" ({describe_spec(spec)})' for key, spec in specs.items())
+    return REPAIR_PROMPT.format(fields=fields)
+
+
+# Response format
+def json_schema_for(specs):
+    """Strict JSON schema for structured-output models - every field required, Unknown always allowed"""
+    unknown = {"type": "string", "enum": [UNKNOWN]}
+    properties = {}
+    for key, spec in specs.items():
+        kind = spec["kind"]
+        if kind == "enum":
+            prop = {"type": "string", "enum": spec["options"] + [UNKNOWN]}
+        elif kind == "scale":
+            prop = {"anyOf": [{"type": "string", "enum": spec["options"] + [UNKNOWN]}, {"type": "number"}]}
+        elif kind == "multi":
+            prop = {"anyOf": [{"type": "array", "items": {"type": "string"}}, {"type": "string"}]}
+        elif kind in ("score", "number"):
+            prop = {"anyOf": [{"type": "number"}, unknown]}
+        else:
+            prop = {"type": "string"}
+        properties[key] = prop
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(specs),
+        "additionalProperties": False,
+    }
+
+
+def response_format_for(specs, name):
+    """JSON mode by default, strict json_schema output when LLM_STRUCTURED_OUTPUTS is on"""
+    if llm_structured_outputs:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": name, "schema": json_schema_for(specs), "strict": True},
+        }
+    return {"type": "json_object"}
+
+
+# Tolerant parsing
+def strip_code_fences(text):
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+    return fenced.group(1).strip() if fenced else text
+
+
+def salvage_json_object(text):
+    """Parse a JSON object, recovering whatever key/value pairs survive truncation or junk"""
+    text = strip_code_fences(text or "")
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(text[start:end + 1])
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    json_parse_failures.inc()
+
+    # Walk `"key": value` pairs one at a time, keeping every value that decodes
+    decoder = json.JSONDecoder()
+    salvaged = {}
+    position = max(start, 0)
+    while True:
+        match = KEY_VALUE_PATTERN.search(text, position)
+        if not match:
+            break
+        try:
+            value, position = decoder.raw_decode(text, match.end())
+        except json.JSONDecodeError:
+            position = match.end()
+            continue
+        salvaged[json.loads(f'"{match.group(1)}"')] = value
+    return salvaged
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return None
+        return int(number) if number.is_integer() else number
+    return None
+
+
+def _match_option(value, options):
+    if not isinstance(value, str):
+        return None
+    for option in options:
+        if value.strip().lower() == option.lower():
+            return option
+    return None
+
+
+def normalize_value(value, spec):
+    """Return the cleaned value, or raise ValueError if it doesn't fit the field's spec"""
+    if isinstance(value, str) and value.strip().lower() == UNKNOWN.lower():
+        return UNKNOWN
+    if value is None:
+        raise ValueError("null")
+
+    kind = spec["kind"]
+    if kind == "enum":
+        option = _match_option(value, spec["options"])
+        if option is None:
+            raise ValueError(f"{value!r} is not one of {spec['options']}")
+        return option
+    if kind == "scale":
+        option = _match_option(value, spec["options"])
+        if option is not None:
+            return option
+        number = _as_number(value)
+        if number is None or not 0 <= number <= 5:
+            raise ValueError(f"{value!r} is not a 0-5 rating")
+        return number
+    if kind == "score":
+        number = _as_number(value)
+        if number is None or not 0 <= number <= 5 or (number * 2) % 1:
+            raise ValueError(f"{value!r} is not a 0-5 score in 0.5 steps")
+        return number
+    if kind == "number":
+        number = _as_number(value)
+        if number is None:
+            raise ValueError(f"{value!r} is not a number")
+        if ("min" in spec and number < spec["min"]) or ("max" in spec and number > spec["max"]):
+            raise ValueError(f"{value!r} is out of range")
+        return number
+    if kind == "date":
+        pattern = r"\d{4}-\d{2}-\d{2}" if spec["format"] == "YYYY-MM-DD" else r"\d{1,2}/\d{1,2}/\d{4}"
+        if not isinstance(value, str) or not re.fullmatch(pattern, value.strip()):
+            raise ValueError(f"{value!r} is not a {spec['format']} date")
+        return value.strip()
+    if kind == "multi":
+        items = value if isinstance(value, list) else [value]
+        if not all(isinstance(item, str) for item in items):
+            raise ValueError(f"{value!r} is not a list of options")
+        # Always a list, even when the model answered with one comma-separated string
+        items = [part for item in items for part in join_known_options(split_on_commas(item), spec["options"])]
+        # Canonicalize the casing of known options, keep anything else the model named
+        return [_match_option(item, spec["options"]) or item for item in items]
+    if isinstance(value, (dict, list)) and kind == "text":
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return value
+        raise ValueError("expected text")
+    return value
+
+
+def parse_answers(result_text, specs):
+    """Salvage valid fields from a completion; return (answers, keys still missing or invalid)"""
+    raw = salvage_json_object(result_text)
+    answers, bad_keys = {}, []
+    for key, spec in specs.items():
+        if key not in raw:
+            bad_keys.append(key)
+            continue
+        try:
+            answers[key] = normalize_value(raw[key], spec)
+        except ValueError:
+            print(f"⚠️ Invalid value for {key}")
+            bad_keys.append(key)
+    return answers, bad_keys
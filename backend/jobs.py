@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from tracing import trace_request, current_request_id
+
+# Job queue configuration
+job_workers = int(os.getenv("JOB_WORKERS", "2"))
+job_queue_depth = int(os.getenv("JOB_QUEUE_DEPTH", "20"))
+job_ttl_seconds = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+job_store_backend = os.getenv("JOB_STORE", "memory")  # "memory" or "sql"
+job_store_url = os.getenv("JOB_STORE_URL", "sqlite:///jobs.db")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+# In-process job store
+class InMemoryJobStore:
+    """Keep job records in a dict - jobs are lost on restart"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """Nothing to set up for a dict"""
+
+    def create(self, job_id, kind):
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": JOB_QUEUED,
+                "result": None,
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["updated_at"] = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def purge_expired(self, ttl_seconds):
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in FINISHED_STATES and job["updated_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+# SQL job store (SQLite file or a Postgres table)
+class SQLJobStore:
+    """Keep job records in an `intake_jobs` table so they survive restarts"""
+
+    def __init__(self, url):
+        from sqlalchemy import create_engine, MetaData, Table, Column, String, Text, Float
+
+        self._engine = create_engine(url)
+        metadata = MetaData()
+        self._table = Table(
+            "intake_jobs",
+            metadata,
+            Column("job_id", String(36), primary_key=True),
+            Column("kind", String(64)),
+            Column("status", String(16), index=True),
+            Column("result", Text),
+            Column("error", Text),
+            Column("created_at", Float),
+            Column("updated_at", Float, index=True),
+        )
+        self._metadata = metadata
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def prepare(self):
+        """Create the table on first use (or from the warm-up), not at import"""
+        if self._ready:
+            return
+        with self._ready_lock:
+            if not self._ready:
+                self._metadata.create_all(self._engine)
+                self._ready = True
+
+    def create(self, job_id, kind):
+        self.prepare()
+        now = time.time()
+        with self._engine.begin() as conn:
+            conn.execute(self._table.insert().values(
+                job_id=job_id,
+                kind=kind,
+                status=JOB_QUEUED,
+                created_at=now,
+                updated_at=now,
+            ))
+
+    def update(self, job_id, **fields):
+        self.prepare()
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        with self._engine.begin() as conn:
+            conn.execute(
+                self._table.update().where(self._table.c.job_id == job_id).values(**fields)
+            )
+
+    def get(self, job_id):
+        self.prepare()
+        with self._engine.connect() as conn:
+            row = conn.execute(
+                self._table.select().where(self._table.c.job_id == job_id)
+            ).mappings().first()
+        if row is None:
+            return None
+        job = dict(row)
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def purge_expired(self, ttl_seconds):
+        self.prepare()
+        cutoff = time.time() - ttl_seconds
+        with self._engine.begin() as conn:
+            result = conn.execute(
+                self._table.delete()
+                .where(self._table.c.status.in_(FINISHED_STATES))
+                .where(self._table.c.updated_at < cutoff)
+            )
+        return result.rowcount
+
+
+def create_job_store():
+    """Build the job store selected by JOB_STORE"""
+    if job_store_backend == "sql":
+        print("🗄️ Using SQL job store")
+        return SQLJobStore(job_store_url)
+    return InMemoryJobStore()
+
+
+# Bounded worker pool
+class JobQueue:
+    """Run pipeline jobs on a fixed pool of worker threads"""
+
+    def __init__(self, store, workers=job_workers, max_depth=job_queue_depth, ttl_seconds=job_ttl_seconds):
+        self.store = store
+        self.workers = workers
+        self.max_depth = max_depth
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="intake-job")
+        self._outstanding = 0
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return the new job id"""
+        with self._lock:
+            # Jobs beyond the running workers wait in the queue
+            if self._outstanding >= self.workers + self.max_depth:
+                raise QueueFullError(f"Job queue is full ({self.max_depth} waiting)")
+            self._outstanding += 1
+
+        job_id = str(uuid.uuid4())
+        try:
+            self.store.purge_expired(self.ttl_seconds)
+            self.store.create(job_id, kind)
+        except Exception:
+            # e.g. the SQL job store is unreachable - give the slot back so capacity doesn't shrink
+            self._release()
+            raise
+        with self._lock:
+            self._queued.add(job_id)
+        try:
+            # The job is traced under the id of the request that queued it
+            self._executor.submit(self._run, job_id, kind, current_request_id(), fn, args, kwargs)
+        except RuntimeError:
+            # Executor already shut down
+            self._release(job_id)
+            self.store.update(job_id, status=JOB_FAILED, error="Server is shutting down")
+            raise QueueFullError("Job queue is shutting down")
+        print(f"📥 Queued {kind} job {job_id}")
+        return job_id
+
+    def _run(self, job_id, kind, request_id, fn, args, kwargs):
+        with self._lock:
+            self._queued.discard(job_id)
+        self.store.update(job_id, status=JOB_RUNNING)
+        try:
+            with trace_request(f"job {kind}", request_id, job=kind):
+                result = fn(*args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                self.store.update(job_id, status=JOB_FAILED, error=result["error"])
+                print(f"❌ Job {job_id} failed: {result['error']}")
+            else:
+                self.store.update(job_id, status=JOB_SUCCEEDED, result=result)
+                print(f"✅ Job {job_id} finished")
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status=JOB_FAILED, error=str(e))
+        finally:
+            self._release()
+
+    def _release(self, job_id=None):
+        with self._lock:
+            self._outstanding -= 1
+            self._queued.discard(job_id)
+
+    def get(self, job_id):
+        self.store.purge_expired(self.ttl_seconds)
+        return self.store.get(job_id)
+
+    def depth(self):
+        with self._lock:
+            return self._outstanding
+
+    def shutdown(self):
+        """Stop accepting jobs, drop queued ones and wait for running ones"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            cancelled = list(self._queued)
+            self._queued.clear()
+        for job_id in cancelled:
+            self.store.update(job_id, status=JOB_FAILED, error="Server restarted before the job ran")
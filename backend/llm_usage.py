@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import threading
+
+# Optional JSONL file with one line per LLM call
+llm_usage_log = os.getenv("LLM_USAGE_LOG")
+
+
+def usage_tokens(usage):
+    """(input, cached input, output) tokens from a response's usage block"""
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached = details.get("cached_tokens") or 0
+    else:
+        cached = getattr(details, "cached_tokens", 0) or 0
+    return usage.prompt_tokens or 0, cached, usage.completion_tokens or 0
+
+
+class LLMUsageTracker:
+    """Token and latency totals per prompt version, for comparing prompt layouts and models"""
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, prompt, model, usage, seconds):
+        input_tokens, cached_tokens, output_tokens = usage_tokens(usage)
+        with self._lock:
+            totals = self._totals.setdefault((prompt, model), {
+                "calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "seconds": 0.0,
+            })
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["cached_tokens"] += cached_tokens
+            totals["output_tokens"] += output_tokens
+            totals["seconds"] += seconds
+            if self.log_path:
+                record = {
+                    "time": time.time(), "prompt": prompt, "model": model, "seconds": round(seconds, 3),
+                    "input_tokens": input_tokens, "cached_tokens": cached_tokens, "output_tokens": output_tokens,
+                }
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def stats(self):
+        with self._lock:
+            rows = [(prompt, model, dict(totals)) for (prompt, model), totals in self._totals.items()]
+        report = []
+        for prompt, model, totals in sorted(rows):
+            report.append(dict(
+                totals,
+                prompt=prompt,
+                model=model,
+                seconds=round(totals["seconds"], 3),
+                avg_seconds=round(totals["seconds"] / totals["calls"], 3),
+                cache_hit_rate=round(totals["cached_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0,
+            ))
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+llm_usage = LLMUsageTracker(llm_usage_log)
@@ -1,90 +1,163 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import uvicorn
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 import os
+import time
+import threading
 from dotenv import load_dotenv
-import openai
-from openai import OpenAI 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import JSON, select, tuple_, func, exists, and_, or_, type_coerce, literal, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
-from sqlalchemy import text 
-import httpx
+from sqlalchemy import text
 import traceback
-import boto3
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager
+from ai_clients import get_openai_client, init_openai_clients, close_openai_clients, openai_api_key
+from database import engine, SessionLocal, Patient, IntakeAnswerSet, INDEXED_ANSWER_KEYS, ANSWER_SCORE_COLUMNS
+from migrate import run_migrations
+from jobs import JobQueue, QueueFullError, create_job_store, job_ttl_seconds
+from ocr_utils import textract_pages, textract_concurrency, iter_encoded_pages, peak_rss_mb
+from pdf_pages import extract_pages, shutdown_pdf_pool, warm_pdf_pool
+from cache import pdf_text_cache, llm_response_cache, llm_cache_key, sha256_of_path
+from chunking import chunk_text, count_tokens, reduce_answers, llm_token_budget
+from retrieval import build_section_texts, section_query_terms
+from audio_segments import split_audio, transcribe_segments, stitch_transcripts
+from uploads import UploadSizeLimitMiddleware, spool_upload, batch_max_upload_bytes
+from prompts import (
+    PATIENT_DATA_PROMPT, DEMO_QUESTIONS_PROMPT, INTAKE_SECTION_FIELDS, INTAKE_SECTION_PROMPTS, document_messages,
+)
+from llm_usage import llm_usage, usage_tokens
+from metrics import track_stage, record_fallback, record_llm_call, pipeline_collector, render_metrics
+from tracing import RequestTracingMiddleware, span, bind_context
+from write_behind import WriteBehindWriter, WriteQueueFullError
+import batch
+from intake_schema import (
+    PATIENT_FIELD_SPECS, DEMO_QUESTION_FIELD_SPECS, build_field_specs, build_repair_prompt,
+    parse_answers, response_format_for, normalize_value,
+)
+import json
+import uuid
+import base64
+import shutil
+import zipfile
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Get OpenAI API key
-openai_api_key = os.getenv("OPENAI_API_KEY")
+llm_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+
+# Startup work runs in the background after the server is listening; /readyz reports it
+migrate_on_startup = os.getenv("MIGRATE_ON_STARTUP", "true").lower() == "true"
+readiness = {"database": "pending", "openai": "pending", "textract": "pending"}
+
+def check_database():
+    if migrate_on_startup:
+        run_migrations(engine)
+    job_store.prepare()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    print("✅ Database connection successful")
+
+def check_openai():
+    if not openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set")
+    init_openai_clients()
+
+def check_textract():
+    get_textract_client()
+    print("✅ AWS Textract client initialized successfully")
+
+def warm_up():
+    """Connect to the database and build the API clients so the first request doesn't pay for it"""
+    start = time.perf_counter()
+    for name, check in (("database", check_database), ("openai", check_openai), ("textract", check_textract)):
+        try:
+            check()
+            readiness[name] = "ok"
+        except Exception as e:
+            readiness[name] = f"failed: {e}"
+            print(f"❌ {name} warm-up failed: {e}")
+    try:
+        # Not a readiness check - PDFs are extracted on the request thread until the pool is up
+        warm_pdf_pool()
+    except Exception as e:
+        print(f"⚠️ PDF extraction pool warm-up failed: {e}")
+    print(f"🔥 Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+# App startup / shutdown
+@asynccontextmanager
+async def lifespan(app):
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+    print("🛑 Shutting down job queue...")
+    job_queue.shutdown()
+    batch_queue.shutdown()
+    pipeline_executor.shutdown(wait=True)
+    llm_executor.shutdown(wait=True)
+    print("💾 Flushing queued patient rows...")
+    patient_writer.close()
+    answer_set_writer.close()
+    shutdown_pdf_pool()
+    await close_openai_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+# Background job queue for the /parse-*-for-intake endpoints
+job_store = create_job_store()
+job_queue = JobQueue(job_store)
+# Uploaded batches fan out to their own threads, so they get separate slots and never hold up single-file jobs
+batch_queue = JobQueue(job_store, workers=batch.batch_concurrency, max_depth=batch.batch_queue_depth)
+
+# Bounded thread pool for blocking pipeline stages (pdfplumber, pdf2image, boto3, OpenAI SDK, DB)
+pipeline_threads = int(os.getenv("PIPELINE_THREADS", "8"))
+pipeline_executor = ThreadPoolExecutor(max_workers=pipeline_threads, thread_name_prefix="pipeline")
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking pipeline stage off the event loop so other requests keep moving"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pipeline_executor, bind_context(functools.partial(fn, *args, **kwargs)))
+
+async def run_on_upload(fn, file, *args, **kwargs):
+    """Spool an upload to disk once, run fn(path, ...) off the event loop, then delete the spool file"""
+    upload = await spool_upload(file)
+    try:
+        return await run_blocking(fn, upload.path, *args, **kwargs)
+    finally:
+        upload.discard()
 
-app = FastAPI()
+def run_pipeline_on_upload(pipeline, upload, **kwargs):
+    """Run an intake pipeline on a spooled upload that outlives its request, deleting it afterwards"""
+    try:
+        return pipeline(upload.path, upload.filename, **kwargs)
+    finally:
+        upload.discard()
 
 # AWS configuration
 aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
 aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
 aws_region = os.getenv("AWS_REGION", "us-east-1")
 
-# Database setup
-database_url = os.getenv("DATABASE_URL")
-engine = create_engine(database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+# Database models live in database.py; schema changes run from migrate.py
 
-# Patient data model
-class Patient(Base):
-    __tablename__ = "patients"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    patient_name = Column(String)
-    date_of_birth = Column(String)
-    primary_diagnosis = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-# Create all database tables
-Base.metadata.create_all(bind=engine)
-
-# DEBUG FUNCTION 
-def debug_database_connection():
-    """Debug database connection details"""
-    print(f"🔍 DATABASE_URL: {database_url}")
-    try:
-        db = SessionLocal()
-        result = db.execute(text("SELECT current_database();"))
-        db_name = result.scalar()
-        print(f"✅ Connected to database: {db_name}")
-        
-        # Test if patients table exists and count records
-        result = db.execute(text("SELECT COUNT(*) FROM patients;"))
-        patient_count = result.scalar()
-        print(f"📊 Patients in database: {patient_count}")
-        
-        db.close()
-    except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+# Extracted patients are inserted in batches by a background writer, not inside the request
+patient_writer = WriteBehindWriter(engine, Patient.__table__)
+answer_set_writer = WriteBehindWriter(engine, IntakeAnswerSet.__table__)
+intake_save_answers = os.getenv("INTAKE_SAVE_ANSWERS", "true").lower() == "true"
 
-# Call it after your database setup
-debug_database_connection()
-
-def test_database_connection():
-    """Test if database connection is working"""
-    try:
-        # Try to create a session
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        print("✅ Database connection successful")
-        db.close()
-    except Exception as e:
-        print(f"❌ Database connection failed: {e}")
-
-# Test the connection
-test_database_connection()
+# Scraped on demand by /metrics
+pipeline_collector.add_cache("pdf_text", pdf_text_cache)
+pipeline_collector.add_cache("llm_responses", llm_response_cache)
+pipeline_collector.add_queue("jobs", job_queue.depth)
+pipeline_collector.add_queue("batches", batch_queue.depth)
+pipeline_collector.add_queue("patient_writes", lambda: patient_writer.stats()["queued"])
+pipeline_collector.add_queue("answer_set_writes", lambda: answer_set_writer.stats()["queued"])
 
 # Enable CORS
+# Oversized uploads get a 413 as soon as they pass MAX_UPLOAD_MB (added before CORS so the 413 carries CORS headers)
+app.add_middleware(UploadSizeLimitMiddleware, path_limits={"/batch": batch_max_upload_bytes})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -109,487 +182,365 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
-# Test Open AI function
-def test_openai_connection():
-    """Simple test to verify OpenAI API is working"""
-    import sys
-    print("✅ OpenAI API Key loaded:", openai_api_key[:10] + "..." if openai_api_key else "❌ No key found", file=sys.stderr)
+# Outermost, so every request (413s included) gets an id and a trace
+app.add_middleware(RequestTracingMiddleware)
 
-test_openai_connection()
-openai.api_key = openai_api_key
+# Progress events for the streaming endpoints
+def report_progress(on_progress, event, **data):
+    """Pass a pipeline event to the caller's callback, if there is one"""
+    if on_progress:
+        on_progress(event, data)
 
 # PDF Text Extraction function
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF file - tries text extraction first, then AWS Textract for images"""
+def extract_text_from_pdf(pdf_path, on_progress=None):
+    """Extract text from a spooled PDF, reusing cached text for PDFs we have already seen"""
+    with span("extract_text_from_pdf", bytes=os.path.getsize(pdf_path)) as attrs:
+        pdf_hash = sha256_of_path(pdf_path)
+        cached_text = pdf_text_cache.get(pdf_hash)
+        attrs["cache_hit"] = cached_text is not None
+        if cached_text is not None:
+            print(f"⚡ PDF text cache hit ({len(cached_text)} characters) - skipping extraction")
+            attrs["characters"] = len(cached_text)
+            return cached_text
+
+        text, complete = extract_text_from_pdf_uncached(pdf_path, on_progress)
+        attrs.update(characters=len(text or ""), complete=complete)
+        # Only cache complete text so a failed or partial OCR pass is retried on the next upload
+        if text and complete:
+            pdf_text_cache.set(pdf_hash, text)
+        elif text:
+            print("⚠️ Some pages failed OCR - not caching the partial text")
+        return text
+
+def extract_text_from_pdf_uncached(pdf_path, on_progress=None):
+    """Extract text from PDF file - tries text extraction first, then AWS Textract for images
+
+    Returns (text, complete); complete is False when any page that needed OCR didn't come back from Textract.
+    """
     try:
-        import pdfplumber
-           
         print("🔍 Starting PDF text extraction...")
            
-        # First try: Regular text extraction
-        text = ""
-        pdf_file.seek(0)
-        with pdfplumber.open(pdf_file) as pdf:
-            print(f"📄 PDF has {len(pdf.pages)} pages")
-            for i, page in enumerate(pdf.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-           
-        print(f"📊 Initial text extraction got {len(text)} characters")
-
-        # If no text found, use AWS Textract
-        if not text.strip():
-            print("📄 No text found - attempting AWS Textract...")
-            text = extract_text_with_textract(pdf_file)
+        # First try: Regular text extraction, sharded across worker processes for big PDFs
+        with track_stage("pdf_text"), span("pdf_text_layer") as attrs:
+            pages = extract_pages(pdf_path)
+            text_chars = sum(len(page["text"]) for page in pages)
+            attrs.update(pages=len(pages), characters=text_chars)
+        print(f"📊 Initial text extraction got {text_chars} characters")
+
+        # Only OCR the pages that have no usable text layer
+        ocr_page_numbers = [number for number, page in enumerate(pages, start=1) if page["needs_ocr"]]
+        if not ocr_page_numbers and text_chars == 0:
+            ocr_page_numbers = list(range(1, len(pages) + 1))
+
+        ocr_texts = {}
+        if ocr_page_numbers:
+            print(f"📄 {len(ocr_page_numbers)} of {len(pages)} pages need OCR - attempting AWS Textract...")
+            record_fallback("textract_ocr", len(ocr_page_numbers))
+            ocr_texts = extract_text_with_textract(pdf_path, ocr_page_numbers, on_progress=on_progress)
+
+        # Merge text-layer and OCR pages back in page order
+        text = "".join(
+            f"--- Page {number} ---\n{ocr_texts[number]}\n" if ocr_texts.get(number)
+            else page["text"] + "\n" if page["text"] else ""
+            for number, page in enumerate(pages, start=1)
+        )
 
+        missing_pages = [number for number in ocr_page_numbers if number not in ocr_texts]
+        if missing_pages:
+            print(f"⚠️ Textract returned nothing for {len(missing_pages)} of {len(ocr_page_numbers)} pages")
         if not text.strip():
             print("❌ Both text extraction and AWS Textract failed")
-            return None
+            return None, False
             
         print(f"✅ Final extracted {len(text)} characters")
-        return text
+        return text, not missing_pages
             
     except Exception as e:
         print(f"❌ Error: {e}")
-        return None
+        return None, False
 
-# Extract text using AWS Textract
-def extract_text_with_textract(pdf_file):
-    """Extract text from image-based PDFs using AWS Textract"""
-    try:
-        print("🔍 Starting AWS Textract processing...")
-        
-        # Initialize Textract client with credentials
-        textract = boto3.client(
+# Shared Textract client
+textract_endpoint_url = os.getenv("TEXTRACT_ENDPOINT_URL")  # e.g. a local moto server for testing
+_textract_client = None
+
+def get_textract_client():
+    """Create the Textract client once, sized for concurrent page dispatch"""
+    global _textract_client
+    if _textract_client is None:
+        # boto3 takes a noticeable share of a cold start, so it's only imported when first needed
+        import boto3
+        from botocore.config import Config
+
+        _textract_client = boto3.client(
             'textract',
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=aws_region
+            region_name=aws_region,
+            endpoint_url=textract_endpoint_url,
+            config=Config(
+                max_pool_connections=max(10, textract_concurrency),
+                # Throttling is handled by our adaptive throttle, not botocore's retries
+                retries={"mode": "standard", "max_attempts": 1}
+            )
         )
-        
-        # Convert PDF to images first
-        from pdf2image import convert_from_bytes
-        import io
-        
-        print("📄 Converting PDF to images for Textract...")
-        pdf_file.seek(0)
-        images = convert_from_bytes(pdf_file.read(), dpi=200)
-        
-        # Process each image with Textract
-        text = ""
-        for i, image in enumerate(images):
-            print(f"🔍 Textract processing page {i+1}/{len(images)}")
-            
-            # Convert image to bytes
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='JPEG')
-            img_byte_arr = img_byte_arr.getvalue()
-            
-            # Call Textract for image
-            response = textract.detect_document_text(
-                Document={'Bytes': img_byte_arr}
+    return _textract_client
+
+# Extract text using AWS Textract
+def extract_text_with_textract(pdf_path, page_numbers, client=None, on_progress=None):
+    """OCR the given 1-based PDF pages with AWS Textract and return {page_number: text}"""
+    with span("extract_text_with_textract", pages=len(page_numbers)) as attrs:
+        try:
+            print(f"🔍 Starting AWS Textract processing of {len(page_numbers)} pages...")
+            textract = client or get_textract_client()
+
+            # pdftoppm reads the spooled upload straight from its path
+            # Render a few pages at a time and stream them straight to Textract
+            pages = iter_encoded_pages(pdf_path, page_numbers, dpi=200)
+            page_texts = textract_pages(
+                textract, pages,
+                on_page=lambda number: report_progress(on_progress, "page_ocr", page=number, pages=len(page_numbers))
             )
-            
-            # Extract text from blocks
-            page_text = ""
-            for block in response['Blocks']:
-                if block['BlockType'] == 'LINE':
-                    page_text += block['Text'] + "\n"
-            
-            text += f"--- Page {i+1} ---\n{page_text}\n"
-        
-        print(f"✅ AWS Textract extracted {len(text)} characters")
-        return text.strip()
-        
-    except Exception as e:
-        print(f"❌ AWS Textract failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return ""
+            print(f"📈 Peak memory after OCR: {peak_rss_mb():.0f} MB")
+
+            characters = sum(len(t) for t in page_texts.values())
+            attrs.update(ocr_pages=len(page_texts), characters=characters, peak_rss_mb=peak_rss_mb())
+            print(f"✅ AWS Textract extracted {characters} characters")
+            return page_texts
+
+        except Exception as e:
+            print(f"❌ AWS Textract failed: {e}")
+            traceback.print_exc()
+            attrs["error"] = type(e).__name__
+            return {}
+
+# LLM response cache lookup
+def get_cached_ai_answers(cache_key, use_cache):
+    """Return cached parsed answers, or None on a miss or when the cache is bypassed"""
+    if not use_cache:
+        return None
+    cached = llm_response_cache.get(cache_key)
+    if cached is None:
+        return None
+    print("⚡ LLM cache hit - skipping OpenAI call")
+    return json.loads(cached)
+
+# Schema-checked JSON completion
+def create_chat_completion(prompt_label, messages, response_format):
+    """One chat completion, with its token usage and latency recorded under prompt_label"""
+    with span("llm", prompt=prompt_label, model=llm_model) as attrs:
+        start = time.perf_counter()
+        with track_stage("llm"):
+            response = get_openai_client().chat.completions.create(
+                model=llm_model,
+                messages=messages,
+                temperature=0.1, # Low temperature for consistent output
+                response_format=response_format
+            )
+        seconds = time.perf_counter() - start
+        input_tokens, cached_tokens, output_tokens = usage_tokens(response.usage)
+        attrs.update(input_tokens=input_tokens, cached_tokens=cached_tokens, output_tokens=output_tokens)
+    llm_usage.record(prompt_label, llm_model, response.usage, seconds)
+    record_llm_call(prompt_label, seconds, input_tokens, cached_tokens, output_tokens)
+    return response
+
+def request_json_answers(template, text, specs, schema_name):
+    """Ask for JSON, keep every valid field, and re-query only the missing or invalid ones - returns (answers, still_missing)"""
+    response = create_chat_completion(
+        template.label, template.messages(text), response_format_for(specs, schema_name)
+    )
+    answers, bad_keys = parse_answers(response.choices[0].message.content, specs)
+    if not bad_keys:
+        return answers, []
+
+    print(f"🔧 {schema_name}: {len(bad_keys)}/{len(specs)} fields missing or invalid - re-querying just those")
+    record_fallback("llm_repair")
+    repair_specs = {key: specs[key] for key in bad_keys}
+    response = create_chat_completion(
+        f"{template.label}:repair",
+        document_messages(build_repair_prompt(repair_specs), text),
+        response_format_for(repair_specs, schema_name)
+    )
+    repaired, still_bad = parse_answers(response.choices[0].message.content, repair_specs)
+    answers.update(repaired)
+    if still_bad:
+        print(f"⚠️ {schema_name}: {len(still_bad)} fields still unusable after repair: {still_bad}")
+    return answers, still_bad
 
 # AI Data Extraction Function
-def extract_data_with_ai(text):
+def extract_data_with_ai(text, use_cache=True):
     """Use OpenAI to extract structured data from text"""
-    try:
-        # Create the prompt for OpenAI
-        prompt = f"""
-        Extract the following information from this medical document:
-        
-        {text}
-        
-        Return as JSON with these fields:
-        - patient_name: Full name
-        - date_of_birth: YYYY-MM-DD format  
-        - primary_diagnosis: Main condition
-        
-        If any information is missing, use "Unknown"
-        """
-        
-        # Call OpenAI API
-        client = OpenAI(api_key=openai_api_key, http_client=httpx.Client())
-        response = client.chat.completions.create(  
-            model="gpt-3.5-turbo", 
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1 # Low temperature for consistent output
-        )
-        
-        # Extract the AI's response
-        result_text = response.choices[0].message.content
-
-        # Parse the JSON response from AI
-        import json
+    with span("extract_data_with_ai", characters=len(text)) as attrs:
         try:
-            extracted_data = json.loads(result_text)
+            cache_key = llm_cache_key(PATIENT_DATA_PROMPT.cache_identity, llm_model, text)
+            cached_data = get_cached_ai_answers(cache_key, use_cache)
+            attrs["cache_hit"] = cached_data is not None
+            if cached_data is not None:
+                return cached_data
+
+            extracted_data, missing_keys = request_json_answers(PATIENT_DATA_PROMPT, text, PATIENT_FIELD_SPECS, "patient_data")
+
+            if not extracted_data:
+                # Nothing usable even after the repair request
+                return {
+                    "patient_name": "Parse Error", 
+                    "date_of_birth": "1900-01-01",
+                    "primary_diagnosis": "See console for AI response"
+                }
+
+            extracted_data.update({key: "Unknown" for key in missing_keys})
+            if not missing_keys:
+                llm_response_cache.set(cache_key, json.dumps(extracted_data))
             return extracted_data
-        except json.JSONDecodeError:
-            # If AI didn't return valid JSON, return the raw text for debugging
-            print("❌ AI didn't return valid JSON:", result_text)
-            return {
-                "patient_name": "Parse Error", 
-                "date_of_birth": "1900-01-01",
-                "primary_diagnosis": "See console for AI response"
-            }
-        
-    except Exception as e:
-        print(f"❌ Error with AI extraction: {e}")
-        return None
 
-def extract_answers_for_questions(text):
+        except Exception as e:
+            print(f"❌ Error with AI extraction: {e}")
+            return None
+
+def extract_answers_for_questions(text, use_cache=True):
     """Extract answers for our 7 demo questions from text with enhanced understanding"""
-    try:
-        prompt = f"""
-        Analyze this medical conversation text and extract specific information for these 7 questions.
-        Use contextual understanding and medical knowledge to map terms appropriately.
-
-        TEXT TO ANALYZE:
-        {text}
-
-        QUESTIONS TO ANSWER:
-        1. Are you a new participant? (Answer: "Yes" or "No" - look for terms like "new", "first time", "returning", "existing")
-        2. What diagnoses or conditions do you have? (List specific conditions - expand abbreviations: MS→Multiple Sclerosis, COPD→Chronic Obstructive Pulmonary Disease, etc.)
-        3. How often do you get upset, angry, anxious, withdrawn? (Answer: "Never", "Rarely", "Occasionally", "Often", "Almost always" - map synonyms: "sometimes"→"Occasionally", "frequently"→"Often")
-        4. How much support do you need to manage physical challenges? (0-10 number - extract numbers mentioned like "7 out of 10" or descriptive terms mapped to numbers)
-        5. What are your living arrangements? (Describe living situation - extract who they live with, type of housing)
-        6. In the last 30 days, how much was your family impacted because of your disability? (Answer: "None", "Mild", "Moderate", "Severe", "Extreme", "Not Applicable" - map intensity terms: "a little"→"Mild", "somewhat"→"Moderate", "very"→"Severe", "extremely"→"Extreme")
-        7. If we were to score your impairment restrictions (0-5 scale with 0.5 increments - extract numbers mentioned like "3 on a 5 point scale")
-
-        IMPORTANT MAPPING RULES:
-        - "MS", "multiple sclerosis" → "Multiple Sclerosis"
-        - "sometimes", "occasionally" → "Occasionally" 
-        - "often", "frequently" → "Often"
-        - "rarely", "seldom" → "Rarely"
-        - "a little", "slightly" → "Mild"
-        - "somewhat", "moderately" → "Moderate"
-        - "very", "severely", "significantly" → "Severe"
-        - "extremely", "critically" → "Extreme"
-        - Extract numbers directly when mentioned (e.g., "7 out of 10" → 7, "3 on a 5 point scale" → 3)
-
-        Return as JSON with these exact field names:
-        - "introduction.new_participant"
-        - "icf_impairment.diagnoses" 
-        - "wellbeing.frequency"
-        - "icf_impairment.mobility_support_level"
-        - "about_you.living_situation"
-        - "family.carer_wellbeing"
-        - "icf_impairment.score"
-
-        For any information that is missing or unclear, use "Unknown".
-        """
-        
-        client = OpenAI(api_key=openai_api_key, http_client=httpx.Client())
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1
-        )
-        
-        result_text = response.choices[0].message.content
-        
-        import json
+    with span("extract_answers_for_questions", characters=len(text)) as attrs:
         try:
-            extracted_data = json.loads(result_text)
-            print(f"✅ AI extracted answers: {extracted_data}")
+            cache_key = llm_cache_key(DEMO_QUESTIONS_PROMPT.cache_identity, llm_model, text)
+            cached_answers = get_cached_ai_answers(cache_key, use_cache)
+            attrs["cache_hit"] = cached_answers is not None
+            if cached_answers is not None:
+                return cached_answers
+
+            extracted_data, missing_keys = request_json_answers(DEMO_QUESTIONS_PROMPT, text, DEMO_QUESTION_FIELD_SPECS, "demo_questions")
+            extracted_data.update({key: "Unknown" for key in missing_keys})
+            if not missing_keys:
+                llm_response_cache.set(cache_key, json.dumps(extracted_data))
+            print(f"✅ AI extracted {len(extracted_data) - len(missing_keys)}/{len(extracted_data)} demo answers")
             return extracted_data
-        except json.JSONDecodeError:
-            print("❌ AI didn't return valid JSON:", result_text)
+
+        except Exception as e:
+            print(f"❌ Error in extract_answers_for_questions: {e}")
             return {
                 "introduction.new_participant": "Unknown",
                 "icf_impairment.diagnoses": "Unknown",
                 "wellbeing.frequency": "Unknown",
-                "icf_impairment.mobility_support_level": "Unknown", 
-                "about_you.living_situation": "Unknown",
+                "icf_impairment.mobility_support_level": "Unknown",
+                "about_you.living_situation": "Unknown", 
                 "family.carer_wellbeing": "Unknown",
                 "icf_impairment.score": "Unknown"
             }
-        
-    except Exception as e:
-        print(f"❌ Error in extract_answers_for_questions: {e}")
-        return {
-            "introduction.new_participant": "Unknown",
-            "icf_impairment.diagnoses": "Unknown",
-            "wellbeing.frequency": "Unknown",
-            "icf_impairment.mobility_support_level": "Unknown",
-            "about_you.living_situation": "Unknown", 
-            "family.carer_wellbeing": "Unknown",
-            "icf_impairment.score": "Unknown"
-        }
 
-def extract_answers_for_intake_questions(text):
-    """Extract answers for ALL intake questions from text"""
-    try:
-        prompt = f"""
-
-        Analyze this conversation text and extract specific information for these intake questions.
-        Use advanced contextual understanding and medical knowledge to infer answers from both explicit statements and implied meanings from descriptions, symptoms, and daily experiences..
-
-        TEXT TO ANALYZE:
-        {text}
-
-        ADVANCED INFERENCE FRAMEWORK:
-
-        SCALE RATING INTERPRETATION (0-5):
-        0 (None): No mention of difficulty, describes full independence, "no problems", "easy"
-        1 (Mild): "Minor", "slight", "a little", "barely noticeable", "manageable without help"
-        2 (Moderate): "Some", "occasional", "now and then", "moderate", "needs minimal assistance"
-        3 (Severe): "Significant", "major", "regular", "often", "frequent help needed", "struggles with"
-        4 (Extreme): "Constant", "always", "cannot manage", "completely unable", "dependent on others"
-        5 (Not Applicable): Activity not attempted, condition prevents participation entirely
-
-        YES/NO INFERENCE PATTERNS:
-        YES Indicators: "Help with", "assistance for", "support to", "needs help", "requires aid", 
-                    "can't do alone", "struggles to", "finds it hard to", "depends on", 
-                    "caregiver helps", "family assists", "worker supports"
-        NO Indicators: "Independent", "manages alone", "no help needed", "self-sufficient",
-                    "does everything myself", "no assistance", "handles independently"
-        UNSURE Indicators: "Sometimes", "it depends", "varies", "good days and bad days",
-                        "uncertain", "not sure", "maybe"
-
-        SYMPTOM-TO-CONDITION MAPPING:
-        PHYSICAL: wheelchair, cane, walker, mobility issues, weakness, tremors, shaking,
-                fatigue, tiredness, exhaustion, balance problems, falling, dizziness,
-                pain, stiffness, muscle spasms, coordination issues
-
-        COGNITIVE: memory problems, forgetting, confusion, disorientation, concentration issues,
-                distractibility, attention problems, problem-solving difficulties,
-                decision-making challenges, learning difficulties
-
-        EMOTIONAL: anxiety, worry, fear, panic attacks, depression, sadness, low mood,
-                anger, frustration, irritability, mood swings, emotional outbursts,
-                withdrawal, isolation, social anxiety
-
-        COMMUNICATION: difficulty understanding, trouble following conversations,
-                    speech problems, stuttering, finding words, expressive difficulties,
-                    social communication challenges, avoiding conversations
-
-        SENSORY: vision problems, hearing difficulties, sensitivity to light/sound,
-                sensory overload, tactile sensitivities
-
-        ACTIVITY PARTICIPATION INDICATORS:
-        - Structured activities: "day program", "work", "school", "classes", "therapy sessions"
-        - Community participation: "shopping", "appointments", "outings", "events", "social gatherings"
-        - Social participation: "friends", "family visits", "phone calls", "social media"
-        - Recreation: "hobbies", "leisure activities", "entertainment", "sports", "crafts"
-
-        SUPPORT NEEDS CLASSIFICATION:
-        - Personal care: bathing, dressing, grooming, toileting, feeding
-        - Household: cleaning, cooking, shopping, laundry, home maintenance
-        - Medical: medications, appointments, treatments, therapy exercises
-        - Mobility: transportation, transfers, walking assistance
-        - Communication: interpreters, communication devices, speech therapy
-        - Cognitive: reminders, scheduling, decision support, memory aids
-        - Emotional: counseling, emotional support, crisis management
-        - Social: social skills, relationship support, community integration
-
-        CONTEXTUAL CLUES FOR SPECIFIC QUESTIONS:
-
-        FOR WORK/SCHOOL PARTICIPATION:
-        - Mentions of employment, job, workplace, colleagues → participates in work
-        - Mentions of school, classes, studying, teachers → participates in education  
-        - Mentions of day programs, centers, structured activities → participates in structured learning
-        - Mentions of volunteering, community work → participates in productive activities
-
-        FOR DIFFICULTY LEVELS:
-        - Time-based clues: "takes longer", "needs extra time", "slow to complete" → moderate-severe difficulty
-        - Assistance clues: "with help", "with support", "needs assistance" → significant difficulty
-        - Emotional clues: "frustrating", "overwhelming", "stressful" → moderate-severe difficulty
-        - Frequency clues: "always", "often", "frequently" → consistent difficulty
-
-        FOR SUPPORT NEEDS:
-        - Equipment mentions: wheelchair, walker, communication device → equipment support needed
-        - Personal assistance: caregiver, support worker, family help → personal support needed
-        - Environmental: home modifications, accessibility features → environmental support needed
-        - Professional: therapists, doctors, specialists → professional support needed
-
-        PAY ATTENTION TO:
-        - Comparative language: "harder than before", "worse than last year", "improved since"
-        - Conditional statements: "when I'm tired", "on bad days", "if it's crowded"
-        - Frequency modifiers: "always", "often", "sometimes", "rarely", "never"
-        - Intensity descriptors: "mild", "moderate", "severe", "extreme", "overwhelming"
-        - Support terminology: "help", "assistance", "support", "aid", "care"
-
-        USE CONTEXTUAL REASONING:
-        - If someone uses a wheelchair, infer mobility challenges and potential need for accessibility supports
-        - If someone mentions memory problems, infer potential need for reminders and cognitive supports
-        - If someone describes social anxiety, infer potential participation restrictions in social settings
-        - If someone has multiple medications, infer potential need for medication management support
-        - If someone has fluctuating conditions, infer that challenges may vary day-to-day
-
-        EXTRACT ANSWERS FOR THESE QUESTIONS AND DATA PATHS:
-
-        INTRODUCTION SECTION:
-        - "introduction.today_date" (extract date as DD/MM/YYYY)
-        - "introduction.who_completing" (match to: Participant/client/patient, Family member/parent, Carer, Participant AND family member together, Legal guardian, Support worker, Intake team, Allied health professional, Teacher/educator, Employer/workplace)
-        - "introduction.new_participant" (Yes/No)
-        - "introduction.urgent_help" (Yes/No)
-        - "introduction.services_used" (list from: Active Community, Supported Independent Living, Specialist Disability Accommodation, Respite Care (STA, MTA), SLES Work Program, Employment, Allied Health)
-        - "introduction.active_service_location" (Home/Community/Both)
-        - "introduction.referral_source" (list from: Your COS, Your school, Someone in your healthcare team, Someone in your family, A friend, Other)
-        - "introduction.motivation" (extract text about motivation)
-        - "introduction.funding_source" (list from: NDIS, Workcover, Private/Self-funded, Aged Care/DVA funding, Other)
-        - "introduction.funding_source_other" (if Other selected, extract details)
-        - "introduction.funding_supports" (list from: Capital Supports, Capacity Building Supports, Core Supports, Other)
-        - "introduction.funding_supports_other" (if Other selected, extract details)
-
-        ABOUT ME SECTION:
-        - "about_me.year_of_birth" (extract year as number)
-        - "about_me.postcode" (extract postcode as number)
-        - "about_me.gender" (match to: Female, Male, Non-Binary, Transgender Female, Transgender Male, Prefer Not To Say, Other)
-        - "about_me.gender_other" (if Other selected, extract details)
-        - "about_me.cultural_background" (list from: Australian - from an English speaking, Anglo-Celtic background, Australian - from a culturally and linguistically diverse background, Aboriginal, Torres Strait Islander, Other)
-        - "about_me.living_arrangements" (extract text about living situation)
-        - "about_me.things_love" (extract text about likes/enjoyments)
-        - "about_me.things_dislike" (extract text about dislikes/avoidances)
-        - "about_me.friends_family_description" (extract text about personality/relationships)
-
-        ABOUT FAMILY SECTION:
-        - "about_family.family_members" (extract text about family composition)
-        - "about_family.family_relationship" (extract text about family relationships)
-        - "about_family.legal_decision_maker" (Yes/No/NA)
-        - "about_family.decision_maker_name" (if Yes, extract name)
-        - "about_family.family_activities" (extract text about family activities)
-        - "about_family.family_help" (extract text about family support)
-        - "about_family.family_impact_level" (None/Mild/Moderate/Severe/Extreme)
-        - "about_family.family_impact_ways" (extract text about impact details)
-        - "about_family.personal_story" (extract text about personal history)
-
-        ICF IMPAIRMENT SECTION:
-        - "icf_impairment.diagnoses" (list from: Brain Injury/Head Injury, Anorexia, Anxiety Disorder, ADHD, Autism, Bipolar Affective Disorder, Cerebral Palsy, Chronic Fatigue/ME, COPD, Congenital abnormality/deformity, Developmental Language Disorder, Dementia, Depression, Diabetes, Downs Syndrome, Dysarthria, Dysfluency, Dysphagia, Dysphasia/Aphasia, Dyspraxia, Epilepsy, Hearing Impairment/Deafness, Incontinence, Insulin Dependent Diabetes, Learning Disability, Neurological disorder, Non Insulin Dependent Diabetes, PTSD, Sensory Processing Disorder, Stroke, RET Syndrome, Spinal Injury, Tourette's Syndrome, Vision impairment, Fragile X, Obesity)
-        - "icf_impairment.physical.challenges_description" (extract text about physical challenges)
-        - "icf_impairment.physical.challenges_worsened" (Yes/No)
-        - "icf_impairment.physical.changes_description" (extract text about physical changes)
-        - "icf_impairment.physical.monitoring_needs" (extract text about monitoring needs)
-        - "icf_impairment.body_systems.challenges" (extract text about body system challenges)
-        - "icf_impairment.body_systems.worsened" (Yes/No)
-        - "icf_impairment.body_systems.changes_description" (extract text about body system changes)
-        - "icf_impairment.body_systems.monitoring_needs" (extract text about monitoring needs)
-        - "icf_impairment.cognitive_emotional.challenges" (extract text about cognitive/emotional challenges)
-        - "icf_impairment.cognitive_emotional.worsened" (Yes/No)
-        - "icf_impairment.cognitive_emotional.changes_description" (extract text about cognitive/emotional changes)
-        - "icf_impairment.cognitive_emotional.monitoring_needs" (extract text about monitoring needs)
-        - "icf_impairment.supports_needs.current_medications" (extract text about medications)
-        - "icf_impairment.supports_needs.medication_supports" (extract text about medication supports)
-        - "icf_impairment.supports_needs.medical_specialists" (extract text about medical specialists)
-        - "icf_impairment.supports_needs.specialist_appointment_supports" (extract text about specialist appointment supports)
-        - "icf_impairment.supports_needs.therapists_therapies" (extract text about therapists/therapies)
-        - "icf_impairment.supports_needs.therapy_appointment_supports" (extract text about therapy appointment supports)
-        - "icf_impairment.supports_needs.special_diet" (extract text about special diet)
-        - "icf_impairment.supports_needs.diet_supports" (extract text about diet supports)
-        - "icf_impairment.supports_needs.environmental_supports" (extract text about environmental supports)
-        - "icf_impairment.supports_needs.equipment_needs" (extract text about equipment needs)
-        - "icf_impairment.supports_needs.equipment_usage_supports" (extract text about equipment usage supports)
-        - "icf_impairment.supports_needs.sensory_supports" (extract text about sensory supports)
-        - "icf_impairment.supports_needs.sensory_supports_usage" (extract text about sensory supports usage)
-        - "icf_impairment.unmet_needs.support_needs" (extract text about unmet support needs)
-        - "icf_impairment.impairment_score.score" (extract number 0-5 with 0.5 increments for impairment score)
-
-        ICF ACTIVITY SECTION:
-        - "icf_activity.understanding_communicating.needs_support" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.concentration_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_concentration" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.concentration_supports" (extract text about concentration supports)
-        - "icf_activity.understanding_communicating.remembering_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_remembering" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.remembering_supports" (extract text about remembering supports)
-        - "icf_activity.understanding_communicating.problem_solving_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_problem_solving" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.problem_solving_supports" (extract text about problem solving supports)
-        - "icf_activity.understanding_communicating.learning_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_learning" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.learning_supports" (extract text about learning supports)
-        - "icf_activity.understanding_communicating.understanding_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_understanding" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.understanding_supports" (extract text about understanding supports)
-        - "icf_activity.understanding_communicating.conversation_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_activity.understanding_communicating.support_conversation" (Yes/No/Unsure)
-        - "icf_activity.understanding_communicating.conversation_supports" (extract text about conversation supports)
-        - "icf_activity.understanding_communicating.unmet_supports" (extract text about unmet communication supports)
-
-        ICF PARTICIPATION SECTION:
-        - "icf_participation.school_work.participates" (Yes/No/Unsure)
-        - "icf_participation.school_work.daily_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.school_work.support_daily" (Yes/No/Unsure)
-        - "icf_participation.school_work.daily_supports" (extract text about daily work/school supports)
-        - "icf_participation.school_work.important_tasks_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.school_work.support_important_tasks" (Yes/No/Unsure)
-        - "icf_participation.school_work.important_tasks_supports" (extract text about important tasks supports)
-        - "icf_participation.school_work.completing_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.school_work.support_completing" (Yes/No/Unsure)
-        - "icf_participation.school_work.completing_supports" (extract text about completing work supports)
-        - "icf_participation.school_work.speed_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.school_work.support_speed" (Yes/No/Unsure)
-        - "icf_participation.school_work.speed_supports" (extract text about work speed supports)
-        - "icf_participation.school_work.unmet_supports" (extract text about unmet school/work supports)
-        - "icf_participation.community.problems_support" (Yes/No/Unsure)
-        - "icf_participation.community.joining_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.community.supports" (extract text about community supports)
-        - "icf_participation.community.unmet_supports" (extract text about unmet community supports)
-        - "icf_participation.relaxation.difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
-        - "icf_participation.relaxation.support" (Yes/No/Unsure)
-        - "icf_participation.relaxation.supports" (extract text about relaxation supports)
-        - "icf_participation.relaxation.unmet_supports" (extract text about unmet relaxation supports)
-        - "icf_participation.other.limitations" (Yes/No/Unsure)
-        - "icf_participation.other.limitations_details" (extract text about other participation limitations)
-        - "icf_participation.score.score" (extract number 0-5 with 0.5 increments for participation score)
-
-        ICF WELL-BEING SECTION:
-        - "icf_wellbeing.emotional_frequency" (0-5: Never/Rarely/Sometimes/Often/Very often/All the time)
-        - "icf_wellbeing.emotional_intensity" (0-5: No intensity/Mild/Moderate/High/Very high/Extreme)
-        - "icf_wellbeing.emotional_experience" (extract text about emotional experiences)
-        - "icf_wellbeing.emotional_triggers" (extract text about emotional triggers)
-        - "icf_wellbeing.emotional_supports" (extract text about emotional supports)
-        - "icf_wellbeing.unmet_supports" (extract text about unmet emotional supports)
-        - "icf_wellbeing.score.score" (extract number 0-5 with 0.5 increments for wellbeing score)
-
-        IMPORTANT: When in doubt between two possible interpretations, choose the more specific and contextual one based on the overall narrative.
-
-        RETURN AS JSON with these exact field names. For any information that is missing or unclear, use "Unknown".
-        """
-
-        client = OpenAI(api_key=openai_api_key, http_client=httpx.Client())
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1
-        )
-        
-        result_text = response.choices[0].message.content
-        
-        import json
-        try:
-            extracted_data = json.loads(result_text)
-            print(f"✅ AI extracted answers for ALL intake questions: {extracted_data}")
-            return extracted_data
-        except json.JSONDecodeError:
-            print("❌ AI didn't return valid JSON:", result_text)
-            # Return empty object for all fields
-            return create_empty_intake_answers_object()
-        
-    except Exception as e:
-        print(f"❌ Error in extract_answers_for_intake_questions: {e}")
-        return create_empty_intake_answers_object()
+# Extra retrieval vocabulary per section, taken from the header's symptom and support lists
+INTAKE_SECTION_HINTS = {
+    "introduction": "referral referred date today form completed carer guardian funding plan service program urgent",
+    "about_me": "born birthday age postcode address suburb gender culture background language lives living house home likes enjoys loves hobbies dislikes hates",
+    "about_family": "family mother father parent partner wife husband son daughter sibling brother sister carer guardian decisions impact",
+    "icf_impairment": """diagnosis diagnosed condition medication doctor specialist therapist therapy diet equipment
+        wheelchair cane walker mobility weakness tremors fatigue balance falling dizziness pain stiffness spasms
+        memory forgetting confusion concentration vision hearing sensory""",
+    "icf_activity": """understanding communicating conversation speech stuttering words concentration attention
+        memory remembering problem solving decisions learning reminders""",
+    "icf_participation": """work job employment school classes study volunteering day program community shopping
+        appointments outings events friends social hobbies leisure sports crafts relax""",
+    "icf_wellbeing": """emotional anxiety worry fear panic depression sadness low mood anger frustration irritability
+        upset withdrawn isolation counseling stress overwhelmed""",
+}
+
+# Sectioned intake extraction settings
+intake_section_attempts = int(os.getenv("INTAKE_SECTION_ATTEMPTS", "3"))
+llm_concurrency = int(os.getenv("LLM_CONCURRENCY", "14"))
+llm_executor = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+
+# Field types and allowed values, read from each section's prompt annotations
+INTAKE_SECTION_SPECS = {section: build_field_specs(fields) for section, fields in INTAKE_SECTION_FIELDS.items()}
+
+# Retrieval query per section - the words its questions are asked in
+INTAKE_SECTION_QUERIES = {
+    section: section_query_terms(fields, INTAKE_SECTION_HINTS[section])
+    for section, fields in INTAKE_SECTION_FIELDS.items()
+}
+
+def intake_section_keys(section):
+    return [key for key in create_empty_intake_answers_object() if key.split(".")[0] == section]
+
+def extract_intake_section(section, text, use_cache=True):
+    """Extract answers for one intake section, retrying only this section on failure"""
+    with span("extract_intake_section", section=section, characters=len(text)) as attrs:
+        template = INTAKE_SECTION_PROMPTS[section]
+        section_keys = intake_section_keys(section)
+        cache_key = llm_cache_key(template.cache_identity, llm_model, text)
+        cached_answers = get_cached_ai_answers(cache_key, use_cache)
+        attrs["cache_hit"] = cached_answers is not None
+        if cached_answers is not None:
+            return cached_answers
+
+        for attempt in range(1, intake_section_attempts + 1):
+            attrs["attempts"] = attempt
+            try:
+                section_answers, missing_keys = request_json_answers(
+                    template, text, INTAKE_SECTION_SPECS[section], f"intake_{section}"
+                )
+                if not section_answers and missing_keys:
+                    raise ValueError("no usable fields in the response")
+
+                # Only a complete section is cached, so a partial one gets another chance next time
+                if not missing_keys:
+                    llm_response_cache.set(cache_key, json.dumps(section_answers))
+                print(f"✅ AI extracted {len(section_answers)}/{len(section_keys)} {section} answers")
+                return section_answers
+            except Exception as e:
+                print(f"❌ Error extracting {section} (attempt {attempt}): {e}")
+                if attempt < intake_section_attempts:
+                    record_fallback("section_retry")
+
+        print(f"❌ Giving up on {section} after {intake_section_attempts} attempts")
+        return {}
+
+def intake_chunk_budget():
+    """Tokens left for document text once the largest section prompt is accounted for"""
+    template_tokens = max(count_tokens(template.system, llm_model) for template in INTAKE_SECTION_PROMPTS.values())
+    return max(llm_token_budget - template_tokens, 500)
+
+def extract_answers_for_intake_questions(text, use_cache=True, on_progress=None):
+    """Extract answers for ALL intake questions - one concurrent request per section and chunk"""
+    with span("extract_answers_for_intake_questions", characters=len(text)) as attrs:
+        answers = create_empty_intake_answers_object()
+
+        # Each section only gets the passages that mention its vocabulary
+        section_texts, retrieval_stats = build_section_texts(text, INTAKE_SECTION_QUERIES)
+        if retrieval_stats:
+            print(
+                f"🔎 Retrieval: {retrieval_stats['passages']} passages, "
+                f"{retrieval_stats['hit_rate']:.0%} of sections matched, "
+                f"{retrieval_stats['sent_tokens']}/{retrieval_stats['full_tokens']} tokens sent "
+                f"({retrieval_stats['token_savings']:.0%} saved)"
+            )
+
+        # Anything still too long is split into overlapping chunks that fit the token budget
+        futures = {}
+        for section, section_text in section_texts.items():
+            chunks = chunk_text(section_text, intake_chunk_budget(), model=llm_model)
+            if len(chunks) > 1:
+                print(f"✂️ {section} text split into {len(chunks)} chunks of at most {intake_chunk_budget()} tokens")
+            futures[section] = [llm_executor.submit(bind_context(extract_intake_section), section, chunk, use_cache) for chunk in chunks]
+
+        # Sections are merged (and reported) in the order they finish, not the order they were sent
+        # A failed section keeps its "Unknown" placeholders without losing the others
+        section_of = {future: section for section, section_futures in futures.items() for future in section_futures}
+        attrs.update(sections=len(futures), requests=len(section_of))
+        remaining = {section: len(section_futures) for section, section_futures in futures.items()}
+        for future in as_completed(section_of):
+            section = section_of[future]
+            remaining[section] -= 1
+            if remaining[section]:
+                continue
+            partials = [section_future.result() for section_future in futures[section]]
+            section_answers = partials[0] if len(partials) == 1 else reduce_answers(partials, INTAKE_SECTION_SPECS[section])
+            answers.update(section_answers)
+            report_progress(on_progress, "section", section=section, answers=section_answers)
+
+        known = sum(1 for value in answers.values() if value != "Unknown")
+        attrs["known_answers"] = known
+        print(f"✅ AI extracted answers for ALL intake questions ({known}/{len(answers)} known)")
+        return answers
 
 def create_empty_intake_answers_object():
     """Create an empty answers object for all intake questions"""
@@ -720,68 +671,97 @@ def create_empty_intake_answers_object():
     }
 
 # Whisper Transcription Function
-def transcribe_audio(audio_file, filename=None):
-    """Transcribe audio file to text using OpenAI Whisper"""
-    try:
-        client = OpenAI(api_key=openai_api_key, http_client=httpx.Client())
-
-        # Reset file pointer and read as bytes
-        audio_file.seek(0)
-        audio_bytes = audio_file.read()
-        
-        # Determine content type based on filename
-        if filename and filename.lower().endswith('.mp4'):
-            content_type = "audio/mp4"
-        elif filename and filename.lower().endswith('.m4a'):
-            content_type = "audio/mp4" 
-        elif filename and filename.lower().endswith('.mp3'):
-            content_type = "audio/mpeg"
-        elif filename and filename.lower().endswith('.wav'):
-            content_type = "audio/wav"
-        else:
-            content_type = "audio/mpeg"  # Default
-        
-        # Use the tuple format
-        file_tuple = ("audio_file", audio_bytes, content_type)
-
-        
-        # Real Whisper API call
-        response = client.audio.transcriptions.create(
+def whisper_transcribe(audio, content_type, filename="audio_file"):
+    """One Whisper request for an audio clip - bytes, or an open file that is streamed up"""
+    client = get_openai_client()
+    # Use the tuple format
+    file_tuple = (filename, audio, content_type)
+    size = len(audio) if isinstance(audio, bytes) else os.fstat(audio.fileno()).st_size
+    with track_stage("whisper"), span("whisper", bytes=size, content_type=content_type):
+        return client.audio.transcriptions.create(
             model="whisper-1", 
             file=file_tuple,
             response_format="text"
         )
-        
-        print("✅ Audio transcribed successfully")
-        return response
-        
-    except Exception as e:
-        print(f"❌ Error transcribing audio: {e}")
-        return None
 
-def test_textract_connection():
-    """Test if AWS Textract connection is working"""
-    try:
-        textract = boto3.client(
-            'textract',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=aws_region
-        )
-        print("✅ AWS Textract client initialized successfully")
-    except Exception as e:
-        print(f"❌ AWS Textract connection failed: {e}")
+def transcribe_segment(segment_path):
+    """One Whisper request for a segment file cut by split_audio"""
+    with open(segment_path, "rb") as segment:
+        return whisper_transcribe(segment, "audio/wav", "segment.wav")
+
+def transcribe_audio(audio_path, filename=None):
+    """Transcribe a spooled audio file to text using OpenAI Whisper"""
+    with span("transcribe_audio", bytes=os.path.getsize(audio_path)) as attrs:
+        try:
+            # Long recordings are split at pauses and the pieces transcribed in parallel
+            with split_audio(audio_path, filename) as segments:
+                if segments:
+                    attrs["segments"] = len(segments)
+                    texts = transcribe_segments([path for path, _ in segments], bind_context(transcribe_segment))
+                    print(f"✅ Audio transcribed successfully in {len(segments)} segments")
+                    transcript = stitch_transcripts(texts, [overlapped for _, overlapped in segments])
+                    attrs["characters"] = len(transcript)
+                    return transcript
+
+            # Determine content type based on filename
+            if filename and filename.lower().endswith('.mp4'):
+                content_type = "audio/mp4"
+            elif filename and filename.lower().endswith('.m4a'):
+                content_type = "audio/mp4" 
+            elif filename and filename.lower().endswith('.mp3'):
+                content_type = "audio/mpeg"
+            elif filename and filename.lower().endswith('.wav'):
+                content_type = "audio/wav"
+            else:
+                content_type = "audio/mpeg"  # Default
+
+            # Real Whisper API call - the file is streamed from disk rather than read into memory
+            with open(audio_path, "rb") as audio_file:
+                response = whisper_transcribe(audio_file, content_type, filename or "audio_file")
+
+            print("✅ Audio transcribed successfully")
+            attrs["characters"] = len(response or "")
+            return response
+
+        except Exception as e:
+            print(f"❌ Error transcribing audio: {e}")
+            return None
 
-# Test the connection
-test_textract_connection()
+# Save basic patient details
+def save_patient(extracted_data):
+    """Queue a Patient row for the extracted data - blocks only while the write queue is full"""
+    patient_writer.submit({
+        "patient_name": extracted_data["patient_name"],
+        "date_of_birth": extracted_data["date_of_birth"],
+        "primary_diagnosis": extracted_data["primary_diagnosis"],
+        "created_at": datetime.utcnow(),
+    })
+    print("✅ Patient queued for saving")
 
 @app.get("/")
 def read_root():
     return {"message": "Backend is working!"}
 
+@app.get("/healthz")
+def healthz():
+    """Liveness only - answers as soon as the process is serving, without touching dependencies"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Ready once warm-up has connected to the database and built the OpenAI and Textract clients"""
+    ready = all(state == "ok" for state in readiness.values())
+    if ready:
+        status = "ready"
+    elif any(state == "pending" for state in readiness.values()):
+        status = "warming_up"
+    else:
+        status = "not_ready"
+    return JSONResponse(status_code=200 if ready else 503, content={"status": status, "checks": readiness})
+
 # Parse PDF Endpoint - WITH CRASH PROTECTION
 @app.post("/parse-pdf")
-async def parse_pdf(file: UploadFile = File(...)):
+async def parse_pdf(file: UploadFile = File(...), no_cache: bool = False):
     print("🟢 /parse-pdf endpoint called - START")
     try:
         # Simple check
@@ -793,11 +773,11 @@ async def parse_pdf(file: UploadFile = File(...)):
                 headers={"Access-Control-Allow-Origin": "https://intake-prototype.vercel.app"}
             )
         
-        print(f"📁 Processing file: {file.filename}")
+        print("📁 Processing uploaded PDF")
         
         # Step 1: Extract text from PDF
         print("🔍 Step 1: Extracting text from PDF...")
-        text = extract_text_from_pdf(file.file)
+        text = await run_on_upload(extract_text_from_pdf, file)
         if not text:
             print("❌ No text extracted from PDF")
             return JSONResponse(
@@ -810,7 +790,7 @@ async def parse_pdf(file: UploadFile = File(...)):
         
         # Step 2: Use AI to extract structured data
         print("🤖 Step 2: Using AI to extract data...")
-        extracted_data = extract_data_with_ai(text)
+        extracted_data = await run_blocking(extract_data_with_ai, text, use_cache=not no_cache)
         if not extracted_data:
             print("❌ AI extraction failed")
             return JSONResponse(
@@ -819,26 +799,15 @@ async def parse_pdf(file: UploadFile = File(...)):
                 headers={"Access-Control-Allow-Origin": "https://intake-prototype.vercel.app"}
             )
         
-        print(f"✅ AI extracted data: {extracted_data}")
+        print(f"✅ AI extracted {len(extracted_data)} patient fields")
 
         # Step 3: Save to database
-        print("💾 Step 3: Saving to database...")
-        db = SessionLocal()
+        print("💾 Step 3: Queueing database save...")
         try:
-            db_patient = Patient(
-                patient_name=extracted_data["patient_name"],
-                date_of_birth=extracted_data["date_of_birth"],
-                primary_diagnosis=extracted_data["primary_diagnosis"]
-            )
-            db.add(db_patient)
-            db.commit()
-            db.refresh(db_patient)
-            print(f"✅ Patient saved to database: {extracted_data['patient_name']}")
+            await run_blocking(save_patient, extracted_data)
         except Exception as db_error:
             print(f"❌ Database save failed: {db_error}")
             # Continue even if database fails
-        finally:
-            db.close()        
         
         print("🎉 /parse-pdf completed successfully")
         return JSONResponse(
@@ -863,7 +832,7 @@ async def parse_pdf(file: UploadFile = File(...)):
 
 # Parse Voice Endpoint
 @app.post("/parse-voice")
-async def parse_voice(file: UploadFile = File(...)):
+async def parse_voice(file: UploadFile = File(...), no_cache: bool = False):
     # Basic validation
     allowed_types = ['.mp3', '.wav', '.m4a', '.ogg', '.mp4']
     if not any(file.filename.lower().endswith(ext) for ext in allowed_types):
@@ -871,27 +840,15 @@ async def parse_voice(file: UploadFile = File(...)):
     
     try:
         # Step 1: Transcribe audio to text
-        transcript = transcribe_audio(file.file, file.filename)
+        transcript = await run_on_upload(transcribe_audio, file, file.filename)
         if not transcript:
             return {"error": "Could not transcribe audio"}
         
         # Step 2: Use AI to extract structured data
-        extracted_data = extract_data_with_ai(transcript)
+        extracted_data = await run_blocking(extract_data_with_ai, transcript, use_cache=not no_cache)
 
         # Step 3: Save to database
-        db = SessionLocal()
-        try:
-            db_patient = Patient(
-                patient_name=extracted_data["patient_name"],
-                date_of_birth=extracted_data["date_of_birth"],
-                primary_diagnosis=extracted_data["primary_diagnosis"]
-            )
-            db.add(db_patient)
-            db.commit()
-            db.refresh(db_patient)
-            print(f"✅ Patient saved to database: {extracted_data['patient_name']}")
-        finally:
-            db.close()       
+        await run_blocking(save_patient, extracted_data)
         
         return {
             "status": "success", 
@@ -904,7 +861,7 @@ async def parse_voice(file: UploadFile = File(...)):
 
 # Enhanced PDF parsing for specific questions
 @app.post("/parse-pdf-for-questions")
-async def parse_pdf_for_questions(file: UploadFile = File(...)):
+async def parse_pdf_for_questions(file: UploadFile = File(...), no_cache: bool = False):
     print("🟢 /parse-pdf-for-questions endpoint called")
     try:
         if not file.filename.endswith('.pdf'):
@@ -913,10 +870,10 @@ async def parse_pdf_for_questions(file: UploadFile = File(...)):
                 content={"error": "Please upload a PDF file"}
             )
         
-        print(f"📁 Processing PDF for questions: {file.filename}")
+        print("📁 Processing PDF for questions")
         
         # Step 1: Extract text from PDF
-        text = extract_text_from_pdf(file.file)
+        text = await run_on_upload(extract_text_from_pdf, file)
         if not text:
             return JSONResponse(
                 status_code=400,
@@ -926,7 +883,7 @@ async def parse_pdf_for_questions(file: UploadFile = File(...)):
         print(f"✅ Extracted {len(text)} characters from PDF")
         
         # Step 2: Extract answers for our specific questions
-        extracted_answers = extract_answers_for_questions(text)
+        extracted_answers = await run_blocking(extract_answers_for_questions, text, use_cache=not no_cache)
         
         return JSONResponse(
             status_code=200,
@@ -946,25 +903,24 @@ async def parse_pdf_for_questions(file: UploadFile = File(...)):
 
 # Enhanced audio parsing for specific questions
 @app.post("/parse-audio-for-questions")
-async def parse_audio_for_questions(file: UploadFile = File(...)):
+async def parse_audio_for_questions(file: UploadFile = File(...), no_cache: bool = False):
     print("🟢 /parse-audio-for-questions endpoint called")
     try:
         allowed_types = ['.mp3', '.wav', '.m4a', '.ogg', '.mp4']
         if not any(file.filename.lower().endswith(ext) for ext in allowed_types):
             return {"error": "Please upload an audio file"}
         
-        print(f"📁 Processing audio for questions: {file.filename}")
+        print("📁 Processing audio for questions")
         
         # Step 1: Transcribe audio to text
-        transcript = transcribe_audio(file.file, file.filename)
+        transcript = await run_on_upload(transcribe_audio, file, file.filename)
         if not transcript:
             return {"error": "Could not transcribe audio"}
         
         print(f"✅ Transcribed {len(transcript)} characters from audio")
-        print(f"📄 TRANSCRIPTION: {transcript}")  # Live Audio Transcript
 
         # Step 2: Extract answers for our specific questions
-        extracted_answers = extract_answers_for_questions(transcript)
+        extracted_answers = await run_blocking(extract_answers_for_questions, transcript, use_cache=not no_cache)
         
         return {
             "status": "success",
@@ -976,9 +932,108 @@ async def parse_audio_for_questions(file: UploadFile = File(...)):
         print(f"❌ Error in /parse-audio-for-questions: {e}")
         return {"error": f"Audio processing failed: {str(e)}"}
 
+# Intake pipelines - shared by the request/response endpoints and the job queue
+def save_intake_answers(answers, filename, source_kind):
+    """Queue a full answer set for the intake_answer_sets table - skipped if nothing was found"""
+    if not intake_save_answers or all(value == "Unknown" for value in answers.values()):
+        return
+    row = {
+        "source_filename": filename,
+        "source_kind": source_kind,
+        "answers": answers,
+        "created_at": datetime.utcnow(),
+    }
+    for column, key in ANSWER_SCORE_COLUMNS.items():
+        value = answers.get(key)
+        row[column] = float(value) if isinstance(value, (int, float)) else None
+    try:
+        answer_set_writer.submit(row)
+    except WriteQueueFullError as e:
+        # The answers still go back to the caller
+        print(f"⚠️ Intake answers not saved: {e}")
+
+def run_pdf_intake_pipeline(pdf_path, filename, use_cache=True, on_progress=None):
+    """Extract text from a PDF and answer all intake questions"""
+    print("📁 Processing PDF for intake questions")
+
+    # Step 1: Extract text from PDF
+    text = extract_text_from_pdf(pdf_path, on_progress)
+    if not text:
+        return {"error": "Could not extract text from PDF"}
+
+    print(f"✅ Extracted {len(text)} characters from PDF")
+    report_progress(on_progress, "text_extracted", characters=len(text))
+
+    # Step 2: Extract answers for intake questions
+    extracted_answers = extract_answers_for_intake_questions(text, use_cache=use_cache, on_progress=on_progress)
+    save_intake_answers(extracted_answers, filename, "pdf")
+
+    return {
+        "status": "success",
+        "message": "PDF processed for intake questions!",
+        "extracted_answers": extracted_answers
+    }
+
+def run_audio_intake_pipeline(audio_path, filename, use_cache=True, on_progress=None):
+    """Transcribe an audio file and answer all intake questions"""
+    print("📁 Processing audio for intake questions")
+
+    # Step 1: Transcribe audio to text
+    transcript = transcribe_audio(audio_path, filename)
+    if not transcript:
+        return {"error": "Could not transcribe audio"}
+
+    print(f"✅ Transcribed {len(transcript)} characters from audio")
+    report_progress(on_progress, "transcript_ready", characters=len(transcript))
+
+    # Step 2: Extract answers for intake questions
+    extracted_answers = extract_answers_for_intake_questions(transcript, use_cache=use_cache, on_progress=on_progress)
+    save_intake_answers(extracted_answers, filename, "audio")
+
+    return {
+        "status": "success",
+        "message": "Audio processed for intake questions!",
+        "extracted_answers": extracted_answers
+    }
+
+def run_intake_pipeline_for_path(path, filename, use_cache=True):
+    """Pick the PDF or audio intake pipeline by file extension - used by batch runs"""
+    if filename.lower().endswith(batch.PDF_EXTENSIONS):
+        return run_pdf_intake_pipeline(path, filename, use_cache=use_cache)
+    if filename.lower().endswith(batch.AUDIO_EXTENSIONS):
+        return run_audio_intake_pipeline(path, filename, use_cache=use_cache)
+    return {"error": f"Unsupported file type: {filename}"}
+
+async def submit_intake_job(kind, pipeline, file, use_cache=True):
+    """Queue an intake pipeline and return the job id straight away"""
+    # The upload is closed once the response is sent, so the job takes over the spool file
+    upload = await spool_upload(file)
+    try:
+        job_id = job_queue.submit(kind, run_pipeline_on_upload, pipeline, upload, use_cache=use_cache)
+    except QueueFullError as e:
+        upload.discard()
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(e)},
+            headers={"Retry-After": "30"}
+        )
+    except Exception:
+        # e.g. the job store is unreachable - don't leave the spooled upload behind
+        upload.discard()
+        raise
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }
+    )
+
 # Enhanced PDF parsing for intake questions
 @app.post("/parse-pdf-for-intake")
-async def parse_pdf_for_intake(file: UploadFile = File(...)):
+async def parse_pdf_for_intake(file: UploadFile = File(...), background: bool = False, no_cache: bool = False):
     print("🟢 /parse-pdf-for-intake endpoint called")
     try:
         if not file.filename.endswith('.pdf'):
@@ -986,30 +1041,15 @@ async def parse_pdf_for_intake(file: UploadFile = File(...)):
                 status_code=400,
                 content={"error": "Please upload a PDF file"}
             )
-        
-        print(f"📁 Processing PDF for intake questions: {file.filename}")
-        
-        # Step 1: Extract text from PDF
-        text = extract_text_from_pdf(file.file)
-        if not text:
-            return JSONResponse(
-                status_code=400,
-                content={"error": "Could not extract text from PDF"}
-            )
-        
-        print(f"✅ Extracted {len(text)} characters from PDF")
-        
-        # Step 2: Extract answers for intake questions
-        extracted_answers = extract_answers_for_intake_questions(text)
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "message": "PDF processed for intake questions!",
-                "extracted_answers": extracted_answers
-            }
-        )
+
+        if background:
+            return await submit_intake_job("pdf_intake", run_pdf_intake_pipeline, file, use_cache=not no_cache)
+
+        result = await run_on_upload(run_pdf_intake_pipeline, file, file.filename, use_cache=not no_cache)
+        if "error" in result:
+            return JSONResponse(status_code=400, content=result)
+
+        return JSONResponse(status_code=200, content=result)
         
     except Exception as e:
         print(f"❌ Error in /parse-pdf-for-intake: {e}")
@@ -1020,64 +1060,498 @@ async def parse_pdf_for_intake(file: UploadFile = File(...)):
 
 # Enhanced audio parsing for intake questions
 @app.post("/parse-audio-for-intake")
-async def parse_audio_for_intake(file: UploadFile = File(...)):
+async def parse_audio_for_intake(file: UploadFile = File(...), background: bool = False, no_cache: bool = False):
     print("🟢 /parse-audio-for-intake endpoint called")
     try:
         allowed_types = ['.mp3', '.wav', '.m4a', '.ogg', '.mp4']
         if not any(file.filename.lower().endswith(ext) for ext in allowed_types):
             return {"error": "Please upload an audio file"}
-        
-        print(f"📁 Processing audio for intake questions: {file.filename}")
-        
-        # Step 1: Transcribe audio to text
-        transcript = transcribe_audio(file.file, file.filename)
-        if not transcript:
-            return {"error": "Could not transcribe audio"}
-        
-        print(f"✅ Transcribed {len(transcript)} characters from audio")
-        print(f"📄 TRANSCRIPTION: {transcript}")
 
-        # Step 2: Extract answers for intake questions
-        extracted_answers = extract_answers_for_intake_questions(transcript)
-        
-        return {
-            "status": "success",
-            "message": "Audio processed for intake questions!",
-            "extracted_answers": extracted_answers
-        }
+        if background:
+            return await submit_intake_job("audio_intake", run_audio_intake_pipeline, file, use_cache=not no_cache)
+
+        return await run_on_upload(run_audio_intake_pipeline, file, file.filename, use_cache=not no_cache)
         
     except Exception as e:
         print(f"❌ Error in /parse-audio-for-intake: {e}")
         return {"error": f"Audio processing failed: {str(e)}"}
 
-# Get all patients endpoint
+# Server-Sent Events for the streaming intake endpoints
+sse_keepalive_seconds = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_intake_pipeline(pipeline, upload, use_cache=True):
+    """Run an intake pipeline in the pool and yield its progress as SSE, ending with the full result"""
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def on_progress(event, data):
+        # Called from pipeline threads - hop back onto the event loop
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    # The pipeline deletes the spool file itself, so it is safe even if the client disconnects
+    task = asyncio.ensure_future(
+        run_blocking(run_pipeline_on_upload, pipeline, upload, use_cache=use_cache, on_progress=on_progress)
+    )
+    task.add_done_callback(lambda _: events.put_nowait(None))
+
+    while True:
+        try:
+            item = await asyncio.wait_for(events.get(), timeout=sse_keepalive_seconds)
+        except asyncio.TimeoutError:
+            # Comment line so proxies don't drop a quiet connection during long OCR
+            yield ": keepalive\n\n"
+            continue
+        if item is None:
+            break
+        yield sse_event(*item)
+
+    try:
+        result = task.result()
+    except Exception as e:
+        print(f"❌ Error in streaming pipeline: {e}")
+        result = {"error": f"Processing failed: {str(e)}"}
+    # Same payload the non-streaming endpoint returns
+    yield sse_event("error" if "error" in result else "result", result)
+
+def sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/parse-pdf-for-intake/stream")
+async def parse_pdf_for_intake_stream(file: UploadFile = File(...), no_cache: bool = False):
+    print("🟢 /parse-pdf-for-intake/stream endpoint called")
+    if not file.filename.endswith('.pdf'):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Please upload a PDF file"}
+        )
+
+    # The upload may be closed before the stream finishes, so the pipeline takes over the spool file
+    upload = await spool_upload(file)
+    return sse_response(stream_intake_pipeline(run_pdf_intake_pipeline, upload, use_cache=not no_cache))
+
+@app.post("/parse-audio-for-intake/stream")
+async def parse_audio_for_intake_stream(file: UploadFile = File(...), no_cache: bool = False):
+    print("🟢 /parse-audio-for-intake/stream endpoint called")
+    allowed_types = ['.mp3', '.wav', '.m4a', '.ogg', '.mp4']
+    if not any(file.filename.lower().endswith(ext) for ext in allowed_types):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Please upload an audio file"}
+        )
+
+    upload = await spool_upload(file)
+    return sse_response(stream_intake_pipeline(run_audio_intake_pipeline, upload, use_cache=not no_cache))
+
+# Batch ingestion of a zip of referrals and recordings
+batch_progress = {}  # batch_id -> live counters while the batch runs in this process
+
+def run_uploaded_batch(batch_id, batch_dir, use_cache=True):
+    progress = batch_progress.setdefault(batch_id, {})
+    try:
+        return batch.run_batch(
+            os.path.join(batch_dir, "inputs"),
+            os.path.join(batch_dir, "results.jsonl"),
+            lambda path, filename: run_intake_pipeline_for_path(path, filename, use_cache=use_cache),
+            progress=progress,
+        )
+    except Exception:
+        progress["state"] = "failed"
+        raise
+    finally:
+        progress["finished_at"] = time.time()
+
+def purge_batch_progress():
+    """Forget live counters for batches that finished more than JOB_TTL_SECONDS ago, like their jobs"""
+    cutoff = time.time() - job_ttl_seconds
+    for batch_id, progress in list(batch_progress.items()):
+        if progress.get("finished_at", cutoff) < cutoff:
+            batch_progress.pop(batch_id, None)
+
+def unpack_batch(zip_path, batch_dir):
+    os.makedirs(batch_dir)
+    try:
+        return batch.extract_zip(zip_path, os.path.join(batch_dir, "inputs"))
+    except (batch.BatchError, zipfile.BadZipFile):
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
+
+@app.post("/batch")
+async def create_batch(file: UploadFile = File(...), no_cache: bool = False):
+    print("🟢 /batch endpoint called")
+    if not file.filename.lower().endswith('.zip'):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Please upload a zip archive of PDF and audio files"}
+        )
+
+    batch_id = str(uuid.uuid4())
+    batch_dir = os.path.join(batch.batch_root, batch_id)
+    try:
+        documents = await run_on_upload(unpack_batch, file, batch_dir)
+    except (batch.BatchError, zipfile.BadZipFile) as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    print(f"📦 Unpacked {documents} documents into batch {batch_id}")
+
+    try:
+        response = submit_batch_job(batch_id, batch_dir, use_cache=not no_cache)
+    except Exception:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
+    if response.status_code == 503:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+    return response
+
+def submit_batch_job(batch_id, batch_dir, use_cache=True):
+    purge_batch_progress()
+    batch_progress[batch_id] = {"state": "queued"}
+    try:
+        job_id = batch_queue.submit("batch", run_uploaded_batch, batch_id, batch_dir, use_cache=use_cache)
+    except QueueFullError as e:
+        batch_progress.pop(batch_id, None)
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(e)},
+            headers={"Retry-After": "30"}
+        )
+    except Exception:
+        batch_progress.pop(batch_id, None)
+        raise
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "batch_id": batch_id,
+            "job_id": job_id,
+            "status_url": f"/batch/{batch_id}"
+        }
+    )
+
+def find_batch_dir(batch_id):
+    """Directory of an uploaded batch, or None for unknown or malformed ids"""
+    try:
+        uuid.UUID(batch_id)
+    except ValueError:
+        return None
+    batch_dir = os.path.join(batch.batch_root, batch_id)
+    return batch_dir if os.path.isdir(batch_dir) else None
+
+@app.post("/batch/{batch_id}/resume")
+def resume_batch(batch_id: str, no_cache: bool = False):
+    """Restart an interrupted batch - documents that already succeeded are skipped"""
+    batch_dir = find_batch_dir(batch_id)
+    if not batch_dir:
+        return JSONResponse(status_code=404, content={"error": "Batch not found"})
+    if batch_progress.get(batch_id, {}).get("state") in ("queued", "running"):
+        return JSONResponse(status_code=409, content={"error": "Batch is already running"})
+    return submit_batch_job(batch_id, batch_dir, use_cache=not no_cache)
+
+@app.get("/batch/{batch_id}")
+def get_batch(batch_id: str):
+    purge_batch_progress()
+    if batch_id in batch_progress:
+        return batch_progress[batch_id]
+    # Not running here (expired, or after a restart) - report from the results checkpoint
+    batch_dir = find_batch_dir(batch_id)
+    if not batch_dir:
+        return JSONResponse(status_code=404, content={"error": "Batch not found"})
+    records = batch.load_checkpoint(os.path.join(batch_dir, "results.jsonl")).values()
+    total = len(batch.list_documents(os.path.join(batch_dir, "inputs")))
+    return {
+        "state": "finished" if len(records) >= total else "stopped",
+        "total": total,
+        "succeeded": sum(1 for record in records if record["status"] == "succeeded"),
+        "failed": sum(1 for record in records if record["status"] == "failed"),
+    }
+
+@app.get("/batch/{batch_id}/results")
+def get_batch_results(batch_id: str):
+    batch_dir = find_batch_dir(batch_id)
+    results_path = os.path.join(batch_dir, "results.jsonl") if batch_dir else None
+    if not results_path or not os.path.exists(results_path):
+        return JSONResponse(status_code=404, content={"error": "No results yet"})
+    return list(batch.load_checkpoint(results_path).values())
+
+# Job status endpoint for background intake jobs
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Poll the status and result of a background intake job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Job not found or expired"}
+        )
+
+    return job
+
+# Cache statistics endpoint
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Report hit/miss counters for the PDF text and LLM response caches"""
+    return {
+        "pdf_text": pdf_text_cache.stats(),
+        "llm_responses": llm_response_cache.stats()
+    }
+
+@app.get("/metrics")
+def get_metrics():
+    """Stage latencies, fallbacks, cache hits and queue depths in the Prometheus text format"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/llm/usage")
+def get_llm_usage():
+    """Input, cached-input and output tokens plus latency per prompt version since startup"""
+    return {"usage": llm_usage.stats()}
+
+# Patient listing page sizes
+patients_page_size = int(os.getenv("PATIENTS_PAGE_SIZE", "50"))
+patients_max_page_size = int(os.getenv("PATIENTS_MAX_PAGE_SIZE", "500"))
+
+PATIENT_LIST_COLUMNS = (
+    Patient.id, Patient.patient_name, Patient.date_of_birth, Patient.primary_diagnosis, Patient.created_at,
+)
+
+def page_limit(limit):
+    return max(1, min(limit or patients_page_size, patients_max_page_size))
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor for the (created_at, id) of the row a page ended on"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    created_at, row_id = raw.split("|")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+def count_patients(db):
+    """(total, is_estimate) - Postgres uses the planner's row estimate instead of scanning the table"""
+    if engine.dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'patients'::regclass")
+        ).scalar()
+        # -1 means the table has never been analyzed
+        if estimate is not None and estimate >= 0:
+            return int(estimate), True
+    return db.execute(text("SELECT COUNT(*) FROM patients")).scalar(), False
+
+# Get saved patients endpoint
 @app.get("/patients")
-def get_patients():
-    """Get all saved patients from the database"""
+def get_patients(limit: int = None, cursor: str = None, include_total: bool = False):
+    """Newest saved patients first, one page at a time
+
+    Pass the returned next_cursor back as `cursor` for the following page. Pages seek
+    on the (created_at, id) index, so deep pages cost the same as the first one.
+    """
+    limit = page_limit(limit)
+    query = select(*PATIENT_LIST_COLUMNS).order_by(Patient.created_at.desc(), Patient.id.desc()).limit(limit + 1)
+    if cursor:
+        try:
+            created_at, patient_id = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+        query = query.where(tuple_(Patient.created_at, Patient.id) < (created_at, patient_id))
+
     try:
         db = SessionLocal()
-        patients = db.query(Patient).order_by(Patient.created_at.desc()).all()
-        db.close()
-        
-        # Convert to list of dictionaries for JSON response
-        patient_list = []
-        for patient in patients:
-            patient_list.append({
-                "id": patient.id,
-                "patient_name": patient.patient_name,
-                "date_of_birth": patient.date_of_birth,
-                "primary_diagnosis": patient.primary_diagnosis,
-                "created_at": patient.created_at.isoformat()
-            })
-        
-        return {
-            "status": "success",
-            "count": len(patient_list),
-            "patients": patient_list
-        }
-        
+        try:
+            rows = db.execute(query).all()
+            total = count_patients(db) if include_total else None
+        finally:
+            db.close()
+    except Exception as e:
+        return {"error": f"Failed to fetch patients: {str(e)}"}
+
+    # The extra row only tells us whether another page exists
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    response = {
+        "status": "success",
+        "count": len(page),
+        "patients": [
+            {
+                "id": row.id,
+                "patient_name": row.patient_name,
+                "date_of_birth": row.date_of_birth,
+                "primary_diagnosis": row.primary_diagnosis,
+                "created_at": row.created_at.isoformat()
+            }
+            for row in page
+        ],
+        "next_cursor": next_cursor,
+    }
+    if include_total:
+        response["total"], response["total_is_estimate"] = total
+    return response
+
+# Intake answer-set queries
+INTAKE_ANSWER_SPECS = {key: spec for specs in INTAKE_SECTION_SPECS.values() for key, spec in specs.items()}
+
+def canonical_answer_value(key, value):
+    """The filter value as answers store it: the field's own spelling of an option, or a number for numeric fields"""
+    value = value.strip()
+    spec = INTAKE_ANSWER_SPECS.get(key, {"kind": "text"})
+    if spec["kind"] == "multi":
+        # A filter names one option of the list
+        spec = dict(spec, kind="enum")
+    try:
+        return normalize_value(value, spec)
+    except ValueError:
+        return value
+
+def answer_path(key):
+    return f'$."{key}"'
+
+def answer_value(key):
+    """SQL expression for one of the fixed answer keys, read back as its JSON value"""
+    if engine.dialect.name == "postgresql":
+        # Inline key so the expression is written exactly like the GIN index on it
+        return IntakeAnswerSet.answers.op("->", return_type=JSONB)(literal_column(f"'{key}'"))
+    # json_quote leaves arrays alone and turns bare strings back into JSON
+    return func.json_quote(func.json_extract(IntakeAnswerSet.answers, answer_path(key)), type_=JSON)
+
+def answer_matches(key, value):
+    """SQL condition: the answer for key is value, or is a list containing it"""
+    if engine.dialect.name == "postgresql":
+        if key in INDEXED_ANSWER_KEYS.values():
+            # Same expression as the per-key GIN index. A bare JSONB value contained in the
+            # expression matches both a list holding it and an answer saved as that scalar
+            return answer_value(key).contains(literal(value, JSONB))
+        # Whole-column containment, served by the jsonb_path_ops index
+        answers = type_coerce(IntakeAnswerSet.answers, JSONB)
+        return or_(answers.contains({key: value}), answers.contains({key: [value]}))
+    values = func.json_each(IntakeAnswerSet.answers, answer_path(key)).table_valued("value")
+    return exists(select(1).select_from(values).where(values.c.value == value))
+
+ANSWER_SET_COLUMNS = (
+    IntakeAnswerSet.id, IntakeAnswerSet.source_filename, IntakeAnswerSet.source_kind,
+    IntakeAnswerSet.impairment_score, IntakeAnswerSet.participation_score, IntakeAnswerSet.wellbeing_score,
+    IntakeAnswerSet.created_at,
+)
+
+def answer_set_summary(row):
+    return {
+        "id": row.id,
+        "source_filename": row.source_filename,
+        "source_kind": row.source_kind,
+        "impairment_score": row.impairment_score,
+        "participation_score": row.participation_score,
+        "wellbeing_score": row.wellbeing_score,
+        "created_at": row.created_at.isoformat(),
+    }
+
+@app.get("/intake-answers")
+def query_intake_answers(
+    diagnosis: list[str] = Query(None),
+    funding_source: list[str] = Query(None),
+    answer: list[str] = Query(None),
+    min_impairment_score: float = None,
+    max_impairment_score: float = None,
+    min_participation_score: float = None,
+    max_participation_score: float = None,
+    min_wellbeing_score: float = None,
+    max_wellbeing_score: float = None,
+    limit: int = None,
+    cursor: str = None,
+    include_answers: bool = False,
+    include_total: bool = False,
+):
+    """Saved intake answer sets matching every filter, newest first
+
+    Repeat diagnosis/funding_source to require each value. `answer=key:value` filters on
+    any other intake field. Pages work like /patients.
+    """
+    filters = [(INDEXED_ANSWER_KEYS["diagnosis"], value) for value in diagnosis or []]
+    filters += [(INDEXED_ANSWER_KEYS["funding_source"], value) for value in funding_source or []]
+    for item in answer or []:
+        key, separator, value = item.partition(":")
+        if not separator or key not in INTAKE_ANSWER_SPECS:
+            return JSONResponse(status_code=400, content={"error": f"Invalid answer filter: {item}"})
+        filters.append((key, value))
+    conditions = [answer_matches(key, canonical_answer_value(key, value)) for key, value in filters]
+
+    score_ranges = {
+        "impairment_score": (min_impairment_score, max_impairment_score),
+        "participation_score": (min_participation_score, max_participation_score),
+        "wellbeing_score": (min_wellbeing_score, max_wellbeing_score),
+    }
+    for column, (low, high) in score_ranges.items():
+        if low is not None:
+            conditions.append(getattr(IntakeAnswerSet, column) >= low)
+        if high is not None:
+            conditions.append(getattr(IntakeAnswerSet, column) <= high)
+
+    limit = page_limit(limit)
+    extra_columns = [IntakeAnswerSet.answers] if include_answers else [
+        answer_value(key).label(name) for name, key in INDEXED_ANSWER_KEYS.items()
+    ]
+    query = (
+        select(*ANSWER_SET_COLUMNS, *extra_columns)
+        .where(and_(True, *conditions))
+        .order_by(IntakeAnswerSet.created_at.desc(), IntakeAnswerSet.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            created_at, answer_set_id = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+        query = query.where(tuple_(IntakeAnswerSet.created_at, IntakeAnswerSet.id) < (created_at, answer_set_id))
+
+    try:
+        db = SessionLocal()
+        try:
+            rows = db.execute(query).all()
+            total = None
+            if include_total:
+                total = db.execute(select(func.count()).select_from(IntakeAnswerSet).where(and_(True, *conditions))).scalar()
+        finally:
+            db.close()
     except Exception as e:
-        return {"error": f"Failed to fetch patients: {str(e)}"}        
+        return {"error": f"Failed to query intake answers: {str(e)}"}
+
+    page = rows[:limit]
+    results = []
+    for row in page:
+        result = answer_set_summary(row)
+        if include_answers:
+            result["answers"] = row.answers
+        else:
+            result.update({name: getattr(row, name) for name in INDEXED_ANSWER_KEYS})
+        results.append(result)
+
+    response = {
+        "status": "success",
+        "count": len(results),
+        "answer_sets": results,
+        "next_cursor": encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None,
+    }
+    if include_total:
+        response["total"] = total
+    return response
+
+@app.get("/intake-answers/{answer_set_id}")
+def get_intake_answers(answer_set_id: int):
+    """One saved answer set with all of its answers"""
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            select(*ANSWER_SET_COLUMNS, IntakeAnswerSet.answers).where(IntakeAnswerSet.id == answer_set_id)
+        ).first()
+    finally:
+        db.close()
+    if row is None:
+        return JSONResponse(status_code=404, content={"error": "Answer set not found"})
+    return dict(answer_set_summary(row), answers=row.answers)
 
 #if __name__ == "__main__":
  #   port = int(os.environ.get("PORT", 10000))  # Use 10000 as default
@@ -0,0 +1,98 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Pipeline stages with their own latency histogram and in-flight gauge
+STAGES = ("pdf_text", "rasterize", "ocr_page", "whisper", "llm", "db_write")
+
+# Fallback paths worth watching - each one means the fast path didn't work out
+FALLBACKS = ("textract_ocr", "audio_single_request", "llm_repair", "section_retry", "textract_throttled")
+
+# Seconds - from a cached pdfplumber page up to a slow multi-minute Whisper upload
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+stage_seconds = Histogram(
+    "intake_stage_seconds", "Time spent in each pipeline stage", ["stage"], buckets=STAGE_BUCKETS
+)
+stage_in_flight = Gauge("intake_stage_in_flight", "Pipeline stage calls currently running", ["stage"])
+llm_request_seconds = Histogram(
+    "intake_llm_request_seconds", "Chat completion latency per prompt version", ["prompt"], buckets=STAGE_BUCKETS
+)
+llm_tokens = Counter("intake_llm_tokens", "LLM tokens per prompt version", ["prompt", "kind"])
+fallbacks = Counter("intake_fallbacks", "Times a pipeline fell back to a slower path", ["kind"])
+json_parse_failures = Counter(
+    "intake_json_parse_failures", "Completions that were not a clean JSON object and had to be salvaged"
+)
+
+# Label children are resolved once here so the hot path is a lock and an add
+_stage_timers = {stage: stage_seconds.labels(stage) for stage in STAGES}
+_stage_gauges = {stage: stage_in_flight.labels(stage) for stage in STAGES}
+_fallback_counters = {kind: fallbacks.labels(kind) for kind in FALLBACKS}
+
+
+@contextmanager
+def track_stage(stage):
+    """Time a block under `stage` and count it as in flight while it runs"""
+    gauge = _stage_gauges[stage]
+    gauge.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_timers[stage].observe(time.perf_counter() - start)
+        gauge.dec()
+
+
+def record_fallback(kind, count=1):
+    _fallback_counters[kind].inc(count)
+
+
+def record_llm_call(prompt, seconds, input_tokens, cached_tokens, output_tokens):
+    """One chat completion - its latency and tokens per prompt (the llm stage itself is timed by track_stage)"""
+    llm_request_seconds.labels(prompt).observe(seconds)
+    llm_tokens.labels(prompt, "input").inc(input_tokens)
+    llm_tokens.labels(prompt, "cached").inc(cached_tokens)
+    llm_tokens.labels(prompt, "output").inc(output_tokens)
+
+
+class PipelineCollector:
+    """Reads cache counters and queue depths when /metrics is scraped, so requests never pay for them"""
+
+    def __init__(self):
+        self.caches = {}
+        self.queues = {}
+
+    def add_cache(self, name, cache):
+        self.caches[name] = cache
+
+    def add_queue(self, name, depth):
+        """`depth` is a callable returning how many items are waiting or running"""
+        self.queues[name] = depth
+
+    def collect(self):
+        hits = CounterMetricFamily("intake_cache_hits", "Cache lookups that found an entry", labels=["cache"])
+        misses = CounterMetricFamily("intake_cache_misses", "Cache lookups that found nothing", labels=["cache"])
+        cache_bytes = GaugeMetricFamily("intake_cache_memory_bytes", "Bytes held by the in-memory cache tier", labels=["cache"])
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            cache_bytes.add_metric([name], stats["memory_bytes"])
+        yield hits
+        yield misses
+        yield cache_bytes
+
+        depth = GaugeMetricFamily("intake_queue_depth", "Items waiting or in progress per queue", labels=["queue"])
+        for name, queue_depth in self.queues.items():
+            depth.add_metric([name], queue_depth())
+        yield depth
+
+
+pipeline_collector = PipelineCollector()
+REGISTRY.register(pipeline_collector)
+
+
+def render_metrics():
+    """(body, content type) in the Prometheus text format"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
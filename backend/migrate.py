@@ -0,0 +1,23 @@
+"""Create the database tables and any indexes they are missing
+
+    python migrate.py
+
+The app also runs this during its background warm-up unless MIGRATE_ON_STARTUP
+is "false" (the default is "true", so local dev needs no extra step). render.yaml
+turns that off and runs it once per deploy as the preDeployCommand instead.
+"""
+from database import Base, engine
+
+
+def run_migrations(bind=None):
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    print(f"✅ Database schema up to date ({len(Base.metadata.tables)} tables)")
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -1,13 +1,215 @@
-import pytesseract
-from pdf2image import convert_from_path
+import os
+import io
+import time
+import random
+import resource
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+from metrics import track_stage, record_fallback
+from tracing import span, bind_context
+
+# Textract dispatch configuration
+textract_concurrency = int(os.getenv("TEXTRACT_CONCURRENCY", "4"))
+textract_max_retries = int(os.getenv("TEXTRACT_MAX_RETRIES", "5"))
+textract_backoff_seconds = float(os.getenv("TEXTRACT_BACKOFF_SECONDS", "0.5"))
+
+# Rasterization configuration
+raster_window_pages = int(os.getenv("RASTER_WINDOW_PAGES", "4"))
+raster_to_disk = os.getenv("RASTER_TO_DISK", "false").lower() == "true"
+
+THROTTLING_ERRORS = (
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+)
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB"""
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def page_windows(page_numbers, window):
+    """Split 1-based page numbers into contiguous (first, last) runs of at most `window` pages"""
+    windows = []
+    for page_number in sorted(page_numbers):
+        if windows and page_number == windows[-1][1] + 1 and page_number - windows[-1][0] < window:
+            windows[-1][1] = page_number
+        else:
+            windows.append([page_number, page_number])
+    return [tuple(w) for w in windows]
+
+
+def iter_page_images(pdf_path, page_numbers, dpi, window=None, to_disk=None):
+    """Yield (page_number, PIL image), rendering at most `window` pages at a time
+
+    Each image is closed as soon as the consumer moves on. With `to_disk`,
+    pdftoppm writes JPEGs into a temp dir and only one page is decoded at once.
+    """
+    window = window or raster_window_pages
+    to_disk = raster_to_disk if to_disk is None else to_disk
+
+    for first_page, last_page in page_windows(page_numbers, window):
+        if to_disk:
+            with tempfile.TemporaryDirectory(prefix="raster-") as output_folder:
+                with track_stage("rasterize"):
+                    paths = convert_from_path(
+                        pdf_path, dpi=dpi, first_page=first_page, last_page=last_page,
+                        output_folder=output_folder, paths_only=True, fmt="jpeg"
+                    )
+                for page_number, path in zip(range(first_page, last_page + 1), sorted(paths)):
+                    with Image.open(path) as image:
+                        yield page_number, image
+                    os.remove(path)
+        else:
+            with track_stage("rasterize"):
+                images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+            page_number = first_page
+            while images:
+                image = images.pop(0)
+                try:
+                    yield page_number, image
+                finally:
+                    image.close()
+                page_number += 1
+
+
+def iter_encoded_pages(pdf_path, page_numbers, dpi=200, window=None, to_disk=None):
+    """Yield (page_number, JPEG bytes) for OCR services that take encoded images"""
+    for page_number, image in iter_page_images(pdf_path, page_numbers, dpi, window, to_disk):
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format='JPEG')
+        yield page_number, buffer.getvalue()
+
 
 def extract_text_from_scanned_pdf(pdf_path):
     try:
-        images = convert_from_path(pdf_path, dpi=300)
-        full_text = ""
-        for i, image in enumerate(images):
-            text = pytesseract.image_to_string(image)
-            full_text += f"--- Page {i+1} ---\n{text}\n"
-        return full_text.strip()
+        import pytesseract
+
+        page_count = pdfinfo_from_path(pdf_path)["Pages"]
+        page_texts = []
+        for page_number, image in iter_page_images(pdf_path, range(1, page_count + 1), dpi=300):
+            with track_stage("ocr_page"):
+                text = pytesseract.image_to_string(image)
+            page_texts.append(f"--- Page {page_number} ---\n{text}\n")
+        print(f"📈 Peak memory after OCR: {peak_rss_mb():.0f} MB")
+        return "".join(page_texts).strip()
     except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+        return f"Error: {str(e)}"
+
+
+def is_throttling_error(error):
+    """True for Textract's rate-limit errors (botocore ClientError or a stub raising by name)"""
+    # Transport errors (ReadTimeoutError, EndpointConnectionError) carry response=None
+    code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+    return code in THROTTLING_ERRORS or type(error).__name__ in THROTTLING_ERRORS
+
+
+class AdaptiveThrottle:
+    """Limit in-flight Textract calls - halve the limit on throttling, grow it back on success"""
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.throttled_calls = 0
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, throttled=False):
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self.throttled_calls += 1
+                self.limit = max(1.0, self.limit / 2)
+                self._successes = 0
+            else:
+                # Additive increase once a full window of calls has succeeded
+                self._successes += 1
+                if self._successes >= int(self.limit):
+                    self.limit = min(float(self.max_concurrency), self.limit + 1)
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def detect_page_text(client, image_bytes, throttle):
+    """Run detect_document_text on one page image, backing off while Textract throttles us"""
+    with track_stage("ocr_page"), span("textract_page", bytes=len(image_bytes)) as attrs:
+        for attempt in range(textract_max_retries + 1):
+            attrs["attempts"] = attempt + 1
+            throttle.acquire()
+            throttled = False
+            try:
+                response = client.detect_document_text(Document={'Bytes': image_bytes})
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                if not throttled or attempt == textract_max_retries:
+                    raise
+            finally:
+                # Released on every path - a leaked slot would block the other workers for good
+                throttle.release(throttled=throttled)
+            if throttled:
+                record_fallback("textract_throttled")
+                # Exponential backoff with jitter before trying this page again
+                delay = textract_backoff_seconds * (2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                continue
+
+            page_text = ""
+            for block in response['Blocks']:
+                if block['BlockType'] == 'LINE':
+                    page_text += block['Text'] + "\n"
+            return page_text
+
+
+def textract_pages(client, pages, concurrency=None, on_page=None):
+    """OCR (page_number, image_bytes) pairs concurrently and return {page_number: text}
+
+    `pages` is consumed lazily, so only a few encoded images are held at once.
+    `on_page(page_number)` is called as each page finishes, in completion order.
+    """
+    concurrency = concurrency or textract_concurrency
+    throttle = AdaptiveThrottle(concurrency)
+    page_texts = {}
+    pending = {}
+    pages = iter(pages)
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="textract") as executor:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    page_number, image_bytes = next(pages)
+                except StopIteration:
+                    exhausted = True
+                    break
+                print(f"🔍 Textract processing page {page_number}")
+                future = executor.submit(bind_context(detect_page_text), client, image_bytes, throttle)
+                pending[future] = page_number
+
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_number = pending.pop(future)
+                try:
+                    page_texts[page_number] = future.result()
+                except Exception as e:
+                    print(f"❌ Textract failed on page {page_number}: {e}")
+                    continue
+                if on_page:
+                    on_page(page_number)
+
+    if throttle.throttled_calls:
+        print(f"🐢 Textract throttled {throttle.throttled_calls} calls - settled at {int(throttle.limit)} concurrent")
+    # Dict ordered by page number so callers can reassemble directly
+    return dict(sorted(page_texts.items()))
@@ -0,0 +1,160 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Page-parallel extraction configuration
+pdf_extract_workers = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+pdf_pages_per_shard = int(os.getenv("PDF_PAGES_PER_SHARD", "10"))
+pdf_max_parallel_pages = int(os.getenv("PDF_MAX_PARALLEL_PAGES", "40"))
+pdf_parallel_min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+# Per-page OCR classification
+ocr_min_text_chars = int(os.getenv("PDF_OCR_MIN_TEXT_CHARS", "20"))
+ocr_image_coverage = float(os.getenv("PDF_OCR_IMAGE_COVERAGE", "0.6"))
+ocr_max_text_chars_with_image = int(os.getenv("PDF_OCR_MAX_TEXT_CHARS_WITH_IMAGE", "200"))
+
+_pool = None
+_pool_warm = False  # every worker started and has pdfplumber imported
+_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """Create the shared process pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps workers from inheriting the server's threads and sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=pdf_extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _import_pdfplumber():
+    import pdfplumber  # noqa: F401
+
+
+def warm_pdf_pool():
+    """Start every worker process and import pdfplumber in it, so small PDFs can use the pool without a cold start"""
+    global _pool_warm
+    if pdf_extract_workers <= 1:
+        return
+    pool = get_pdf_pool()
+    # Tasks submitted together each get a new process until max_workers are running
+    for future in [pool.submit(_import_pdfplumber) for _ in range(pdf_extract_workers)]:
+        future.result()
+    _pool_warm = True
+    print(f"✅ PDF extraction pool ready ({pdf_extract_workers} workers)")
+
+
+def shutdown_pdf_pool():
+    global _pool, _pool_warm
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+            _pool_warm = False
+
+
+def image_coverage(page):
+    """Fraction of the page area covered by embedded images"""
+    x0, top, x1, bottom = page.bbox
+    page_area = float((x1 - x0) * (bottom - top)) or 1.0
+    covered = 0.0
+    for image in page.images:
+        width = min(image["x1"], x1) - max(image["x0"], x0)
+        height = min(image["bottom"], bottom) - max(image["top"], top)
+        if width > 0 and height > 0:
+            covered += width * height
+    return min(covered / page_area, 1.0)
+
+
+def page_needs_ocr(text, coverage):
+    """Decide whether a page is a scan that the text layer does not cover"""
+    chars = len(text.strip())
+    if coverage == 0:
+        # Nothing to OCR on a page without images (blank or vector-only)
+        return False
+    if chars < ocr_min_text_chars:
+        return True
+    # Mostly-image page with only a thin text layer (fax header, stamp, page number)
+    return coverage >= ocr_image_coverage and chars < ocr_max_text_chars_with_image
+
+
+def extract_page_range(pdf_source, first_page, last_page):
+    """Extract and classify pages [first_page, last_page) - runs in a worker process"""
+    import pdfplumber
+
+    pages = []
+    with pdfplumber.open(pdf_source) as pdf:
+        for page in pdf.pages[first_page:last_page]:
+            text = page.extract_text() or ""
+            coverage = image_coverage(page)
+            pages.append({
+                "text": text,
+                "image_coverage": round(coverage, 3),
+                "needs_ocr": page_needs_ocr(text, coverage),
+            })
+            # Drop pdfplumber's per-page object cache as we go
+            page.close()
+    return pages
+
+
+def count_pages(pdf_path):
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(pdf_path):
+    """Return the text layer and OCR classification of every page, in page order"""
+    page_count = count_pages(pdf_path)
+    print(f"📄 PDF has {page_count} pages")
+
+    if pdf_extract_workers <= 1:
+        return extract_page_range(pdf_path, 0, page_count)
+    if page_count >= pdf_parallel_min_pages:
+        # Workers open the spooled PDF by path rather than receiving a pickled copy each
+        return extract_pages_in_parallel(pdf_path, page_count)
+    if _pool_warm:
+        # pdfplumber holds the GIL, so even a short PDF goes to a worker process as one task;
+        # otherwise concurrent uploads serialize on this pass
+        return get_pdf_pool().submit(extract_page_range, pdf_path, 0, page_count).result()
+    # Pool not started yet - not worth a process spawn for a few pages
+    return extract_page_range(pdf_path, 0, page_count)
+
+
+def extract_pages_in_parallel(pdf_path, page_count):
+    """Shard pages across the process pool, keeping at most pdf_max_parallel_pages in flight"""
+    shards = [
+        (first, min(first + pdf_pages_per_shard, page_count))
+        for first in range(0, page_count, pdf_pages_per_shard)
+    ]
+    max_in_flight = max(1, pdf_max_parallel_pages // pdf_pages_per_shard)
+    print(f"⚡ Extracting {page_count} pages in {len(shards)} shards ({pdf_extract_workers} workers)")
+
+    pool = get_pdf_pool()
+    results = [None] * len(shards)
+    pending = {}
+    next_shard = 0
+    while next_shard < len(shards) or pending:
+        while next_shard < len(shards) and len(pending) < max_in_flight:
+            first, last = shards[next_shard]
+            pending[pool.submit(extract_page_range, pdf_path, first, last)] = next_shard
+            next_shard += 1
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            shard_index = pending.pop(future)
+            try:
+                results[shard_index] = future.result()
+            except Exception:
+                for other in pending:
+                    other.cancel()
+                raise
+
+    # Reassemble in page order
+    return [page for shard_pages in results for page in shard_pages]
@@ -0,0 +1,334 @@
+"""Versioned prompt templates
+
+Each prompt is a fixed system message (instructions, inference rules and the field
+list) followed by a user message holding only the document text. Every request for a
+prompt then starts with the same bytes, which is what provider-side prompt caching
+matches on - the intake sections also share one long header before their own fields.
+Bump a template's version whenever its wording changes; the version is part of the
+LLM response cache key and of the recorded token usage.
+"""
+from cache import sha256_of_text
+
+DOCUMENT_MESSAGE = "TEXT TO ANALYZE:\n{text}"
+
+
+def document_messages(system, text):
+    """Static instructions first, the variable document last"""
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": DOCUMENT_MESSAGE.format(text=text)},
+    ]
+
+
+class PromptTemplate:
+    def __init__(self, name, version, system):
+        self.name = name
+        self.version = version
+        self.system = system
+
+    @property
+    def label(self):
+        return f"{self.name}@v{self.version}"
+
+    @property
+    def cache_identity(self):
+        """Changes with the version or any edit to the instructions"""
+        return f"{self.label}:{sha256_of_text(self.system)[:12]}"
+
+    def messages(self, text):
+        return document_messages(self.system, text)
+
+
+# Basic patient data extraction
+PATIENT_DATA_PROMPT = PromptTemplate("patient_data", 2, """
+        Extract the following information from the medical document in the next message.
+
+        Return as JSON with these fields:
+        - patient_name: Full name
+        - date_of_birth: YYYY-MM-DD format  
+        - primary_diagnosis: Main condition
+        
+        If any information is missing, use "Unknown"
+        """)
+
+# The 7 demo questions
+DEMO_QUESTIONS_PROMPT = PromptTemplate("demo_questions", 2, """
+        Analyze the medical conversation text in the next message and extract specific information for these 7 questions.
+        Use contextual understanding and medical knowledge to map terms appropriately.
+
+        QUESTIONS TO ANSWER:
+        1. Are you a new participant? (Answer: "Yes" or "No" - look for terms like "new", "first time", "returning", "existing")
+        2. What diagnoses or conditions do you have? (List specific conditions - expand abbreviations: MS→Multiple Sclerosis, COPD→Chronic Obstructive Pulmonary Disease, etc.)
+        3. How often do you get upset, angry, anxious, withdrawn? (Answer: "Never", "Rarely", "Occasionally", "Often", "Almost always" - map synonyms: "sometimes"→"Occasionally", "frequently"→"Often")
+        4. How much support do you need to manage physical challenges? (0-10 number - extract numbers mentioned like "7 out of 10" or descriptive terms mapped to numbers)
+        5. What are your living arrangements? (Describe living situation - extract who they live with, type of housing)
+        6. In the last 30 days, how much was your family impacted because of your disability? (Answer: "None", "Mild", "Moderate", "Severe", "Extreme", "Not Applicable" - map intensity terms: "a little"→"Mild", "somewhat"→"Moderate", "very"→"Severe", "extremely"→"Extreme")
+        7. If we were to score your impairment restrictions (0-5 scale with 0.5 increments - extract numbers mentioned like "3 on a 5 point scale")
+
+        IMPORTANT MAPPING RULES:
+        - "MS", "multiple sclerosis" → "Multiple Sclerosis"
+        - "sometimes", "occasionally" → "Occasionally" 
+        - "often", "frequently" → "Often"
+        - "rarely", "seldom" → "Rarely"
+        - "a little", "slightly" → "Mild"
+        - "somewhat", "moderately" → "Moderate"
+        - "very", "severely", "significantly" → "Severe"
+        - "extremely", "critically" → "Extreme"
+        - Extract numbers directly when mentioned (e.g., "7 out of 10" → 7, "3 on a 5 point scale" → 3)
+
+        Return as JSON with these exact field names:
+        - "introduction.new_participant"
+        - "icf_impairment.diagnoses" 
+        - "wellbeing.frequency"
+        - "icf_impairment.mobility_support_level"
+        - "about_you.living_situation"
+        - "family.carer_wellbeing"
+        - "icf_impairment.score"
+
+        For any information that is missing or unclear, use "Unknown".
+        """)
+
+# Intake prompt - one request per section; all sections share the header and footer
+INTAKE_PROMPT_VERSION = 2
+
+INTAKE_PROMPT_HEADER = """
+
+        Analyze the conversation text in the next message and extract specific information for these intake questions.
+        Use advanced contextual understanding and medical knowledge to infer answers from both explicit statements and implied meanings from descriptions, symptoms, and daily experiences..
+
+        ADVANCED INFERENCE FRAMEWORK:
+
+        SCALE RATING INTERPRETATION (0-5):
+        0 (None): No mention of difficulty, describes full independence, "no problems", "easy"
+        1 (Mild): "Minor", "slight", "a little", "barely noticeable", "manageable without help"
+        2 (Moderate): "Some", "occasional", "now and then", "moderate", "needs minimal assistance"
+        3 (Severe): "Significant", "major", "regular", "often", "frequent help needed", "struggles with"
+        4 (Extreme): "Constant", "always", "cannot manage", "completely unable", "dependent on others"
+        5 (Not Applicable): Activity not attempted, condition prevents participation entirely
+
+        YES/NO INFERENCE PATTERNS:
+        YES Indicators: "Help with", "assistance for", "support to", "needs help", "requires aid", 
+                    "can't do alone", "struggles to", "finds it hard to", "depends on", 
+                    "caregiver helps", "family assists", "worker supports"
+        NO Indicators: "Independent", "manages alone", "no help needed", "self-sufficient",
+                    "does everything myself", "no assistance", "handles independently"
+        UNSURE Indicators: "Sometimes", "it depends", "varies", "good days and bad days",
+                        "uncertain", "not sure", "maybe"
+
+        SYMPTOM-TO-CONDITION MAPPING:
+        PHYSICAL: wheelchair, cane, walker, mobility issues, weakness, tremors, shaking,
+                fatigue, tiredness, exhaustion, balance problems, falling, dizziness,
+                pain, stiffness, muscle spasms, coordination issues
+
+        COGNITIVE: memory problems, forgetting, confusion, disorientation, concentration issues,
+                distractibility, attention problems, problem-solving difficulties,
+                decision-making challenges, learning difficulties
+
+        EMOTIONAL: anxiety, worry, fear, panic attacks, depression, sadness, low mood,
+                anger, frustration, irritability, mood swings, emotional outbursts,
+                withdrawal, isolation, social anxiety
+
+        COMMUNICATION: difficulty understanding, trouble following conversations,
+                    speech problems, stuttering, finding words, expressive difficulties,
+                    social communication challenges, avoiding conversations
+
+        SENSORY: vision problems, hearing difficulties, sensitivity to light/sound,
+                sensory overload, tactile sensitivities
+
+        ACTIVITY PARTICIPATION INDICATORS:
+        - Structured activities: "day program", "work", "school", "classes", "therapy sessions"
+        - Community participation: "shopping", "appointments", "outings", "events", "social gatherings"
+        - Social participation: "friends", "family visits", "phone calls", "social media"
+        - Recreation: "hobbies", "leisure activities", "entertainment", "sports", "crafts"
+
+        SUPPORT NEEDS CLASSIFICATION:
+        - Personal care: bathing, dressing, grooming, toileting, feeding
+        - Household: cleaning, cooking, shopping, laundry, home maintenance
+        - Medical: medications, appointments, treatments, therapy exercises
+        - Mobility: transportation, transfers, walking assistance
+        - Communication: interpreters, communication devices, speech therapy
+        - Cognitive: reminders, scheduling, decision support, memory aids
+        - Emotional: counseling, emotional support, crisis management
+        - Social: social skills, relationship support, community integration
+
+        CONTEXTUAL CLUES FOR SPECIFIC QUESTIONS:
+
+        FOR WORK/SCHOOL PARTICIPATION:
+        - Mentions of employment, job, workplace, colleagues → participates in work
+        - Mentions of school, classes, studying, teachers → participates in education  
+        - Mentions of day programs, centers, structured activities → participates in structured learning
+        - Mentions of volunteering, community work → participates in productive activities
+
+        FOR DIFFICULTY LEVELS:
+        - Time-based clues: "takes longer", "needs extra time", "slow to complete" → moderate-severe difficulty
+        - Assistance clues: "with help", "with support", "needs assistance" → significant difficulty
+        - Emotional clues: "frustrating", "overwhelming", "stressful" → moderate-severe difficulty
+        - Frequency clues: "always", "often", "frequently" → consistent difficulty
+
+        FOR SUPPORT NEEDS:
+        - Equipment mentions: wheelchair, walker, communication device → equipment support needed
+        - Personal assistance: caregiver, support worker, family help → personal support needed
+        - Environmental: home modifications, accessibility features → environmental support needed
+        - Professional: therapists, doctors, specialists → professional support needed
+
+        PAY ATTENTION TO:
+        - Comparative language: "harder than before", "worse than last year", "improved since"
+        - Conditional statements: "when I'm tired", "on bad days", "if it's crowded"
+        - Frequency modifiers: "always", "often", "sometimes", "rarely", "never"
+        - Intensity descriptors: "mild", "moderate", "severe", "extreme", "overwhelming"
+        - Support terminology: "help", "assistance", "support", "aid", "care"
+
+        USE CONTEXTUAL REASONING:
+        - If someone uses a wheelchair, infer mobility challenges and potential need for accessibility supports
+        - If someone mentions memory problems, infer potential need for reminders and cognitive supports
+        - If someone describes social anxiety, infer potential participation restrictions in social settings
+        - If someone has multiple medications, infer potential need for medication management support
+        - If someone has fluctuating conditions, infer that challenges may vary day-to-day
+
+        EXTRACT ANSWERS FOR THESE QUESTIONS AND DATA PATHS:
+"""
+
+INTAKE_SECTION_FIELDS = {
+    "introduction": """
+        INTRODUCTION SECTION:
+        - "introduction.today_date" (extract date as DD/MM/YYYY)
+        - "introduction.who_completing" (match to: Participant/client/patient, Family member/parent, Carer, Participant AND family member together, Legal guardian, Support worker, Intake team, Allied health professional, Teacher/educator, Employer/workplace)
+        - "introduction.new_participant" (Yes/No)
+        - "introduction.urgent_help" (Yes/No)
+        - "introduction.services_used" (list from: Active Community, Supported Independent Living, Specialist Disability Accommodation, Respite Care (STA, MTA), SLES Work Program, Employment, Allied Health)
+        - "introduction.active_service_location" (Home/Community/Both)
+        - "introduction.referral_source" (list from: Your COS, Your school, Someone in your healthcare team, Someone in your family, A friend, Other)
+        - "introduction.motivation" (extract text about motivation)
+        - "introduction.funding_source" (list from: NDIS, Workcover, Private/Self-funded, Aged Care/DVA funding, Other)
+        - "introduction.funding_source_other" (if Other selected, extract details)
+        - "introduction.funding_supports" (list from: Capital Supports, Capacity Building Supports, Core Supports, Other)
+        - "introduction.funding_supports_other" (if Other selected, extract details)
+""",
+    "about_me": """
+        ABOUT ME SECTION:
+        - "about_me.year_of_birth" (extract year as number)
+        - "about_me.postcode" (extract postcode as number)
+        - "about_me.gender" (match to: Female, Male, Non-Binary, Transgender Female, Transgender Male, Prefer Not To Say, Other)
+        - "about_me.gender_other" (if Other selected, extract details)
+        - "about_me.cultural_background" (list from: Australian - from an English speaking, Anglo-Celtic background, Australian - from a culturally and linguistically diverse background, Aboriginal, Torres Strait Islander, Other)
+        - "about_me.living_arrangements" (extract text about living situation)
+        - "about_me.things_love" (extract text about likes/enjoyments)
+        - "about_me.things_dislike" (extract text about dislikes/avoidances)
+        - "about_me.friends_family_description" (extract text about personality/relationships)
+""",
+    "about_family": """
+        ABOUT FAMILY SECTION:
+        - "about_family.family_members" (extract text about family composition)
+        - "about_family.family_relationship" (extract text about family relationships)
+        - "about_family.legal_decision_maker" (Yes/No/NA)
+        - "about_family.decision_maker_name" (if Yes, extract name)
+        - "about_family.family_activities" (extract text about family activities)
+        - "about_family.family_help" (extract text about family support)
+        - "about_family.family_impact_level" (None/Mild/Moderate/Severe/Extreme)
+        - "about_family.family_impact_ways" (extract text about impact details)
+        - "about_family.personal_story" (extract text about personal history)
+""",
+    "icf_impairment": """
+        ICF IMPAIRMENT SECTION:
+        - "icf_impairment.diagnoses" (list from: Brain Injury/Head Injury, Anorexia, Anxiety Disorder, ADHD, Autism, Bipolar Affective Disorder, Cerebral Palsy, Chronic Fatigue/ME, COPD, Congenital abnormality/deformity, Developmental Language Disorder, Dementia, Depression, Diabetes, Downs Syndrome, Dysarthria, Dysfluency, Dysphagia, Dysphasia/Aphasia, Dyspraxia, Epilepsy, Hearing Impairment/Deafness, Incontinence, Insulin Dependent Diabetes, Learning Disability, Neurological disorder, Non Insulin Dependent Diabetes, PTSD, Sensory Processing Disorder, Stroke, RET Syndrome, Spinal Injury, Tourette's Syndrome, Vision impairment, Fragile X, Obesity)
+        - "icf_impairment.physical.challenges_description" (extract text about physical challenges)
+        - "icf_impairment.physical.challenges_worsened" (Yes/No)
+        - "icf_impairment.physical.changes_description" (extract text about physical changes)
+        - "icf_impairment.physical.monitoring_needs" (extract text about monitoring needs)
+        - "icf_impairment.body_systems.challenges" (extract text about body system challenges)
+        - "icf_impairment.body_systems.worsened" (Yes/No)
+        - "icf_impairment.body_systems.changes_description" (extract text about body system changes)
+        - "icf_impairment.body_systems.monitoring_needs" (extract text about monitoring needs)
+        - "icf_impairment.cognitive_emotional.challenges" (extract text about cognitive/emotional challenges)
+        - "icf_impairment.cognitive_emotional.worsened" (Yes/No)
+        - "icf_impairment.cognitive_emotional.changes_description" (extract text about cognitive/emotional changes)
+        - "icf_impairment.cognitive_emotional.monitoring_needs" (extract text about monitoring needs)
+        - "icf_impairment.supports_needs.current_medications" (extract text about medications)
+        - "icf_impairment.supports_needs.medication_supports" (extract text about medication supports)
+        - "icf_impairment.supports_needs.medical_specialists" (extract text about medical specialists)
+        - "icf_impairment.supports_needs.specialist_appointment_supports" (extract text about specialist appointment supports)
+        - "icf_impairment.supports_needs.therapists_therapies" (extract text about therapists/therapies)
+        - "icf_impairment.supports_needs.therapy_appointment_supports" (extract text about therapy appointment supports)
+        - "icf_impairment.supports_needs.special_diet" (extract text about special diet)
+        - "icf_impairment.supports_needs.diet_supports" (extract text about diet supports)
+        - "icf_impairment.supports_needs.environmental_supports" (extract text about environmental supports)
+        - "icf_impairment.supports_needs.equipment_needs" (extract text about equipment needs)
+        - "icf_impairment.supports_needs.equipment_usage_supports" (extract text about equipment usage supports)
+        - "icf_impairment.supports_needs.sensory_supports" (extract text about sensory supports)
+        - "icf_impairment.supports_needs.sensory_supports_usage" (extract text about sensory supports usage)
+        - "icf_impairment.unmet_needs.support_needs" (extract text about unmet support needs)
+        - "icf_impairment.impairment_score.score" (extract number 0-5 with 0.5 increments for impairment score)
+""",
+    "icf_activity": """
+        ICF ACTIVITY SECTION:
+        - "icf_activity.understanding_communicating.needs_support" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.concentration_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_concentration" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.concentration_supports" (extract text about concentration supports)
+        - "icf_activity.understanding_communicating.remembering_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_remembering" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.remembering_supports" (extract text about remembering supports)
+        - "icf_activity.understanding_communicating.problem_solving_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_problem_solving" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.problem_solving_supports" (extract text about problem solving supports)
+        - "icf_activity.understanding_communicating.learning_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_learning" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.learning_supports" (extract text about learning supports)
+        - "icf_activity.understanding_communicating.understanding_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_understanding" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.understanding_supports" (extract text about understanding supports)
+        - "icf_activity.understanding_communicating.conversation_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_activity.understanding_communicating.support_conversation" (Yes/No/Unsure)
+        - "icf_activity.understanding_communicating.conversation_supports" (extract text about conversation supports)
+        - "icf_activity.understanding_communicating.unmet_supports" (extract text about unmet communication supports)
+""",
+    "icf_participation": """
+        ICF PARTICIPATION SECTION:
+        - "icf_participation.school_work.participates" (Yes/No/Unsure)
+        - "icf_participation.school_work.daily_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.school_work.support_daily" (Yes/No/Unsure)
+        - "icf_participation.school_work.daily_supports" (extract text about daily work/school supports)
+        - "icf_participation.school_work.important_tasks_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.school_work.support_important_tasks" (Yes/No/Unsure)
+        - "icf_participation.school_work.important_tasks_supports" (extract text about important tasks supports)
+        - "icf_participation.school_work.completing_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.school_work.support_completing" (Yes/No/Unsure)
+        - "icf_participation.school_work.completing_supports" (extract text about completing work supports)
+        - "icf_participation.school_work.speed_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.school_work.support_speed" (Yes/No/Unsure)
+        - "icf_participation.school_work.speed_supports" (extract text about work speed supports)
+        - "icf_participation.school_work.unmet_supports" (extract text about unmet school/work supports)
+        - "icf_participation.community.problems_support" (Yes/No/Unsure)
+        - "icf_participation.community.joining_difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.community.supports" (extract text about community supports)
+        - "icf_participation.community.unmet_supports" (extract text about unmet community supports)
+        - "icf_participation.relaxation.difficulty" (0-5: None/Mild/Moderate/Severe/Extreme/Not Applicable)
+        - "icf_participation.relaxation.support" (Yes/No/Unsure)
+        - "icf_participation.relaxation.supports" (extract text about relaxation supports)
+        - "icf_participation.relaxation.unmet_supports" (extract text about unmet relaxation supports)
+        - "icf_participation.other.limitations" (Yes/No/Unsure)
+        - "icf_participation.other.limitations_details" (extract text about other participation limitations)
+        - "icf_participation.score.score" (extract number 0-5 with 0.5 increments for participation score)
+""",
+    "icf_wellbeing": """
+        ICF WELL-BEING SECTION:
+        - "icf_wellbeing.emotional_frequency" (0-5: Never/Rarely/Sometimes/Often/Very often/All the time)
+        - "icf_wellbeing.emotional_intensity" (0-5: No intensity/Mild/Moderate/High/Very high/Extreme)
+        - "icf_wellbeing.emotional_experience" (extract text about emotional experiences)
+        - "icf_wellbeing.emotional_triggers" (extract text about emotional triggers)
+        - "icf_wellbeing.emotional_supports" (extract text about emotional supports)
+        - "icf_wellbeing.unmet_supports" (extract text about unmet emotional supports)
+        - "icf_wellbeing.score.score" (extract number 0-5 with 0.5 increments for wellbeing score)
+
+""",
+}
+
+INTAKE_PROMPT_FOOTER = """        IMPORTANT: When in doubt between two possible interpretations, choose the more specific and contextual one based on the overall narrative.
+
+        RETURN AS JSON with these exact field names. For any information that is missing or unclear, use "Unknown".
+        """
+
+INTAKE_SECTION_PROMPTS = {
+    section: PromptTemplate(f"intake_{section}", INTAKE_PROMPT_VERSION, INTAKE_PROMPT_HEADER + fields + INTAKE_PROMPT_FOOTER)
+    for section, fields in INTAKE_SECTION_FIELDS.items()
+}
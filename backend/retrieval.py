@@ -0,0 +1,127 @@
+import os
+import re
+import math
+from collections import Counter
+
+from chunking import chunk_text, count_tokens
+
+# Per-section passage retrieval settings
+retrieval_enabled = os.getenv("RETRIEVAL_ENABLED", "true").lower() == "true"
+retrieval_min_tokens = int(os.getenv("RETRIEVAL_MIN_TOKENS", "2000"))  # shorter texts are sent whole
+retrieval_section_tokens = int(os.getenv("RETRIEVAL_SECTION_TOKENS", "1500"))
+retrieval_passage_tokens = int(os.getenv("RETRIEVAL_PASSAGE_TOKENS", "150"))
+
+PARAGRAPH_PATTERN = re.compile(r"\n\s*\n|(?=^--- Page \d+ ---$)", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that appear in every prompt line and say nothing about where the answer is
+STOPWORDS = set("""
+a about an and are as at be by can do does for from has have how i if in into is it its me my no not
+of on or our so that the their them they this to was we were what when where which who will with you your
+extract text selected details match list number score increments yes unsure na icf section
+""".split())
+
+
+def tokenize(text):
+    """Lowercase words with a light suffix strip so walking/walks/walked all match"""
+    terms = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        for suffix in ("ing", "ies", "es", "ed", "ly", "s"):
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                word = word[: -len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+
+def split_passages(text, passage_tokens=None):
+    """Paragraph-sized passages - long paragraphs and unbroken transcripts are cut on sentences"""
+    passage_tokens = passage_tokens or retrieval_passage_tokens
+    passages = []
+    for paragraph in PARAGRAPH_PATTERN.split(text):
+        if paragraph and paragraph.strip():
+            passages.extend(chunk_text(paragraph, passage_tokens, overlap_tokens=0))
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 over a document's passages, built once and queried per section"""
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(passage)) for passage in passages]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if passages else 0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(passages)
+        self.idf = {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query_terms):
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            for term in query_terms:
+                frequency = counts.get(term)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            results.append(score)
+        return results
+
+
+def section_query_terms(*vocabularies):
+    """Distinct query terms from a section's prompt lines plus any hint words"""
+    return list(dict.fromkeys(term for vocabulary in vocabularies for term in tokenize(vocabulary.replace("_", " "))))
+
+
+def select_passages(index, query_terms, max_tokens):
+    """Best-scoring passages that fit max_tokens, returned in document order
+
+    The first passage is always kept since forms and referrals put names, dates and
+    other header details there. Returns (text, matched passage count, tokens used).
+    """
+    scores = index.scores(query_terms)
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: (-scores[i], i))
+    chosen, used = set(), 0
+    for i in [0] + ranked:
+        tokens = count_tokens(index.passages[i])
+        if i in chosen or used + tokens > max_tokens:
+            continue
+        chosen.add(i)
+        used += tokens
+    return "\n\n".join(index.passages[i] for i in sorted(chosen)), len(ranked), used
+
+
+def build_section_texts(text, section_queries):
+    """Pick the passages each section needs; returns ({section: text}, stats for this request)"""
+    full_tokens = count_tokens(text)
+    if not retrieval_enabled or full_tokens < retrieval_min_tokens:
+        return {section: text for section in section_queries}, None
+
+    index = BM25Index(split_passages(text))
+    section_texts, sections = {}, {}
+    for section, query_terms in section_queries.items():
+        selected, matched, used = select_passages(index, query_terms, retrieval_section_tokens)
+        if matched == 0:
+            # No vocabulary hit at all - let the section see everything rather than guess
+            selected, used = text, full_tokens
+        section_texts[section] = selected
+        sections[section] = {"matched_passages": matched, "tokens": used}
+
+    sent_tokens = sum(section["tokens"] for section in sections.values())
+    stats = {
+        "passages": len(index.passages),
+        "hit_rate": sum(1 for section in sections.values() if section["matched_passages"]) / len(sections),
+        "full_tokens": full_tokens * len(sections),
+        "sent_tokens": sent_tokens,
+        "token_savings": 1 - sent_tokens / (full_tokens * len(sections)),
+        "sections": sections,
+    }
+    return section_texts, stats
@@ -0,0 +1,50 @@
+"""Textract dispatch must survive transport errors without leaking throttle slots
+
+    python -m pytest test_textract_throttle.py
+"""
+import os
+import sys
+import threading
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ocr_utils import is_throttling_error, textract_pages  # noqa: E402
+
+
+class TimingOutClient:
+    """Raises a botocore transport error (response=None) for the first `failures` calls"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def detect_document_text(self, Document):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.failures
+        if failing:
+            raise ReadTimeoutError(endpoint_url="https://textract.test")
+        return {"Blocks": [{"BlockType": "LINE", "Text": "ok"}]}
+
+
+def test_transport_error_is_not_throttling():
+    assert not is_throttling_error(ReadTimeoutError(endpoint_url="https://textract.test"))
+    throttled = ClientError({"Error": {"Code": "ThrottlingException"}}, "DetectDocumentText")
+    assert is_throttling_error(throttled)
+
+
+def test_transport_errors_release_their_slots():
+    # As many failures as slots - a leaked slot each would leave nothing for the remaining pages
+    client = TimingOutClient(failures=2)
+    pages = [(number, b"page") for number in range(1, 7)]
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(textract_pages(client, pages, concurrency=2)), daemon=True)
+    worker.start()
+    worker.join(10)
+
+    assert not worker.is_alive(), "textract_pages hung after transport errors"
+    assert len(result) == 4
+    assert all(text == "ok\n" for text in result.values())
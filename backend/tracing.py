@@ -0,0 +1,236 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+# Structured log and slow-request settings
+log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+trace_log_spans = os.getenv("TRACE_LOG_SPANS", "true").lower() == "true"  # one line per finished span
+trace_max_spans = int(os.getenv("TRACE_MAX_SPANS", "500"))  # spans kept per request for the slow-request breakdown
+slow_request_seconds = float(os.getenv("SLOW_REQUEST_SECONDS", "30"))
+slow_request_log = os.getenv("SLOW_REQUEST_LOG")  # file for slow-request breakdowns; default: the main log stream
+
+# Span attributes are counts, sizes and durations. Strings are only kept for these keys,
+# so document text, transcripts, answers and filenames can't end up in a log line
+TEXT_ATTRIBUTES = {"method", "path", "prompt", "model", "section", "kind", "content_type", "error", "job"}
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+_trace = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("parent_span", default=(None, 0))
+_span_ids = itertools.count(1)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp the caller's request id on the record before it crosses to the listener thread"""
+
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class LoggerNameFilter(logging.Filter):
+    def __init__(self, names, exclude=False):
+        super().__init__()
+        self.names = set(names)
+        self.exclude = exclude
+
+    def filter(self, record):
+        return (record.name in self.names) != self.exclude
+
+
+def _start_listener():
+    """Callers only put records on a queue; one listener thread formats and writes them"""
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    handlers = [stream_handler]
+    if slow_request_log:
+        slow_handler = logging.FileHandler(slow_request_log, encoding="utf-8")
+        slow_handler.setFormatter(JsonFormatter())
+        slow_handler.addFilter(LoggerNameFilter(["intake.slow"]))
+        stream_handler.addFilter(LoggerNameFilter(["intake.slow"], exclude=True))
+        handlers.append(slow_handler)
+
+    for name in ("intake.trace", "intake.slow"):
+        log = logging.getLogger(name)
+        log.setLevel(log_level)
+        log.addHandler(queue_handler)
+        log.propagate = False
+
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+_listener = _start_listener()
+logger = logging.getLogger("intake.trace")
+slow_logger = logging.getLogger("intake.slow")
+
+
+def safe_attributes(attrs):
+    """Keep numbers and flags; drop strings other than the known labels in TEXT_ATTRIBUTES"""
+    safe = {}
+    for key, value in attrs.items():
+        if value is None or isinstance(value, (bool, int, float)):
+            safe[key] = round(value, 3) if isinstance(value, float) else value
+        elif isinstance(value, str) and key in TEXT_ATTRIBUTES:
+            safe[key] = value[:200]
+    return safe
+
+
+def current_request_id():
+    return request_id_var.get()
+
+
+def new_request_id(header_value=None):
+    """Reuse a well-formed X-Request-ID from the caller, otherwise make one up"""
+    if header_value and REQUEST_ID_PATTERN.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+class Trace:
+    """Every span recorded while handling one request or background job"""
+
+    def __init__(self, request_id, name, attrs):
+        self.request_id = request_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.spans = []
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            if len(self.spans) < trace_max_spans:
+                self.spans.append(record)
+            else:
+                self.dropped_spans += 1
+        if trace_log_spans:
+            logger.info("span", extra={"fields": record})
+
+    def breakdown(self):
+        with self._lock:
+            return sorted(self.spans, key=lambda record: record["start_ms"])
+
+
+@contextmanager
+def trace_request(name, request_id=None, **attrs):
+    """Start a trace for one request or job; spans opened inside it (and in threads bound to it) land here"""
+    trace = Trace(request_id or new_request_id(), name, attrs)
+    tokens = (request_id_var.set(trace.request_id), _trace.set(trace), _parent.set((None, 0)))
+    try:
+        yield trace
+    except BaseException as e:
+        trace.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        _parent.reset(tokens[2])
+        _trace.reset(tokens[1])
+        seconds = time.perf_counter() - trace.start
+        summary = dict(safe_attributes(trace.attrs), name=trace.name, duration_ms=round(seconds * 1000, 1), spans=len(trace.spans))
+        logger.info("request", extra={"fields": summary, "request_id": trace.request_id})
+        if seconds >= slow_request_seconds:
+            # A new dict - the listener thread may not have formatted `summary` yet
+            breakdown = dict(summary, breakdown=trace.breakdown(), dropped_spans=trace.dropped_spans)
+            slow_logger.warning("slow_request", extra={"fields": breakdown, "request_id": trace.request_id})
+        request_id_var.reset(tokens[0])
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block as a child of the current span
+
+    Yields a dict for attributes only known at the end (page counts, token counts).
+    Outside a trace this does nothing, so the CLI and benchmarks pay no cost.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield attrs
+        return
+
+    parent_id, depth = _parent.get()
+    span_id = next(_span_ids)
+    token = _parent.set((span_id, depth + 1))
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _parent.reset(token)
+        record = safe_attributes(attrs)
+        record.update(
+            span=name, span_id=span_id, parent_id=parent_id, depth=depth,
+            start_ms=round((start - trace.start) * 1000, 1),
+            duration_ms=round((time.perf_counter() - start) * 1000, 1),
+        )
+        trace.add(record)
+
+
+def bind_context(fn):
+    """Wrap fn to run in a copy of the caller's context, so the request id and open span follow it into pool threads"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A fresh copy per call - one Context can't be entered by two threads at once
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+class RequestTracingMiddleware:
+    """Give every HTTP request an id and a trace, and return the id as X-Request-ID"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = new_request_id(headers.get(b"x-request-id", b"").decode("latin-1"))
+        with trace_request(f"{scope['method']} {scope['path']}", request_id, method=scope["method"], path=scope["path"]) as trace:
+            async def send_with_request_id(message):
+                if message["type"] == "http.response.start":
+                    trace.attrs["status"] = message["status"]
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            except Exception:
+                trace.attrs.setdefault("status", 500)
+                raise
@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+
+# Upload size limit and where uploads are spooled
+max_upload_bytes = int(float(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+batch_max_upload_bytes = int(float(os.getenv("BATCH_MAX_UPLOAD_MB", "1000")) * 1024 * 1024)  # zip archives on /batch
+upload_spool_dir = os.getenv("UPLOAD_SPOOL_DIR") or None  # default: the system temp dir
+upload_copy_chunk_bytes = 1024 * 1024
+
+
+class SpooledUpload:
+    """An upload copied to its own named temp file - stages read it by path, never as one bytes object"""
+
+    def __init__(self, path, filename):
+        self.path = path
+        self.filename = filename
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _copy_to_spool(source, suffix):
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, dir=upload_spool_dir, delete=False) as spool:
+        shutil.copyfileobj(source, spool, upload_copy_chunk_bytes)
+    return spool.name
+
+
+async def spool_upload(file):
+    """Copy an UploadFile to a named temp file in chunks, off the event loop"""
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    path = await asyncio.to_thread(_copy_to_spool, file.file, suffix)
+    return SpooledUpload(path, file.filename)
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+def too_large_message(max_bytes):
+    return f"Upload exceeds the {max_bytes / (1024 * 1024):g} MB limit"
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies over max_upload_bytes with a 413 while they are still arriving
+
+    A Content-Length over the limit is refused before any body is read; otherwise
+    bytes are counted as they stream in and the request is cut off at the limit.
+    """
+
+    def __init__(self, app, max_bytes=None, path_limits=None):
+        self.app = app
+        self.default_max_bytes = max_bytes or max_upload_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+        max_bytes = self.path_limits.get(scope["path"], self.default_max_bytes)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            await self._send_413(send, max_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise UploadTooLargeError(too_large_message(max_bytes))
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Body parsing errors come back as the app's own 400 - swap it for a 413
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._send_413(send, max_bytes)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLargeError:
+            if not response_started:
+                await self._send_413(send, max_bytes)
+
+    async def _send_413(self, send, max_bytes):
+        print(f"🚫 Rejected upload: {too_large_message(max_bytes)}")
+        body = json.dumps({"error": too_large_message(max_bytes)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,120 @@
+import os
+import time
+import atexit
+import queue
+import threading
+import traceback
+from metrics import track_stage
+
+# Write-behind settings for rows saved after extraction
+write_batch_size = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+write_flush_seconds = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1.0"))
+write_queue_depth = int(os.getenv("WRITE_BEHIND_QUEUE_DEPTH", "1000"))
+write_enqueue_timeout = float(os.getenv("WRITE_BEHIND_ENQUEUE_TIMEOUT", "5"))  # seconds a full queue blocks a caller
+write_attempts = 3
+
+_STOP = object()
+
+
+class WriteQueueFullError(Exception):
+    """Raised when the write-behind queue stays full past the enqueue timeout"""
+
+
+class WriteBehindWriter:
+    """Queue rows for a table and insert them from one background thread in batches
+
+    A batch is written once it reaches batch_size rows or flush_seconds after its first
+    row arrived, as a single executemany INSERT in one transaction.
+    """
+
+    def __init__(self, engine, table, batch_size=None, flush_seconds=None, max_depth=None):
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size or write_batch_size
+        self.flush_seconds = flush_seconds if flush_seconds is not None else write_flush_seconds
+        self._queue = queue.Queue(maxsize=max_depth or write_queue_depth)
+        self._counts = {"written": 0, "batches": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{table.name}", daemon=True)
+        self._thread.start()
+        # The thread is a daemon, so flush whatever is still queued when the process exits
+        atexit.register(self.close)
+
+    def submit(self, row, timeout=None):
+        """Queue a row dict, blocking up to timeout seconds while the queue is full"""
+        if self._closed:
+            raise WriteQueueFullError("Writer is shut down")
+        try:
+            self._queue.put(row, timeout=write_enqueue_timeout if timeout is None else timeout)
+        except queue.Full:
+            raise WriteQueueFullError(f"Write queue for {self.table.name} is full ({self._queue.maxsize} rows waiting)")
+
+    def _next_batch(self):
+        """Block for the first row, then gather more until the batch fills or its time is up"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _run(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(batch)
+            if stopping:
+                # Anything submitted before close() is still written
+                remaining = []
+                while True:
+                    try:
+                        remaining.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                for start in range(0, len(remaining), self.batch_size):
+                    self._write([row for row in remaining[start:start + self.batch_size] if row is not _STOP])
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        for attempt in range(1, write_attempts + 1):
+            try:
+                with track_stage("db_write"), self.engine.begin() as connection:
+                    connection.execute(self.table.insert(), batch)
+                with self._lock:
+                    self._counts["written"] += len(batch)
+                    self._counts["batches"] += 1
+                print(f"💾 Wrote {len(batch)} {self.table.name} rows")
+                return
+            except Exception as e:
+                print(f"❌ Batch insert into {self.table.name} failed (attempt {attempt}/{write_attempts}): {e}")
+                if attempt < write_attempts:
+                    time.sleep(0.5 * attempt)
+        traceback.print_exc()
+        with self._lock:
+            self._counts["dropped"] += len(batch)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, queued=self._queue.qsize())
+
+    def close(self, timeout=30):
+        """Stop accepting rows and wait for everything queued to be written"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ {self.table.name} writer still flushing after {timeout}s")
@@ -15,6 +15,9 @@ function App() {
     primary_diagnosis: ''
   });
   const [patients, setPatients] = useState<any[]>([]);
+  const [patientTotal, setPatientTotal] = useState<number | null>(null);
+  const [patientTotalIsEstimate, setPatientTotalIsEstimate] = useState(false);
+  const [nextPatientCursor, setNextPatientCursor] = useState<string | null>(null);
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files && e.target.files[0]) {
@@ -111,12 +114,19 @@ function App() {
     }
   };
 
-  const fetchPatients = async () => {
+  // /patients is paged - the first page brings the total, "Load More" follows next_cursor
+  const fetchPatients = async (cursor?: string) => {
     try {
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'https://intake-prototype-backend.onrender.com'}/patients`);
+      const params = new URLSearchParams(cursor ? { cursor } : { include_total: 'true' });
+      const response = await fetch(`${import.meta.env.VITE_API_URL || 'https://intake-prototype-backend.onrender.com'}/patients?${params}`);
       const data = await response.json();
       if (data.status === 'success') {
-        setPatients(data.patients);
+        setPatients(previous => cursor ? [...previous, ...data.patients] : data.patients);
+        setNextPatientCursor(data.next_cursor);
+        if (!cursor) {
+          setPatientTotal(data.total);
+          setPatientTotalIsEstimate(Boolean(data.total_is_estimate));
+        }
       }
     } catch (err) {
       console.error('Failed to fetch patients:', err);
@@ -220,7 +230,7 @@ function App() {
 
         <Button 
           variant="outlined" 
-          onClick={fetchPatients}
+          onClick={() => fetchPatients()}
           fullWidth
           sx={{ mt: 3 }}
         >
@@ -274,7 +284,7 @@ function App() {
         {patients.length > 0 && (
           <Box sx={{ mt: 3 }}>
             <Typography variant="h5" gutterBottom>
-              Saved Patients ({patients.length})
+              Saved Patients ({patientTotal === null ? patients.length : `${patientTotalIsEstimate ? '~' : ''}${patientTotal}`})
             </Typography>
             {patients.map((patient) => (
               <Box key={patient.id} sx={{ p: 2, border: '1px solid #ddd', borderRadius: 1, mb: 1 }}>
@@ -286,6 +296,11 @@ function App() {
                 </Typography>
               </Box>
             ))}
+            {nextPatientCursor && (
+              <Button variant="text" onClick={() => fetchPatients(nextPatientCursor)} fullWidth>
+                Load More ({patients.length} shown)
+              </Button>
+            )}
           </Box>
         )}
       </Box>
@@ -239,6 +239,37 @@ const processAIAnswersForForm = (flattenedAnswers: AIAnswers, questions: any[]):
   return processedData;
 };
 
+// Read a text/event-stream response, calling onEvent for each "event:"/"data:" block
+const readEventStream = async (
+  response: Response,
+  onEvent: (event: string, data: any) => void
+) => {
+  const reader = response.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      // Lines starting with ":" are keepalive comments and carry no data
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
+
 const IntakePage = () => {
   const [currentSection, setCurrentSection] = useState(0);
   const [formData, setFormData] = useState<FormData>({});
@@ -253,6 +284,67 @@ const IntakePage = () => {
     question => question.section === sections[currentSection]
   );
 
+  // Merge a batch of AI answers into the form - called once per section as they stream in
+  const applyAIAnswers = (answers: AIAnswers, label: string) => {
+    // Flatten the nested AI response
+    const flattenedAnswers = flattenObject(answers || {});
+    console.log(`📊 ${label} - AI ANSWERS (FLATTENED):`, flattenedAnswers);
+
+    setAiAnswers(previous => ({ ...previous, ...flattenedAnswers }));
+    setFileUploaded(true);
+
+    // Process AI answers for form compatibility and auto-populate where AI is confident
+    const processedAnswers = processAIAnswersForForm(flattenedAnswers, INTAKE_QUESTIONS);
+    setFormData(previous => ({ ...previous, ...processedAnswers }));
+  };
+
+  // POST to the streaming variant of an intake endpoint and apply answers section by section
+  // (FormData above is this file's answers type, hence globalThis for the upload body)
+  const streamIntake = async (endpoint: string, uploadFormData: globalThis.FormData, label: string) => {
+    const response = await fetch(`${endpoint}/stream`, {
+      method: 'POST',
+      body: uploadFormData,
+    });
+
+    if (!response.ok || !response.body) {
+      // Errors are usually JSON, but a proxy or size limit may answer with plain text
+      const result = await response.json().catch(() => ({}));
+      throw new Error(result.error || `HTTP ${response.status}`);
+    }
+
+    // Failures arrive as an SSE "error" event - thrown once the stream ends so the caller alerts
+    let streamError: string | null = null;
+    let finished = false;
+    await readEventStream(response, (event, data) => {
+      if (event === 'section') {
+        console.log(`🎯 ${label} - ${data.section} answers ready`);
+        applyAIAnswers(data.answers, label);
+      } else if (event === 'result') {
+        // Same payload as the non-streaming endpoint
+        console.log('🔍 FULL BACKEND RESPONSE:', data);
+        console.log('🎯 NUMBER OF RAW ANSWERS FOUND:', Object.keys(data.extracted_answers || {}).length);
+        finished = true;
+        if (data.status === 'success') {
+          applyAIAnswers(data.extracted_answers, label);
+        } else {
+          streamError = data.error || 'Processing failed';
+        }
+      } else if (event === 'error') {
+        console.error(`${label} processing failed:`, data.error);
+        streamError = data.error || 'Processing failed';
+      } else {
+        console.log(`⏳ ${label} - ${event}`, data);
+      }
+    });
+
+    if (streamError) {
+      throw new Error(streamError);
+    }
+    if (!finished) {
+      throw new Error('Connection closed before processing finished');
+    }
+  };
+
   const handleFileUpload = async (file: File, type: 'pdf' | 'audio') => {
     const uploadFormData = new FormData(); 
     uploadFormData.append('file', file);
@@ -263,36 +355,7 @@ const IntakePage = () => {
       : `${backendUrl}/parse-audio-for-intake`;
     
     try {
-      const response = await fetch(endpoint, {
-        method: 'POST',
-        body: uploadFormData, 
-      });
-      
-      const result = await response.json();
-
-      console.log('🔍 FULL BACKEND RESPONSE:', result);
-      console.log('📊 AI EXTRACTED ANSWERS (RAW):', result.extracted_answers);
-      console.log('🎯 NUMBER OF RAW ANSWERS FOUND:', Object.keys(result.extracted_answers || {}).length);
-      
-      if (result.status === 'success') {
-        // Flatten the nested AI response
-        const flattenedAnswers = flattenObject(result.extracted_answers || {});
-        
-        console.log('📊 AI EXTRACTED ANSWERS (FLATTENED):', flattenedAnswers);
-        console.log('🎯 NUMBER OF FLATTENED ANSWERS:', Object.keys(flattenedAnswers).length);
-        
-        setAiAnswers(flattenedAnswers);
-        setFileUploaded(true);
-        
-        // Process AI answers for form compatibility
-        const processedAnswers = processAIAnswersForForm(flattenedAnswers, INTAKE_QUESTIONS);
-        
-        // Auto-populate answers where AI is confident
-        const updatedData = { ...formData, ...processedAnswers };
-        setFormData(updatedData);
-        
-        console.log('✅ FINAL PROCESSED FORM DATA:', processedAnswers);
-      }
+      await streamIntake(endpoint, uploadFormData, type.toUpperCase());
     } catch (error) {
       console.error('Upload failed:', error);
       alert(`Upload failed: ${error}`);
@@ -307,30 +370,7 @@ const IntakePage = () => {
     const backendUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
       
     try {
-      const response = await fetch(`${backendUrl}/parse-audio-for-intake`, {
-        method: 'POST',
-        body: uploadFormData,
-      });
-        
-      const result = await response.json();
-
-      if (result.status === 'success') {
-        // Flatten the nested AI response for audio too
-        const flattenedAnswers = flattenObject(result.extracted_answers || {});
-        
-        console.log('🔊 AUDIO - FLATTENED AI ANSWERS:', flattenedAnswers);
-        
-        setAiAnswers(flattenedAnswers);
-        setFileUploaded(true);
-        
-        // Process AI answers for form compatibility
-        const processedAnswers = processAIAnswersForForm(flattenedAnswers, INTAKE_QUESTIONS);
-        
-        const updatedData = { ...formData, ...processedAnswers };
-        setFormData(updatedData);
-        
-        console.log('🔊 AUDIO - FINAL PROCESSED FORM DATA:', processedAnswers);
-      }
+      await streamIntake(`${backendUrl}/parse-audio-for-intake`, uploadFormData, 'AUDIO');
     } catch (error) {
       console.error('Recording processing failed:', error);
       alert('Failed to process recording. Please try again.');